@@ -1,39 +1,51 @@
 # app.py (patched for Render deployment)
 # Use USE_CAMERA env var to enable local webcam. On Render, leave unset or set false.
 
-import base64
+import csv
 import io
 import os
+import hashlib
+import hmac
 import json
 import random
 import atexit
+import threading
+import time
 from datetime import timedelta
-from PIL import Image as PILImage
 
-from flask import Flask, redirect, render_template, request, jsonify, session, url_for, Response
+_APP_IMPORT_STARTED = time.perf_counter()
+
+
+from flask import Flask, redirect, render_template, request, jsonify, send_from_directory, session, url_for, Response
 from flask_cors import CORS
 
 import cv2
 import numpy as np
-# Try to import mediapipe (server may not have it); fall back gracefully.
-try:
-    import mediapipe as mp
-    MP_AVAILABLE = True
-    print("MediaPipe available on server")
-except Exception as e:
-    mp = None
-    MP_AVAILABLE = False
-    print("MediaPipe not available on server:", e)
 
-
-# Optional: TensorFlow is used elsewhere in your app; keep imports ready
-try:
-    from tensorflow.keras.models import load_model
-    from tensorflow.keras.models import Sequential
-    from tensorflow.keras.layers import Dense, Flatten, Input
-    TF_AVAILABLE = True
-except Exception:
-    TF_AVAILABLE = False
+import backends
+import gesture_rules
+import metrics
+from camera_stream import FrameBroadcaster, SyntheticSource, blank_frame
+from image_decode import PayloadTooLarge, decode_b64_image, decode_image, read_upload
+from inference_batcher import MicroBatcher
+from gesture_tracker import GestureTracker
+from landmark_classifier import UNKNOWN_LABEL, LandmarkClassifier, parse_landmarks
+from landmark_store import LandmarkStore, convert_json_tree
+from landmark_stream import iter_batches
+from progress_cache import ProgressCache
+from result_cache import ResultCache
+from retraining import ModelSlot, Retrainer
+from shape_recognition import ShapeIndex, recognize_many
+from stream_encoder import MAX_FPS as STREAM_MAX_FPS, EncoderPool, static_stream, stream_params
+from progress_store import GLOBAL_KEY, open_progress_store
+from question_bank import QuestionBank
+from user_registry import UserRegistry
+
+# TensorFlow and MediaPipe are heavy (seconds and hundreds of MB per worker), so
+# they are only located here and imported on first use via backends.get().
+MP_AVAILABLE = backends.register("mediapipe", "mediapipe").available()
+TF_AVAILABLE = backends.register("tensorflow", "tensorflow").available()
+print("MediaPipe available on server:", MP_AVAILABLE)
 
 # -------------------- Directories --------------------
 DATA_DIR = "collected_data"
@@ -41,63 +53,151 @@ SHAPE_DATA_DIR = "shape_dataset"
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(SHAPE_DATA_DIR, exist_ok=True)
 
-PROGRESS_FILE = "progress.json"
+PROGRESS_FILE = os.environ.get("PROGRESS_FILE", "progress.json")
+# PROGRESS_BACKEND=sqlite (default, imports PROGRESS_FILE once) or json (legacy file)
+PROGRESS_BACKEND = os.environ.get("PROGRESS_BACKEND", "sqlite")
+PROGRESS_DB = os.environ.get("PROGRESS_DB", "progress.db")
+# In-memory LRU in front of the store; writes are flushed every PROGRESS_FLUSH_SECONDS
+PROGRESS_CACHE_SIZE = int(os.environ.get("PROGRESS_CACHE_SIZE", "4096"))
+PROGRESS_FLUSH_SECONDS = float(os.environ.get("PROGRESS_FLUSH_SECONDS", "2"))
+# Clean entries are re-read from the store after PROGRESS_CACHE_TTL seconds (0 = never).
+# Another worker's writes only show up through that re-read, so with WEB_CONCURRENCY > 1
+# it defaults to the flush interval; a single process never needs to re-read.
+WEB_WORKERS = int(os.environ.get("WEB_CONCURRENCY", "1"))
+PROGRESS_CACHE_TTL = float(os.environ.get("PROGRESS_CACHE_TTL", PROGRESS_FLUSH_SECONDS if WEB_WORKERS > 1 else 0))
+BADGE_STARS = 5
+# Registered users (ids, names, classrooms); a table next to the progress rows by default
+USER_DB = os.environ.get("USER_DB", PROGRESS_DB)
+USER_IMPORT_MAX = int(os.environ.get("USER_IMPORT_MAX", "1000"))
+ANONYMOUS_USER = "child_1"
+# Columnar landmark samples written by /api/data/save (collected_data/ is imported once)
+LANDMARK_STORE_DIR = os.environ.get("LANDMARK_STORE_DIR", "landmark_store")
+LANDMARK_MODEL_PATH = os.environ.get("LANDMARK_MODEL_PATH", os.path.join("models", "landmark_classifier.npz"))
+# The classifier overrides a finger-rule label only with at least this margin (0..1)
+LANDMARK_MIN_MARGIN = float(os.environ.get("LANDMARK_MIN_MARGIN", "0.5"))
+# Fold newly saved samples into the classifier every LANDMARK_RETRAIN_SECONDS (0 = off);
+# workers pick up a newer model file within LANDMARK_RELOAD_SECONDS, see retraining.py
+LANDMARK_RETRAIN_SECONDS = float(os.environ.get("LANDMARK_RETRAIN_SECONDS", "0"))
+LANDMARK_RELOAD_SECONDS = float(os.environ.get("LANDMARK_RELOAD_SECONDS", "5"))
+
+# Micro-batching for predict_gesture: gather concurrent frames for up to
+# PREDICT_MAX_WAIT_MS or PREDICT_MAX_BATCH frames and run one forward pass.
+PREDICT_MAX_BATCH = int(os.environ.get("PREDICT_MAX_BATCH", "16"))
+PREDICT_MAX_WAIT_MS = float(os.environ.get("PREDICT_MAX_WAIT_MS", "5"))
+
+# Live video: infer every GESTURE_EVERY_N frames (or on motion) and smooth the
+# shown label over the last GESTURE_VOTE_WINDOW predictions, see gesture_tracker.py
+GESTURE_EVERY_N = int(os.environ.get("GESTURE_EVERY_N", "4"))
+GESTURE_MOTION_THRESHOLD = float(os.environ.get("GESTURE_MOTION_THRESHOLD", "8"))
+GESTURE_VOTE_WINDOW = int(os.environ.get("GESTURE_VOTE_WINDOW", "5"))
+GESTURE_SWITCH_VOTES = int(os.environ.get("GESTURE_SWITCH_VOTES", "3"))
 
 # -------------------- Gesture model (dummy fallback) --------------------
-if TF_AVAILABLE:
-    model = Sequential([
+def _build_gesture_model(tf):
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense, Flatten, Input
+    return Sequential([
         Input(shape=(100, 100, 3), name="input_layer"),
         Flatten(),
         Dense(10, activation='softmax')
     ])
+
+def _warm_up_gesture_model(model):
+    model.predict(np.zeros((1, 100, 100, 3), dtype=np.float32), verbose=0)
+
+# An exported model (python numpy_runtime.py export ...) is served without TensorFlow
+GESTURE_MODEL_PATH = os.environ.get("GESTURE_MODEL_PATH", os.path.join("models", "gesture_model.npz"))
+
+if os.path.exists(GESTURE_MODEL_PATH):
+    backends.register("gesture_model", "numpy_runtime", init=lambda rt: rt.load_model(GESTURE_MODEL_PATH),
+                      warm_up=_warm_up_gesture_model)
 else:
-    model = None
+    backends.register("gesture_model", "tensorflow", init=_build_gesture_model, warm_up=_warm_up_gesture_model)
+
+def get_gesture_model():
+    return backends.get("gesture_model")
+
+def _model_version(path):
+    # cached gesture results are only valid for the model file that produced them
+    if not os.path.exists(path):
+        return "builtin"
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+GESTURE_MODEL_VERSION = _model_version(GESTURE_MODEL_PATH)
 
 print("App starting — TF available:", TF_AVAILABLE)
 
 # -------------------- Helper: progress save/load --------------------
+_progress_cache = None
+_progress_cache_lock = threading.Lock()
+
+def get_progress_cache():
+    global _progress_cache
+    if _progress_cache is None:
+        with _progress_cache_lock:
+            if _progress_cache is None:
+                if PROGRESS_BACKEND == "json":
+                    store = open_progress_store("json", PROGRESS_FILE)
+                else:
+                    store = open_progress_store(PROGRESS_BACKEND, PROGRESS_DB, migrate_from=PROGRESS_FILE)
+                _progress_cache = ProgressCache(store, maxsize=PROGRESS_CACHE_SIZE,
+                                                flush_interval=PROGRESS_FLUSH_SECONDS, ttl=PROGRESS_CACHE_TTL)
+    return _progress_cache
+
+_user_registry = None
+_user_registry_lock = threading.Lock()
+
+def get_user_registry():
+    global _user_registry
+    if _user_registry is None:
+        with _user_registry_lock:
+            if _user_registry is None:
+                _user_registry = UserRegistry(USER_DB)
+    return _user_registry
+
 def load_progress():
-    if os.path.exists(PROGRESS_FILE):
-        with open(PROGRESS_FILE, 'r') as f:
-            return json.load(f)
-    return {"stars": 0, "badge_unlocked": False}
+    return get_progress_cache().get(GLOBAL_KEY) or {"stars": 0, "badge_unlocked": False}
 
 def save_progress(data):
-    with open(PROGRESS_FILE, 'w') as f:
-        json.dump(data, f)
+    get_progress_cache().put(GLOBAL_KEY, data)
 
 def save_user_progress(user_id, data):
-    if os.path.exists(PROGRESS_FILE):
-        with open(PROGRESS_FILE, 'r') as f:
-            all_progress = json.load(f)
-    else:
-        all_progress = {}
-    all_progress[user_id] = data
-    with open(PROGRESS_FILE, 'w') as f:
-        json.dump(all_progress, f, indent=4)
+    get_progress_cache().put(user_id, data)
 
 def load_user_progress(user_id):
-    if os.path.exists(PROGRESS_FILE):
-        with open(PROGRESS_FILE, 'r') as f:
-            all_progress = json.load(f)
-        return all_progress.get(user_id, {})
-    return {}
+    return get_progress_cache().get(user_id, {})
+
+def add_stars(user_id, count=1):
+    # coalesced in the cache; the badge unlocks once BADGE_STARS are earned
+    cache = get_progress_cache()
+    stars = cache.increment(user_id, "stars", count)
+    if stars >= BADGE_STARS and not cache.get(user_id, {}).get("badge_unlocked"):
+        cache.set_fields(user_id, badge_unlocked=True)
+    return stars
 
 # -------------------- Flask app --------------------
 app = Flask(__name__)
 CORS(app)
 app.secret_key = os.environ.get("FLASK_SECRET", "supersecretkey")
 app.permanent_session_lifetime = timedelta(days=1)
+# per-route request count / latency / payload size, served with stage timings at GET /metrics
+metrics.init_app(app)
 
 # -------------------- Camera control (safe for cloud) --------------------
 # Set environment variable USE_CAMERA=true (or "1") on local machine to enable webcam.
 # On Render (or any server) leave it unset or set to false.
 USE_CAMERA = os.environ.get("USE_CAMERA", "false").lower() in ("1", "true", "yes")
+# CAMERA_SOURCE: webcam index (default 0), a video file path, or "synthetic" (generated test frames)
+CAMERA_SOURCE = os.environ.get("CAMERA_SOURCE", "0")
 
 camera = None
 if USE_CAMERA:
     try:
-        camera = cv2.VideoCapture(0)
+        if CAMERA_SOURCE == "synthetic":
+            camera = SyntheticSource()
+        else:
+            camera = cv2.VideoCapture(int(CAMERA_SOURCE) if CAMERA_SOURCE.isdigit() else CAMERA_SOURCE)
         if not camera.isOpened():
             print("Warning: camera could not be opened.")
             camera = None
@@ -112,85 +212,235 @@ else:
 @atexit.register
 def _release_camera():
     try:
+        if _broadcaster is not None:
+            _broadcaster.stop()
         if camera is not None:
             camera.release()
             print("Camera released at exit.")
     except Exception:
         pass
 
+# -------------------- Page rendering cache --------------------
+# Pages are rendered once per (template, path, variant) and served from memory.
+# Fixed pages also get an ETag + Cache-Control so browsers revalidate with a 304.
+PAGE_MAX_AGE = int(os.environ.get("PAGE_MAX_AGE", "300"))
+RENDER_CACHE_SIZE = 4096
+_render_cache = {}
+_render_cache_lock = threading.Lock()
+
+def cached_render(template, variant=(), **context):
+    # variant: hashable key identifying `context` (e.g. a question-bank round index)
+    key = (template, request.path, variant)
+    hit = _render_cache.get(key)
+    if hit is None:
+        html = render_template(template, **context)
+        hit = (html, hashlib.blake2b(html.encode('utf-8'), digest_size=12).hexdigest())
+        with _render_cache_lock:
+            if len(_render_cache) >= RENDER_CACHE_SIZE:
+                _render_cache.clear()
+            _render_cache[key] = hit
+    return hit
+
+def static_page(template, **context):
+    html, etag = cached_render(template, **context)
+    resp = Response(html, mimetype='text/html')
+    resp.set_etag(etag)
+    resp.cache_control.public = True
+    resp.cache_control.max_age = PAGE_MAX_AGE
+    return resp.make_conditional(request)
+
 # -------------------- Memory-Matching and other pages ----------------------------
 @app.route("/games/memory")
 def memory_game():
-    return render_template("memory_game.html")
+    return static_page("memory_game.html")
 
 @app.route("/games/simon-says")
 def simon_says():
-    return render_template("simon_says.html")
+    return static_page("simon_says.html")
+
+# -------------------- Result cache --------------------
+# /api/recognize and /gesture_control results keyed by a hash of the raw payload
+# (before decoding) and the shape index / model version; RESULT_CACHE_DIR (e.g.
+# under /dev/shm) shares them between gunicorn workers. RESULT_CACHE_SIZE=0 disables.
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "1024"))
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", "300"))
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", "")
+result_cache = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL, RESULT_CACHE_DIR)
 
 # -------------------- Utility: base64 -> cv2 image --------------------
-def b64_to_cv2(img_b64):
-    if ',' in img_b64:
-        header, encoded = img_b64.split(',', 1)
-    else:
-        encoded = img_b64
-    data = base64.b64decode(encoded)
-    arr = np.frombuffer(data, np.uint8)
-    img = cv2.imdecode(arr, cv2.IMREAD_UNCHANGED)
-    if img is None:
-        raise ValueError("Could not decode image")
-    if img.ndim == 3 and img.shape[2] == 4:
-        img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-    return img
+def b64_to_cv2(img_b64, target_size=None):
+    # BGR uint8; size-checked before decoding (MAX_IMAGE_BYTES), see image_decode.py
+    with metrics.stage("decode"):
+        return decode_b64_image(img_b64, target_size=target_size)
 
 # -------------------- Simple gesture-prediction stub --------------------
 class_labels = ['one', 'two', 'three', 'four', 'thumbs_down', 'stop', 'nothing']
 
+def _predict_gesture_batch(batch):
+    # batch: (B, 100, 100, 3) float32 -> list of B labels
+    model = get_gesture_model()
+    with metrics.stage("predict"):
+        preds = model.predict(batch, verbose=0)
+    labels = getattr(model, "class_labels", None) or class_labels
+    return [labels[i] for i in np.argmax(preds, axis=1)]
+
+gesture_batcher = MicroBatcher(_predict_gesture_batch, max_batch=PREDICT_MAX_BATCH,
+                               max_wait_ms=PREDICT_MAX_WAIT_MS, name="gesture-batcher")
+
 def predict_gesture(frame):
     # frame: BGR image (numpy)
-    if model is None:
+    if get_gesture_model() is None:
         return 'nothing'
     img = cv2.resize(frame, (100, 100))
     img = img.astype('float32') / 255.0
-    img = np.expand_dims(img, axis=0)
-    preds = model.predict(img)
-    gesture = class_labels[np.argmax(preds)]
-    return gesture
+    return gesture_batcher.predict(img)
+
+# -------------------- Landmark store + classifier (pure NumPy) --------------------
+_landmark_store = None
+_landmark_store_lock = threading.Lock()
+
+def get_landmark_store():
+    global _landmark_store
+    if _landmark_store is None:
+        with _landmark_store_lock:
+            if _landmark_store is None:
+                store = LandmarkStore(LANDMARK_STORE_DIR)
+                imported = convert_json_tree(DATA_DIR, store, once=True)
+                if imported:
+                    print(f"Imported {imported} landmark samples from {DATA_DIR} into {LANDMARK_STORE_DIR}")
+                _landmark_store = store
+    return _landmark_store
+
+_landmark_slot = None
+_landmark_retrainer = None
+_landmark_classifier_lock = threading.Lock()
+
+def get_landmark_classifier():
+    # Load the exported .npz if present, otherwise fit from the landmark store on first use.
+    # The slot swaps in newer versions of the file (written by the retrainer in any worker).
+    global _landmark_slot, _landmark_retrainer
+    if _landmark_slot is None:
+        with _landmark_classifier_lock:
+            if _landmark_slot is None:
+                if os.path.exists(LANDMARK_MODEL_PATH):
+                    clf = LandmarkClassifier.load(LANDMARK_MODEL_PATH)
+                else:
+                    X, y, _ = get_landmark_store().read()
+                    try:
+                        clf = LandmarkClassifier.fit(X, y)
+                    except ValueError:  # no valid samples yet
+                        clf = None
+                if clf is not None:
+                    print("Landmark classifier ready:", list(clf.labels))
+                slot = ModelSlot(LANDMARK_MODEL_PATH, clf, check_interval=LANDMARK_RELOAD_SECONDS)
+                if LANDMARK_RETRAIN_SECONDS > 0:
+                    _landmark_retrainer = Retrainer(get_landmark_store(), LANDMARK_MODEL_PATH)
+                    _landmark_retrainer.start(LANDMARK_RETRAIN_SECONDS, slot)
+                _landmark_slot = slot
+    return _landmark_slot.get()
+
+def classify_landmarks(frames):
+    # frames: (N, 21, 3) float32 array -> list of N labels. The finger rules decide
+    # unless they see nothing or the trained classifier is confident (margin >= LANDMARK_MIN_MARGIN).
+    labels = gesture_rules.classify(frames).astype(object)
+    clf = get_landmark_classifier()
+    if clf is not None:
+        learned, _, margin = clf.predict_with_margin(frames)
+        override = (learned != UNKNOWN_LABEL) & ((labels == UNKNOWN_LABEL) | (margin >= LANDMARK_MIN_MARGIN))
+        labels[override] = learned[override]
+    return labels.tolist()
+
+def classify_stream(batches, labels, save_label=None, errors=None):
+    # Classify (first_index, frames, valid) batches into `labels` (None for unparseable,
+    # non-finite or degenerate frames, reported in `errors`). With save_label the usable
+    # frames are kept and appended in one go once the whole body has been read, so a
+    # stream that fails halfway stores nothing. Returns frames saved.
+    keep = []
+    for first, frames, valid in batches:
+        usable = valid & gesture_rules.valid_rows(frames)
+        if errors is not None:
+            errors.extend({"frame": first + int(i), "error": "non-finite or degenerate hand"}
+                          for i in np.flatnonzero(valid & ~usable))
+        batch_labels = classify_landmarks(frames)
+        labels.extend(label if ok else None for label, ok in zip(batch_labels, usable))
+        if save_label and usable.any():
+            keep.append(np.array(frames[usable]))
+    if not keep:
+        return 0
+    return len(get_landmark_store().append(np.concatenate(keep), save_label))
 
 # -------------------- Video feed generator --------------------
-def gen_frames():
+def make_gesture_tracker():
+    return GestureTracker(predict_gesture, every=GESTURE_EVERY_N, motion_threshold=GESTURE_MOTION_THRESHOLD,
+                          window=GESTURE_VOTE_WINDOW, switch_votes=GESTURE_SWITCH_VOTES)
+
+def annotate_frame(frame, tracker=None):
+    # per-frame work, run once by the capture thread no matter how many viewers
+    frame = cv2.flip(frame, 1)
+    gesture = tracker.update(frame) if tracker is not None else predict_gesture(frame)
+    cv2.putText(frame, f'Gesture: {gesture}', (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0), 2)
+    return frame
+
+_broadcaster = None
+_gesture_tracker = None
+_broadcaster_lock = threading.Lock()
+
+def get_broadcaster():
+    global _broadcaster, _gesture_tracker
+    if _broadcaster is None and camera is not None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                _gesture_tracker = make_gesture_tracker()
+                _broadcaster = FrameBroadcaster(camera, process=lambda frame: annotate_frame(frame, _gesture_tracker),
+                                                max_fps=STREAM_MAX_FPS)
+    return _broadcaster
+
+_blank_frame = blank_frame('Camera disabled on server')
+_blank_encoders = EncoderPool()
+
+def gen_frames(quality=None, width=None, fps=None):
+    # quality / width / fps: this client's stream profile (see stream_encoder.py)
+    quality, width, fps = stream_params(quality, width, fps)
     # If no camera (e.g., running on Render), provide a stable blank frame so endpoint works.
     if camera is None:
-        blank = np.zeros((480, 640, 3), dtype=np.uint8)
-        cv2.putText(blank, 'Camera disabled on server', (10, 240), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,255), 2)
-        ret, buffer = cv2.imencode('.jpg', blank)
-        frame_bytes = buffer.tobytes()
-        while True:
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-    # Camera is available (local/dev)
-    while True:
-        success, frame = camera.read()
-        if not success:
-            # If camera failed mid-run, yield a blank frame to keep stream alive
-            blank = np.zeros((480, 640, 3), dtype=np.uint8)
-            cv2.putText(blank, 'Camera read failed', (10, 240), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255,255,255), 2)
-            ret, buffer = cv2.imencode('.jpg', blank)
-            frame_bytes = buffer.tobytes()
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-            continue
-        frame = cv2.flip(frame, 1)
-        gesture = predict_gesture(frame)
-        cv2.putText(frame, f'Gesture: {gesture}', (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0), 2)
-        ret, buffer = cv2.imencode('.jpg', frame)
-        frame_bytes = buffer.tobytes()
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+        # encoded once per profile, re-sent at most once a second (sleeping also
+        # yields to other greenlets under gevent)
+        yield from static_stream(_blank_frame, _blank_encoders.get(quality, width), min(fps, 1.0))
+        return
+    # Camera is available (local/dev): all viewers share one capture/inference thread
+    yield from get_broadcaster().stream(quality, width, fps)
 
 # -------------------- Shape recognition endpoints --------------------
+SHAPE_BATCH_MAX = int(os.environ.get("SHAPE_BATCH_MAX", "64"))
+# samples saved through another worker are picked up within SHAPE_INDEX_RELOAD_SECONDS (0 = never)
+SHAPE_INDEX_RELOAD_SECONDS = float(os.environ.get("SHAPE_INDEX_RELOAD_SECONDS", "5"))
+_shape_index = None
+_shape_index_lock = threading.Lock()
+_shape_index_next_sync = 0.0
+
+def get_shape_index():
+    # Descriptor index over shape_dataset/, built on first use and updated by /api/save_sample;
+    # every SHAPE_INDEX_RELOAD_SECONDS the changed label folders are re-listed for new files
+    global _shape_index, _shape_index_next_sync
+    if _shape_index is None:
+        with _shape_index_lock:
+            if _shape_index is None:
+                _shape_index = ShapeIndex.build_from_dir(SHAPE_DATA_DIR)
+                _shape_index_next_sync = time.monotonic() + SHAPE_INDEX_RELOAD_SECONDS
+                print(f"Shape index: {len(_shape_index)} samples in {_shape_index.build_seconds:.3f}s")
+    elif (SHAPE_INDEX_RELOAD_SECONDS > 0 and time.monotonic() >= _shape_index_next_sync
+          and _shape_index_lock.acquire(blocking=False)):
+        # the first caller to notice does the sync; everyone else uses the index as is
+        try:
+            _shape_index_next_sync = time.monotonic() + SHAPE_INDEX_RELOAD_SECONDS
+            _shape_index.sync_dir(SHAPE_DATA_DIR)
+        finally:
+            _shape_index_lock.release()
+    return _shape_index
+
 @app.route('/sketch')
 def sketch():
-    return render_template('sketch.html')
+    return static_page('sketch.html')
 
 @app.route('/api/save_sample', methods=['POST'])
 def save_shape_sample():
@@ -203,12 +453,23 @@ def save_shape_sample():
     os.makedirs(folder, exist_ok=True)
     try:
         img = b64_to_cv2(img_b64)
+    except PayloadTooLarge as e:
+        return jsonify({'error': 'image too large', 'detail': str(e)}), 413
     except Exception as e:
         return jsonify({'error': 'bad image', 'detail': str(e)}), 400
     fname = f"{label}_{random.randint(1000,9999)}.png"
     path = os.path.join(folder, fname)
-    cv2.imwrite(path, img)
-    return jsonify({'path': path})
+    # index the new sample in place instead of rebuilding from disk; its path is claimed
+    # before the file exists so this worker's sync_dir never adds it a second time
+    indexed = get_shape_index().add_image(img, label, path=path)
+    ok, buf = cv2.imencode('.png', img)
+    if not ok:
+        return jsonify({'error': 'could not encode image'}), 500
+    # write-then-rename: other workers' sync_dir never reads a half-written file
+    with open(path + '.part', 'wb') as f:
+        f.write(buf.tobytes())
+    os.replace(path + '.part', path)
+    return jsonify({'path': path, 'indexed': indexed})
 
 @app.route('/api/recognize', methods=['POST'])
 def recognize_shape():
@@ -216,70 +477,139 @@ def recognize_shape():
     img_b64 = data.get('image')
     if not img_b64:
         return jsonify({'error': 'no image provided'}), 400
-    try:
-        img = b64_to_cv2(img_b64)
-    except Exception as e:
-        return jsonify({'error': 'bad image', 'detail': str(e)}), 400
-
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    blur = cv2.GaussianBlur(gray, (7,7), 0)
-    _, th = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-
-    contours, _ = cv2.findContours(th, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    if not contours:
-        return jsonify({})
-
-    c = max(contours, key=cv2.contourArea)
-    area = cv2.contourArea(c)
-    if area < 1000:
-        return jsonify({})
-
-    H, W = img.shape[:2]
-    x,y,w,h = cv2.boundingRect(c)
-    norm_x, norm_y, norm_w, norm_h = x/W, y/H, w/W, h/H
-
-    peri = cv2.arcLength(c, True)
-    approx = cv2.approxPolyDP(c, 0.03 * peri, True)
-
-    shape = 'unknown'
-    params = {}
-
-    circularity = (4 * np.pi * area) / (peri*peri + 1e-9)
-
-    if len(approx) == 3:
-        shape = 'triangle'
-        pts = approx.reshape(-1,2).tolist()
-        params['points'] = [{'x': p[0]/W, 'y': p[1]/H} for p in pts]
-    elif len(approx) == 4:
-        ar = w / float(h)
-        shape = 'square' if 0.9 <= ar <= 1.1 else 'rectangle'
-        params = {'x': norm_x, 'y': norm_y, 'w': norm_w, 'h': norm_h}
-    else:
-        if circularity > 0.6:
-            shape = 'circle'
-            (cx,cy), radius = cv2.minEnclosingCircle(c)
-            params = {'cx': cx/W, 'cy': cy/H, 'r': radius / max(W,H)}
-        else:
-            if len(approx) > 4 and len(approx) < 10:
-                shape = 'polygon'
-                params = {'x': norm_x, 'y': norm_y, 'w': norm_w, 'h': norm_h}
-            else:
-                shape = 'unknown'
-
-    return jsonify({'shape': shape, 'params': params})
+    index = get_shape_index()
+    # a resubmitted sketch is answered from the cache; a new sample changes the index
+    # digest and so the key (the digest, unlike index.version, agrees across workers)
+    key = result_cache.key(img_b64, 'recognize', index.digest)
+    result = result_cache.get(key)
+    if result is None:
+        try:
+            img = b64_to_cv2(img_b64)
+        except PayloadTooLarge as e:
+            return jsonify({'error': 'image too large', 'detail': str(e)}), 413
+        except Exception as e:
+            return jsonify({'error': 'bad image', 'detail': str(e)}), 400
+        result = recognize_many([img], index)[0]
+        result_cache.put(key, result)
+    return jsonify(result)
+
+@app.route('/api/recognize/batch', methods=['POST'])
+def recognize_shape_batch():
+    """
+    Accepts JSON: {"images": ["data:image/png;base64,...", ...]}
+    Returns {"results": [...]} in input order; undecodable entries get {"error": ...}.
+    """
+    data = request.get_json() or {}
+    images = data.get('images')
+    if not isinstance(images, list) or not images:
+        return jsonify({'error': 'no images provided'}), 400
+    if len(images) > SHAPE_BATCH_MAX:
+        return jsonify({'error': f'at most {SHAPE_BATCH_MAX} images per request'}), 413
+    decoded, slots, results = [], [], [None] * len(images)
+    for i, img_b64 in enumerate(images):
+        try:
+            decoded.append(b64_to_cv2(img_b64))
+            slots.append(i)
+        except Exception as e:
+            results[i] = {'error': 'bad image', 'detail': str(e)}
+    for i, result in zip(slots, recognize_many(decoded, get_shape_index())):
+        results[i] = result
+    return jsonify({'results': results, 'count': len(results)})
 
 # -------------------- Other app endpoints --------------------
 @app.route('/api/meta', methods=['GET'])
 def meta():
     return jsonify({"project":"Gesture Learning Demo","version":"1.0","status":"running"})
 
-users = []
+@app.route('/api/stats', methods=['GET'])
+def stats():
+    return jsonify({
+        "gesture_batcher": gesture_batcher.stats(),
+        "progress_cache": get_progress_cache().stats(),
+        "shape_index": get_shape_index().stats(),
+        "result_cache": result_cache.stats(),
+        "landmark_model": _landmark_slot.stats() if _landmark_slot is not None else None,
+        "landmark_retrain": _landmark_retrainer.stats() if _landmark_retrainer is not None else None,
+        "camera": get_broadcaster().stats() if camera is not None else None,
+        "gesture_tracker": _gesture_tracker.stats() if _gesture_tracker is not None else None,
+        "startup": startup_report(),
+    })
+
+def user_token(user_id):
+    # bearer secret for /api/session, derived from the app secret (nothing extra stored)
+    return hmac.new(app.secret_key.encode('utf-8'), f"user:{user_id}".encode('utf-8'), hashlib.sha256).hexdigest()[:32]
+
+def with_token(user):
+    return dict(user, token=user_token(user['id']))
+
 @app.route('/api/user', methods=['POST'])
 def create_user():
+    # registers a user and makes them the session's current user; the reply carries
+    # the token a later /api/session call needs to switch back to this user
+    data = request.get_json() or {}
+    try:
+        user = get_user_registry().create(data.get('name'), data.get('age'), data.get('classroom'))
+    except ValueError as e:
+        return jsonify({"error": "bad user", "detail": str(e)}), 400
+    session['user_id'] = user['id']
+    return jsonify(with_token(user))
+
+@app.route('/api/user/<int:user_id>', methods=['GET'])
+def get_user(user_id):
+    user = get_user_registry().get(user_id)
+    if user is None:
+        return jsonify({"error": "unknown user"}), 404
+    return jsonify(user)
+
+@app.route('/api/users', methods=['GET'])
+def find_users():
+    # ?name=... (case-insensitive) or ?classroom=...
+    registry = get_user_registry()
+    if request.args.get('name'):
+        found = registry.find_by_name(request.args['name'])
+    elif request.args.get('classroom'):
+        found = registry.find_by_classroom(request.args['classroom'])
+    else:
+        return jsonify({"error": "name or classroom required"}), 400
+    return jsonify({"users": found, "count": len(found)})
+
+@app.route('/api/users/import', methods=['POST'])
+def import_users():
+    """
+    Bulk registration, all or nothing:
+    - JSON {"users": [{"name", "age"?, "classroom"?}, ...], "classroom": "..."} (default classroom) or
+    - text/csv with a header row (name,age,classroom)
+    """
+    if request.mimetype == 'text/csv':
+        rows = list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+        default_classroom = request.args.get('classroom')
+    else:
+        data = request.get_json(silent=True) or {}
+        rows, default_classroom = data.get('users'), data.get('classroom')
+    if not isinstance(rows, list) or not rows:
+        return jsonify({"error": "no users provided"}), 400
+    if len(rows) > USER_IMPORT_MAX:
+        return jsonify({"error": f"at most {USER_IMPORT_MAX} users per import"}), 413
+    if default_classroom:
+        rows = [dict(r, classroom=r.get('classroom') or default_classroom) if isinstance(r, dict) else r
+                for r in rows]
+    try:
+        created = get_user_registry().create_many(rows)
+    except ValueError as e:
+        return jsonify({"error": "bad user", "detail": str(e)}), 400
+    return jsonify({"users": [with_token(u) for u in created], "created": len(created)})
+
+@app.route('/api/session', methods=['POST'])
+def select_user():
+    # {"user_id": n, "token": "..."} switches the session to an existing registered user;
+    # the token comes from /api/user or /api/users/import, so knowing an id is not enough
     data = request.get_json() or {}
-    user_id = len(users) + 1
-    user = {"id": user_id, "name": data.get("name"), "age": data.get("age")}
-    users.append(user)
+    user = get_user_registry().get(data.get('user_id'))
+    if user is None:
+        return jsonify({"error": "unknown user"}), 404
+    if not hmac.compare_digest(str(data.get('token') or ''), user_token(user['id'])):
+        return jsonify({"error": "invalid token"}), 403
+    session['user_id'] = user['id']
     return jsonify(user)
 
 @app.route('/api/gesture/predict', methods=['POST'])
@@ -287,22 +617,31 @@ def gesture_predict():
     """
     Accepts JSON:
     - {"label": "thumbs_up"}  OR
-    - {"landmarks": [...]}  OR
+    - {"landmarks": [...]}  (21 {x,y,z} points, 21 triples or 63 floats)  OR
+    - {"frames": [[...], [...]]}  (batch of landmark frames, one call)  OR
     - (if client sends images) {"image": "data:image/png;base64,..."}  (not used here)
-    Returns JSON: { "label": "...", "source": "client" } or processed result.
+    Returns JSON: { "label": "...", "source": "server" | "client" } or {"labels": [...]} for batches.
     """
     data = request.get_json() or {}
+    # Landmarks (single frame or a batch under "frames") are classified server-side
+    if 'landmarks' in data or 'frames' in data:
+        try:
+            frames = parse_landmarks(data.get('frames', data.get('landmarks')))
+        except ValueError as e:
+            return jsonify({"error": "bad landmarks", "detail": str(e)}), 400
+        labels = classify_landmarks(frames)
+        if 'frames' in data:
+            return jsonify({"labels": labels, "count": len(labels), "source": "server"})
+        result = {"label": labels[0], "landmark_count": int(frames.shape[1]),
+                  "fingers": int(gesture_rules.count_fingers(frames)[0]), "source": "server"}
+        if 'label' in data:
+            result["client_label"] = data['label']
+        return jsonify(result)
+
     # If client sent a precomputed label:
     if 'label' in data:
         return jsonify({"label": data['label'], "source": "client"})
 
-    # If client sent landmarks and you want server-side logic:
-    if 'landmarks' in data:
-        landmarks = data['landmarks']
-        # you could implement a classifier using landmarks here
-        # For now, return the raw landmarks as an acknowledgement:
-        return jsonify({"label": "from_landmarks", "landmark_count": len(landmarks), "source": "client_landmarks"})
-
     # Fallback if server has mediapipe and image processing is desired:
     if MP_AVAILABLE and 'image' in data:
         # (optional) decode image and run mediapipe server-side
@@ -311,6 +650,31 @@ def gesture_predict():
 
     return jsonify({"error": "no valid input provided"}), 400
 
+@app.route('/api/gesture/stream', methods=['POST'])
+def gesture_stream():
+    """
+    Bulk landmark ingestion: one request carries many frames and gets one label per frame back.
+    Body is newline-delimited JSON (Content-Type: application/x-ndjson, one frame per line)
+    or packed float32 frames (application/octet-stream, 63 values each), read incrementally.
+    Query: ?save=1&label=<name> also appends every valid frame to the landmark store,
+    only after the whole body parsed (a 400 means nothing was saved).
+    """
+    save_label = request.args.get('label') if request.args.get('save') in ('1', 'true', 'yes') else None
+    if request.args.get('save') and not save_label:
+        return jsonify({"error": "save requires a label"}), 400
+    labels, errors = [], []
+    try:
+        saved = classify_stream(iter_batches(request.stream, request.content_type, errors=errors),
+                                labels, save_label, errors)
+    except ValueError as e:
+        return jsonify({"error": "bad stream", "detail": str(e), "labels": labels, "saved": 0}), 400
+    result = {"labels": labels, "count": len(labels), "source": "server"}
+    if errors:
+        result["errors"] = errors
+    if save_label:
+        result["saved"] = saved
+    return jsonify(result)
+
 @app.route('/api/data/save', methods=['POST'])
 def save_data_landmarks():
     data = request.json or {}
@@ -318,23 +682,56 @@ def save_data_landmarks():
     landmarks = data.get('landmarks')
     if not label or not landmarks:
         return jsonify({"error": "Missing label or landmarks"}), 400
-    label_dir = os.path.join(DATA_DIR, label)
-    os.makedirs(label_dir, exist_ok=True)
-    existing_files = [f for f in os.listdir(label_dir) if f.endswith('.json')]
-    sample_id = len(existing_files) + 1
-    filepath = os.path.join(label_dir, f"sample_{sample_id}.json")
-    with open(filepath, 'w') as f:
-        json.dump({'landmarks': landmarks, 'label': label}, f)
-    return jsonify({'message': 'Sample saved', 'filepath': filepath}), 200
+    try:
+        frames = parse_landmarks(landmarks)
+    except ValueError as e:
+        return jsonify({"error": "bad landmarks", "detail": str(e)}), 400
+    invalid = np.flatnonzero(~gesture_rules.valid_rows(frames))
+    if len(invalid):  # NaN / inf / degenerate hands would end up in every fit
+        return jsonify({"error": "bad landmarks", "detail": "non-finite or degenerate hand",
+                        "frames": invalid.tolist()}), 400
+    sample_ids = get_landmark_store().append(frames, label)
+    return jsonify({'message': 'Sample saved', 'sample_id': sample_ids[0], 'count': len(sample_ids),
+                    'store': LANDMARK_STORE_DIR}), 200
+
+# Optional WebSocket variant of /api/gesture/stream (pip install flask-sock):
+# each text message is NDJSON frames, each binary message packed float32 frames;
+# the reply is {"labels": [...]} for that message.
+try:
+    from flask_sock import Sock
+    sock = Sock(app)
+except ImportError:
+    sock = None
+
+if sock is not None:
+    @sock.route('/ws/gesture')
+    def gesture_socket(ws):
+        while True:
+            message = ws.receive()
+            if message is None:
+                break
+            binary = isinstance(message, (bytes, bytearray))
+            body = io.BytesIO(message if binary else message.encode('utf-8'))
+            content_type = 'application/octet-stream' if binary else 'application/x-ndjson'
+            labels, errors = [], []
+            try:
+                classify_stream(iter_batches(body, content_type, errors=errors), labels, errors=errors)
+            except ValueError as e:
+                ws.send(json.dumps({"error": str(e)}))
+                continue
+            ws.send(json.dumps({"labels": labels, "errors": errors} if errors else {"labels": labels}))
 
 # Video feed endpoints
 @app.route('/')
 def index():
-    return render_template('home.html')
+    return static_page('home.html')
 
 @app.route('/video_feed')
 def video_feed():
-    return Response(gen_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    # optional ?quality=10-95&width=80-1920&fps=..STREAM_MAX_FPS per client
+    quality, width, fps = stream_params(request.args.get('quality'), request.args.get('width'),
+                                        request.args.get('fps'))
+    return Response(gen_frames(quality, width, fps), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 @app.route('/get_gesture')
 def get_gesture():
@@ -344,47 +741,55 @@ def get_gesture():
 def gesture_control_file():
     if 'frame' not in request.files:
         return jsonify({'error': 'No frame provided'}), 400
-    file = request.files['frame']
-    img = PILImage.open(file.stream).convert('RGB')
-    img = np.array(img)[:, :, ::-1]  # to BGR
-    gesture = predict_gesture(img)
+    try:
+        data = read_upload(request.files['frame'])
+    except PayloadTooLarge as e:
+        return jsonify({'error': 'image too large', 'detail': str(e)}), 413
+    # identical frames (a still camera, retries) skip decode and inference
+    key = result_cache.key(data, 'gesture', GESTURE_MODEL_VERSION)
+    gesture = result_cache.get(key)
+    if gesture is None:
+        try:
+            # decoded straight to BGR, at reduced resolution since the model only sees 100x100
+            with metrics.stage("decode"):
+                img = decode_image(data, target_size=(100, 100))
+        except ValueError as e:
+            return jsonify({'error': 'bad image', 'detail': str(e)}), 400
+        gesture = predict_gesture(img)
+        result_cache.put(key, gesture)
     return jsonify({'gesture': gesture})
 
 # -------------------- Math & emotion quiz endpoints --------------------
-if MP_AVAILABLE:
-    mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(
+def _build_hands(mp):
+    return mp.solutions.hands.Hands(
         static_image_mode=False,
         max_num_hands=1,
         min_detection_confidence=0.5
     )
-else:
-    mp_hands = None
-    hands = None
-    print("MediaPipe HANDS disabled on server (MP_AVAILABLE=False)")
+
+backends.register("mediapipe_hands", "mediapipe", init=_build_hands)
+
+def get_hands():
+    # MediaPipe Hands instance, built on first use (None if mediapipe is missing)
+    return backends.get("mediapipe_hands")
+
+_question_bank = None
+_question_bank_lock = threading.Lock()
+
+def get_question_bank():
+    # question_bank.json expanded into precomputed pools on first use
+    global _question_bank
+    if _question_bank is None:
+        with _question_bank_lock:
+            if _question_bank is None:
+                _question_bank = QuestionBank.load()
+                print("Question bank ready:", _question_bank.stats())
+    return _question_bank
 
 @app.route('/api/new_math_question')
 def new_math_question():
-    def generate_math_question():
-        num1 = random.randint(1, 10)
-        num2 = random.randint(1, 10)
-        operation = random.choice(['+', '-', '*'])
-        if operation == '+':
-            correct_answer = num1 + num2
-            question = f"What is {num1} + {num2}?"
-        elif operation == '-':
-            correct_answer = num1 - num2
-            question = f"What is {num1} - {num2}?"
-        else:
-            correct_answer = num1 * num2
-            question = f"What is {num1} * {num2}?"
-        options = [correct_answer,
-                   correct_answer + random.randint(1, 3),
-                   correct_answer - random.randint(1, 3),
-                   random.randint(1, 20)]
-        random.shuffle(options)
-        return {"question": question, "options": options, "correct_answer": correct_answer}
-    return jsonify(generate_math_question())
+    # optional ?difficulty=easy|medium|hard; options are always unique
+    return jsonify(get_question_bank().math_question(request.args.get('difficulty')))
 
 @app.route('/games/math_quiz')
 def math_quiz():
@@ -393,81 +798,133 @@ def math_quiz():
         'options': ['-','-','-','-'],
         'correct_answer': None
     }
-    return render_template('math_quiz.html', question=question)
+    return static_page('math_quiz.html', question=question)
 
 @app.route('/games/emotion-quiz')
 def quiz_alias():
     return redirect(url_for('emotion_quiz'))
 
+# Narration pre-rendered by generate_quiz_audio.py; clips are named by a hash of
+# their content, so they are cached by browsers for a year without revalidation.
+QUIZ_AUDIO_DIR = os.environ.get("QUIZ_AUDIO_DIR", os.path.join("static", "sounds", "emotion_quiz"))
+QUIZ_AUDIO_MAX_AGE = 365 * 24 * 3600
+_quiz_audio = (None, {})  # (manifest mtime, {question text: file name})
+
+def quiz_audio_file(text):
+    # manifest re-read only when the file changes (one stat per call)
+    global _quiz_audio
+    path = os.path.join(QUIZ_AUDIO_DIR, "manifest.json")
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    if mtime != _quiz_audio[0]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                entries = json.load(f).get("entries", {})
+        except (OSError, ValueError):
+            return None
+        _quiz_audio = (mtime, {t: e["file"] for t, e in entries.items() if "file" in e})
+    return _quiz_audio[1].get(text)
+
+@app.route('/audio/quiz/<path:filename>')
+def quiz_audio(filename):
+    resp = send_from_directory(QUIZ_AUDIO_DIR, filename, max_age=QUIZ_AUDIO_MAX_AGE)
+    resp.cache_control.public = True
+    resp.cache_control.immutable = True
+    return resp
+
 @app.route('/quiz/emotion')
 def emotion_quiz():
     if 'score' not in session:
         session['score'] = 0
-    questions = [
-        {"text": "Your friend gives you a surprise gift. How do you feel?", "image": "questions/happy_gift.png", "options": ["Sad","Angry","Happy","Scared"], "answer": "Happy"},
-        {"text": "You lost your toy at the park. How do you feel?", "image": "questions/lost_toy.png", "options": ["Excited","Surprised","Sad","Happy"], "answer": "Sad"},
-        {"text": "You are about to go on stage to perform. What might you feel?", "image": "questions/stage.png", "options": ["Scared","Excited","Sleepy","Bored"], "answer": "Scared"}
-    ]
-    question = random.choice(questions)
+    bank = get_question_bank()
+    idx = bank.emotion_index()
+    question = bank.emotion[idx]
     session['answer'] = question['answer']
-    return render_template('emotion_quiz.html', question=question, score=session['score'])
+    audio = quiz_audio_file(question['text'])
+    audio_url = url_for('quiz_audio', filename=audio) if audio else None
+    html, _ = cached_render('emotion_quiz.html', (idx, session['score'], audio_url), question=question,
+                            score=session['score'], audio_url=audio_url)
+    return html
 
 @app.route('/quiz/emotion/submit', methods=['POST'])
 def emotion_submit():
     answer = request.form.get('answer')
     if answer == session.get('answer'):
         session['score'] = session.get('score', 0) + 1
+        get_progress_cache().set_fields(current_user_id(), quiz_score=session['score'], last_activity="Emotion Quiz")
     return redirect(url_for('emotion_quiz'))
 
 # Additional page endpoints required by templates
 @app.route('/gesture')
 def gesture_page():
     try:
-        return render_template('gesture.html')
+        return static_page('gesture.html')
     except Exception:
         return "<h3>Gesture learning page coming soon.</h3><p>Visit /gesture_control or use the Sketch & Quizzes for hands-on practice.</p>"
 
+def current_user():
+    # the session's registered user (primary-key lookup), or None
+    user_id = session.get('user_id')
+    return get_user_registry().get(user_id) if user_id is not None else None
+
+def current_user_id():
+    # progress is keyed by registry id; visitors without a user share the legacy entry
+    user = current_user()
+    return str(user['id']) if user is not None else ANONYMOUS_USER
+
+@app.route('/api/progress', methods=['POST'])
+def update_progress():
+    """
+    Accepts JSON: {"stars": <to add>, "quiz_score": n, "last_activity": "..."} for the
+    session's user; a "user_id" other than that user's is refused.
+    Updates are applied in memory and flushed to the progress store in the background.
+    """
+    data = request.get_json() or {}
+    user_id = current_user_id()
+    if data.get('user_id') not in (None, '') and str(data['user_id']) != user_id:
+        return jsonify({"error": "can only update the session user's progress"}), 403
+    try:
+        stars = int(data.get('stars', 0))
+    except (TypeError, ValueError):
+        return jsonify({"error": "stars must be an integer"}), 400
+    if stars < 0:
+        return jsonify({"error": "stars must not be negative"}), 400
+    if stars:
+        add_stars(user_id, stars)
+    fields = {k: data[k] for k in ('quiz_score', 'last_activity') if k in data}
+    if fields:
+        get_progress_cache().set_fields(user_id, **fields)
+    return jsonify({"user_id": user_id, "progress": load_user_progress(user_id)})
+
 @app.route('/progress')
 def progress_page():
-    user_id = "child_1"
-    user_data = load_user_progress(user_id)
+    profile = current_user()
+    user_data = load_user_progress(str(profile['id']) if profile is not None else ANONYMOUS_USER)
     try:
-        return render_template('progress.html', user=user_data)
+        return render_template('progress.html', user=user_data, profile=profile)
     except Exception:
         return jsonify(user_data)
 
 @app.route('/games/face-match')
 def face_match():
-    items = [
-        {"image": "images/emotions/happy.png", "name": "Happy"},
-        {"image": "images/emotions/sad.png", "name": "Sad"},
-        {"image": "images/emotions/angry.png", "name": "Angry"},
-        {"image": "images/emotions/surprised.png", "name": "Surprised"}
-    ]
-    images = random.sample(items, len(items))
-    words = [item["name"] for item in images]
-    random.shuffle(words)
-    progress = load_progress()
+    bank = get_question_bank()
+    idx = bank.face_round_index()
+    images, words = bank.face_round(idx)
+    badge = bool(load_user_progress(current_user_id()).get("badge_unlocked", False))
     try:
-        return render_template('face_match.html', images=images, words=words, badge=progress.get("badge_unlocked", False))
+        return cached_render('face_match.html', (idx, badge), images=images, words=words, badge=badge)[0]
     except Exception:
-        return jsonify({"images": images, "words": words, "badge": progress.get("badge_unlocked", False)})
+        return jsonify({"images": images, "words": words, "badge": badge})
 
 @app.route('/games/color-match')
 def color_match():
-    colors = [
-        {"name": "Red", "code": "#FF0000"},
-        {"name": "Green", "code": "#00FF00"},
-        {"name": "Blue", "code": "#0000FF"},
-        {"name": "Yellow", "code": "#FFFF00"},
-        {"name": "Purple", "code": "#800080"},
-    ]
-    target_color = random.choice(colors)
-    options = random.sample(colors, 3)
-    if target_color not in options:
-        options[random.randint(0, 2)] = target_color
+    bank = get_question_bank()
+    idx = bank.color_round_index()
+    target_color, options = bank.color_round(idx)
     try:
-        return render_template('color_match.html', target=target_color, options=options)
+        return cached_render('color_match.html', idx, target=target_color, options=options)[0]
     except Exception:
         return jsonify({"target": target_color, "options": options})
 
@@ -478,17 +935,38 @@ def sketch_demo_redirect():
 @app.route('/games')
 def games():
     try:
-        return render_template('games.html')
+        return static_page('games.html')
     except Exception:
         return "<h3>Games</h3><p>Open /games/math_quiz, /quiz/emotion, /sketch etc.</p>"
 
 @app.route('/activities')
 def activities():
     try:
-        return render_template('activities.html')
+        return static_page('activities.html')
     except Exception:
         return "<h3>Activities</h3><p>Various activities will appear here.</p>"
 
+# -------------------- Startup / warm-up --------------------
+# PRELOAD_BACKENDS=all (or a comma list such as "gesture_model,mediapipe_hands")
+# loads and warms those backends at worker boot; see gunicorn.conf.py.
+PRELOAD_BACKENDS = os.environ.get("PRELOAD_BACKENDS", "")
+APP_IMPORT_SECONDS = time.perf_counter() - _APP_IMPORT_STARTED
+
+def preload_backends(names=None):
+    if names is None:
+        names = [n.strip() for n in PRELOAD_BACKENDS.split(",") if n.strip()]
+        if not names:
+            return startup_report()
+        if names == ["all"]:
+            names = None
+    backends.preload(names)
+    report = startup_report()
+    print("Startup report:", json.dumps(report))
+    return report
+
+def startup_report():
+    return {"app_import_seconds": APP_IMPORT_SECONDS, "backends": backends.timing_report()}
+
 # -------------------- Health endpoint --------------------
 @app.route('/health')
 def health():
@@ -0,0 +1,123 @@
+# backends.py
+# Lazy, on-demand loading of heavy optional backends (TensorFlow, MediaPipe).
+# Nothing is imported until an endpoint first asks for it; preload() can be
+# called from a gunicorn worker hook to pay the cost at boot instead.
+
+import importlib
+import importlib.util
+import threading
+import time
+
+
+class LazyBackend:
+    def __init__(self, name, module, init=None, warm_up=None):
+        """
+        name:    key used in reports and PRELOAD_BACKENDS
+        module:  top-level module to import (e.g. "tensorflow")
+        init:    callable(module) -> object built once after import (model, Hands(), ...)
+        warm_up: optional callable(obj) run once after init (e.g. a dummy predict)
+        """
+        self.name = name
+        self.module = module
+        self._init = init
+        self._warm_up = warm_up
+        self._lock = threading.Lock()
+        self._available = None
+        self.loaded = False
+        self.value = None
+        self.error = None
+        self.import_seconds = None
+        self.init_seconds = None
+        self.warm_up_seconds = None
+
+    def available(self):
+        # find_spec only locates the package, it does not import it
+        if self._available is None:
+            try:
+                self._available = importlib.util.find_spec(self.module) is not None
+            except (ImportError, ValueError):
+                self._available = False
+        return self._available
+
+    def get(self):
+        """Import and initialise on first call; returns None if the backend is unusable."""
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    self._load()
+        return self.value
+
+    def _load(self):
+        try:
+            if not self.available():
+                raise ImportError(f"{self.module} is not installed")
+            t0 = time.perf_counter()
+            mod = importlib.import_module(self.module)
+            self.import_seconds = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            self.value = self._init(mod) if self._init else mod
+            self.init_seconds = time.perf_counter() - t0
+            print(f"Backend '{self.name}' loaded: import {self.import_seconds:.2f}s, init {self.init_seconds:.2f}s")
+        except Exception as e:
+            self.value = None
+            self.error = str(e)
+            print(f"Backend '{self.name}' unavailable:", e)
+        self.loaded = True
+
+    def warm_up(self):
+        obj = self.get()
+        if obj is None or self._warm_up is None or self.warm_up_seconds is not None:
+            return
+        t0 = time.perf_counter()
+        try:
+            self._warm_up(obj)
+        except Exception as e:
+            print(f"Backend '{self.name}' warm-up failed:", e)
+        self.warm_up_seconds = time.perf_counter() - t0
+
+    def report(self):
+        return {
+            "module": self.module,
+            "available": self.available(),
+            "loaded": self.loaded,
+            "ok": self.loaded and self.value is not None,
+            "error": self.error,
+            "import_seconds": self.import_seconds,
+            "init_seconds": self.init_seconds,
+            "warm_up_seconds": self.warm_up_seconds,
+        }
+
+
+# -------------------- Registry --------------------
+_registry = {}
+
+
+def register(name, module, init=None, warm_up=None):
+    backend = LazyBackend(name, module, init=init, warm_up=warm_up)
+    _registry[name] = backend
+    return backend
+
+
+def get_backend(name):
+    return _registry[name]
+
+
+def get(name):
+    return _registry[name].get()
+
+
+def preload(names=None, warm_up=True):
+    """Load (and optionally warm up) the named backends, or all registered ones."""
+    for name in (names or list(_registry)):
+        backend = _registry.get(name)
+        if backend is None:
+            print(f"Unknown backend '{name}' in preload list")
+            continue
+        backend.get()
+        if warm_up:
+            backend.warm_up()
+    return timing_report()
+
+
+def timing_report():
+    return {name: backend.report() for name, backend in _registry.items()}
@@ -0,0 +1,95 @@
+# benchmarks/bench_decode.py
+# Micro-benchmark: old vs new image decode paths on gesture_dataset JPEGs.
+#
+#   python benchmarks/bench_decode.py [--limit 100] [--repeat 3]
+#
+# old b64   : base64 -> imdecode(IMREAD_UNCHANGED) -> BGRA2BGR check      (b64_to_cv2 before)
+# old upload: PIL open -> convert('RGB') -> np.array -> [:, :, ::-1]     (/gesture_control before)
+# new       : image_decode with target_size=(100, 100) (reduced JPEG decode)
+# Each path ends with the same cv2.resize to 100x100 that predict_gesture does.
+
+import argparse
+import base64
+import glob
+import io
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from PIL import Image as PILImage
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from image_decode import decode_b64_image, decode_image
+
+
+def old_b64(img_b64):
+    encoded = img_b64.split(',', 1)[1] if ',' in img_b64 else img_b64
+    arr = np.frombuffer(base64.b64decode(encoded), np.uint8)
+    img = cv2.imdecode(arr, cv2.IMREAD_UNCHANGED)
+    if img.ndim == 3 and img.shape[2] == 4:
+        img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+    return cv2.resize(img, (100, 100))
+
+
+def old_upload(data):
+    img = PILImage.open(io.BytesIO(data)).convert('RGB')
+    img = np.array(img)[:, :, ::-1]
+    return cv2.resize(img, (100, 100))
+
+
+def new_b64(img_b64):
+    return cv2.resize(decode_b64_image(img_b64, target_size=(100, 100)), (100, 100))
+
+
+def new_upload(data):
+    return cv2.resize(decode_image(data, target_size=(100, 100)), (100, 100))
+
+
+def run(fn, payloads, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for p in payloads:
+            fn(p)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(payloads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare old and new image decode paths")
+    parser.add_argument('--data', default=os.path.join(REPO_ROOT, 'gesture_dataset'))
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.data, '*', '*.jpg')))[:args.limit]
+    if not paths:
+        print(f"No JPEGs found under {args.data}")
+        return 1
+    raw = []
+    for p in paths:
+        with open(p, 'rb') as f:
+            raw.append(f.read())
+    urls = ['data:image/jpeg;base64,' + base64.b64encode(d).decode() for d in raw]
+
+    # same pixels in, comparable pixels out (reduced decode differs only by resampling)
+    diff = np.abs(old_b64(urls[0]).astype(int) - new_b64(urls[0]).astype(int)).mean()
+
+    rows = [
+        ('b64 data URL', run(old_b64, urls, args.repeat), run(new_b64, urls, args.repeat)),
+        ('file upload', run(old_upload, raw, args.repeat), run(new_upload, raw, args.repeat)),
+    ]
+    print(f"{len(paths)} images from {args.data} (mean abs pixel diff old/new: {diff:.2f})")
+    print(f"{'path':<14}{'old ms':>10}{'new ms':>10}{'speedup':>10}")
+    for name, old, new in rows:
+        print(f"{name:<14}{old * 1e3:>10.3f}{new * 1e3:>10.3f}{old / new:>9.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
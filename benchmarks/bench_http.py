@@ -0,0 +1,263 @@
+# benchmarks/bench_http.py
+# Offline load test of the HTTP / inference hot paths through Flask's test
+# client (no network, CPU only). Each scenario is driven by --concurrency
+# threads for --requests requests; throughput and p50/p95/p99 latency are
+# reported per scenario.
+#
+#   python benchmarks/bench_http.py                           # run all, print JSON
+#   python benchmarks/bench_http.py --save baselines/local.json
+#   python benchmarks/bench_http.py --compare baselines/local.json [--threshold 0.2]
+#   python benchmarks/bench_http.py --scenarios recognize gesture_predict
+#
+# --compare exits with status 1 when a scenario's p50/p95 latency grew, or its
+# throughput fell, by more than --threshold (a fraction) against the baseline.
+# Store / progress writes go to a temporary directory, never the working tree.
+
+import argparse
+import base64
+import glob
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+SHAPES = ('circle', 'square', 'triangle', 'rectangle')
+
+
+# -------------------- Payloads --------------------
+def _png_data_url(img):
+    ok, buf = cv2.imencode('.png', img)
+    return 'data:image/png;base64,' + base64.b64encode(buf.tobytes()).decode()
+
+
+def synthetic_sketch(shape, rng, size=300):
+    """White canvas with a hand-drawn-ish black outline, like the sketch pad sends."""
+    img = np.full((size, size, 3), 255, np.uint8)
+    c = size // 2 + rng.integers(-20, 21, 2)
+    r = int(rng.integers(50, 90))
+    if shape == 'circle':
+        cv2.circle(img, tuple(int(v) for v in c), r, (0, 0, 0), 6)
+    else:
+        if shape == 'triangle':
+            pts = [(c[0], c[1] - r), (c[0] - r, c[1] + r), (c[0] + r, c[1] + r)]
+        else:
+            w = r if shape == 'square' else int(r * 1.8)
+            pts = [(c[0] - w, c[1] - r), (c[0] + w, c[1] - r), (c[0] + w, c[1] + r), (c[0] - w, c[1] + r)]
+        pts = np.array(pts, np.int32) + rng.integers(-3, 4, (len(pts), 2)).astype(np.int32)
+        cv2.polylines(img, [pts], True, (0, 0, 0), 6)
+    return img
+
+
+def sketch_payloads(n=32, seed=0):
+    """Data URLs from shape_dataset/ if it has samples, otherwise generated sketches."""
+    paths = sorted(p for p in glob.glob(os.path.join(REPO_ROOT, 'shape_dataset', '*', '*'))
+                   if p.lower().endswith(('.png', '.jpg', '.jpeg')))
+    if paths:
+        return [_png_data_url(cv2.imread(p)) for p in paths[:n]]
+    rng = np.random.default_rng(seed)
+    return [_png_data_url(synthetic_sketch(SHAPES[i % len(SHAPES)], rng)) for i in range(n)]
+
+
+def gesture_jpegs(n=32):
+    paths = sorted(glob.glob(os.path.join(REPO_ROOT, 'gesture_dataset', '*', '*.jpg')))[:n]
+    out = []
+    for p in paths:
+        with open(p, 'rb') as f:
+            out.append(f.read())
+    if not out:
+        ok, buf = cv2.imencode('.jpg', np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8))
+        out.append(buf.tobytes())
+    return out
+
+
+def landmark_frames():
+    from landmark_store import load_samples
+    X, _ = load_samples(os.path.join(REPO_ROOT, 'collected_data'))
+    if len(X) == 0:
+        X = np.random.default_rng(0).random((8, 21, 3), dtype=np.float32)
+    return [x.reshape(-1).round(5).tolist() for x in X]
+
+
+# -------------------- Scenarios --------------------
+def build_scenarios():
+    """name -> callable(client, i) issuing one request and returning the response."""
+    sketches = sketch_payloads()
+    jpegs = gesture_jpegs()
+    frames = landmark_frames()
+
+    def recognize(client, i):
+        return client.post('/api/recognize', json={'image': sketches[i % len(sketches)]})
+
+    def gesture_control(client, i):
+        data = {'frame': (io.BytesIO(jpegs[i % len(jpegs)]), 'frame.jpg')}
+        return client.post('/gesture_control', data=data, content_type='multipart/form-data')
+
+    def gesture_predict(client, i):
+        return client.post('/api/gesture/predict', json={'landmarks': frames[i % len(frames)]})
+
+    def data_save(client, i):
+        return client.post('/api/data/save', json={'label': 'bench', 'landmarks': frames[i % len(frames)]})
+
+    def progress_write(client, i):
+        return client.post('/api/progress', json={'stars': 1, 'last_activity': 'bench'})
+
+    def progress_read(client, i):
+        return client.get('/progress')
+
+    return {
+        'recognize': recognize,
+        'gesture_control': gesture_control,
+        'gesture_predict': gesture_predict,
+        'data_save': data_save,
+        'progress_write': progress_write,
+        'progress_read': progress_read,
+    }
+
+
+# -------------------- Load generator --------------------
+def percentile_ms(latencies, q):
+    return float(np.percentile(latencies, q) * 1000.0) if len(latencies) else 0.0
+
+
+def run_scenario(app, fn, requests=200, concurrency=4, warmup=5):
+    """Drive fn with `concurrency` threads (one test client each) for `requests` calls."""
+    with app.test_client() as client:
+        for i in range(warmup):
+            fn(client, i)
+    counter = iter(range(requests))
+    lock = threading.Lock()
+    latencies, errors = [], [0]
+
+    def worker():
+        with app.test_client() as client:
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                t0 = time.perf_counter()
+                res = fn(client, i)
+                elapsed = time.perf_counter() - t0
+                with lock:
+                    latencies.append(elapsed)
+                    if res.status_code >= 400:
+                        errors[0] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(max(1, concurrency))]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    lat = np.asarray(latencies)
+    return {
+        'requests': len(lat),
+        'errors': errors[0],
+        'rps': len(lat) / wall if wall else 0.0,
+        'mean_ms': float(lat.mean() * 1000.0) if len(lat) else 0.0,
+        'p50_ms': percentile_ms(lat, 50),
+        'p95_ms': percentile_ms(lat, 95),
+        'p99_ms': percentile_ms(lat, 99),
+    }
+
+
+def compare(current, baseline, threshold=0.2):
+    """List of human-readable regressions (empty when everything is within threshold)."""
+    problems = []
+    for name, cur in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        for key in ('p50_ms', 'p95_ms'):
+            if base[key] > 0 and cur[key] > base[key] * (1 + threshold):
+                problems.append(f"{name}: {key} {base[key]:.2f} -> {cur[key]:.2f} "
+                                f"(+{(cur[key] / base[key] - 1) * 100:.0f}%)")
+        if base['rps'] > 0 and cur['rps'] < base['rps'] * (1 - threshold):
+            problems.append(f"{name}: rps {base['rps']:.1f} -> {cur['rps']:.1f} "
+                            f"({(cur['rps'] / base['rps'] - 1) * 100:.0f}%)")
+        if cur['errors'] > base.get('errors', 0):
+            problems.append(f"{name}: errors {base.get('errors', 0)} -> {cur['errors']}")
+    return problems
+
+
+def load_app(workdir):
+    # keep every write the scenarios make out of the working tree
+    os.environ.setdefault('PROGRESS_DB', os.path.join(workdir, 'progress.db'))
+    os.environ.setdefault('PROGRESS_FILE', os.path.join(workdir, 'progress.json'))
+    os.environ.setdefault('USER_DB', os.path.join(workdir, 'users.db'))
+    os.environ.setdefault('LANDMARK_STORE_DIR', os.path.join(workdir, 'landmark_store'))
+    os.environ.setdefault('LANDMARK_MODEL_PATH', os.path.join(workdir, 'landmark_classifier.npz'))
+    # payloads repeat every few requests; measure decode + inference, not result-cache hits
+    os.environ.setdefault('RESULT_CACHE_SIZE', '0')
+    os.chdir(REPO_ROOT)
+    from app import app
+    app.testing = True
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP / inference load test (offline, CPU)")
+    parser.add_argument('--scenarios', nargs='*', help="subset to run (default: all)")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--save', help="write results as a JSON baseline")
+    parser.add_argument('--compare', help="baseline JSON to check against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed regression fraction")
+    args = parser.parse_args()
+    # the app resolves its data directories relative to the repo root
+    save = os.path.abspath(args.save) if args.save else None
+    baseline = os.path.abspath(args.compare) if args.compare else None
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = load_app(workdir)
+        scenarios = build_scenarios()
+        names = args.scenarios or list(scenarios)
+        unknown = set(names) - set(scenarios)
+        if unknown:
+            parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+        results = {}
+        for name in names:
+            results[name] = run_scenario(app, scenarios[name], args.requests, args.concurrency)
+            print(f"{name:16s} {results[name]['rps']:8.1f} req/s  p50 {results[name]['p50_ms']:7.2f} ms  "
+                  f"p95 {results[name]['p95_ms']:7.2f} ms  p99 {results[name]['p99_ms']:7.2f} ms", file=sys.stderr)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+        },
+        'results': results,
+    }
+    if save:
+        os.makedirs(os.path.dirname(save), exist_ok=True)
+        with open(save, 'w') as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+    if baseline:
+        with open(baseline) as f:
+            problems = compare(report, json.load(f), args.threshold)
+        for line in problems:
+            print("REGRESSION", line, file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,223 @@
+# camera_stream.py
+# Single-producer camera capture with fan-out to any number of MJPEG clients.
+#
+# One background thread reads the source (at most max_fps), runs the per-frame
+# work (inference, overlay) and publishes the result into a small ring buffer.
+# Each /video_feed client waits for the newest frame after the one it last
+# sent, so slow clients skip stale frames instead of queueing them. JPEG
+# encoding happens once per frame per (quality, width) profile in use, see
+# stream_encoder.py, so capture/inference/encode cost does not grow with the
+# number of viewers.
+
+import threading
+import time
+from collections import deque, namedtuple
+
+import cv2
+import numpy as np
+
+from stream_encoder import DEFAULT_QUALITY, EncoderPool, paced
+
+Frame = namedtuple("Frame", "seq image timestamp")
+
+
+def cooperative(fn):
+    """
+    Under gevent (WORKER_MODE=gevent) the capture "thread" is a greenlet, and a
+    blocking camera read would stall every other request in the worker; run
+    such calls on gevent's native thread pool instead. Only for plain blocking
+    I/O: fn must not touch (monkey-patched) locks, queues or futures.
+    """
+    try:
+        from gevent import monkey
+    except ImportError:
+        return fn
+    if not monkey.is_module_patched("threading"):
+        return fn
+    import gevent
+    return lambda *args: gevent.get_hub().threadpool.apply(fn, args)
+
+
+def blank_frame(message, size=(640, 480)):
+    w, h = size
+    img = np.zeros((h, w, 3), dtype=np.uint8)
+    cv2.putText(img, message, (10, h // 2), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    return img
+
+
+class SyntheticSource:
+    """cv2.VideoCapture stand-in for tests/demos: a moving square at a fixed fps."""
+
+    def __init__(self, size=(640, 480), fps=30.0, frames=None):
+        self.size = size
+        self.interval = 1.0 / fps if fps else 0.0
+        self.remaining = frames
+        self.count = 0
+        self._next = time.perf_counter()
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.remaining is not None:
+            if self.remaining <= 0:
+                return False, None
+            self.remaining -= 1
+        if self.interval:
+            delay = self._next - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._next = max(self._next + self.interval, time.perf_counter())
+        w, h = self.size
+        img = np.full((h, w, 3), 40, dtype=np.uint8)
+        x = (self.count * 8) % max(1, w - 60)
+        cv2.rectangle(img, (x, h // 2 - 30), (x + 60, h // 2 + 30), (0, 200, 255), -1)
+        self.count += 1
+        return True, img
+
+    def release(self):
+        pass
+
+
+class FrameBroadcaster:
+    def __init__(self, source, process=None, ring_size=4, jpeg_quality=DEFAULT_QUALITY, wait_timeout=2.0,
+                 max_fps=None):
+        """
+        source:  object with read() -> (ok, BGR frame), e.g. cv2.VideoCapture or SyntheticSource
+        process: optional callable(frame) -> frame run once per captured frame
+                 (flip, predict_gesture, overlay text)
+        max_fps: cap on frames captured and processed per second (None = source rate)
+        """
+        self.source = source
+        self.process = process
+        self.jpeg_quality = int(jpeg_quality)
+        self.wait_timeout = wait_timeout
+        self.max_fps = max_fps
+        self.encoders = EncoderPool()
+        self._ring = deque(maxlen=max(1, ring_size))
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stop = threading.Event()
+        self._seq = 0
+        self.clients = 0
+        self.frames_captured = 0
+        self.read_failures = 0
+        self.process_failures = 0
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.process_seconds = 0.0
+
+    # -------------------- Producer --------------------
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="camera-capture", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        read = cooperative(self.source.read)
+        interval = 1.0 / self.max_fps if self.max_fps else 0.0
+        next_at = time.perf_counter()
+        while not self._stop.is_set():
+            with self._cond:
+                # idle (no camera reads, no inference) while nobody is watching
+                if not self._cond.wait_for(lambda: self.clients > 0 or self._stop.is_set(), timeout=1.0):
+                    continue
+            if self._stop.is_set():
+                break
+            if interval:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_at = max(next_at + interval, time.perf_counter())
+            ok, frame = read()
+            if not ok or frame is None:
+                self.read_failures += 1
+                self.publish(blank_frame('Camera read failed'))
+                time.sleep(0.1)
+                continue
+            self.frames_captured += 1
+            t0 = time.perf_counter()
+            if self.process is not None:
+                try:
+                    frame = self.process(frame)
+                except Exception as e:
+                    # one bad frame (or a model hiccup) must not end the stream for every viewer
+                    self.process_failures += 1
+                    if self.process_failures == 1 or self.process_failures % 100 == 0:
+                        print(f"Frame processing failed ({self.process_failures} so far):", repr(e))
+                    frame = blank_frame('Frame processing failed')
+            self.process_seconds += time.perf_counter() - t0
+            self.publish(frame)
+
+    def publish(self, image):
+        with self._cond:
+            self._seq += 1
+            self._ring.append(Frame(self._seq, image, time.time()))
+            self._cond.notify_all()
+
+    # -------------------- Consumers --------------------
+    def latest(self, after_seq=0, timeout=None):
+        """Newest frame with seq > after_seq, waiting up to timeout; None on timeout/stop."""
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: (self._ring and self._ring[-1].seq > after_seq) or self._stop.is_set(),
+                timeout=self.wait_timeout if timeout is None else timeout)
+            if not ready or not self._ring or self._ring[-1].seq <= after_seq:
+                return None
+            return self._ring[-1]
+
+    def frames(self):
+        """Generator of Frame tuples for one client, dropping any it was too slow to send."""
+        with self._cond:
+            self.clients += 1
+            self._cond.notify_all()
+        self.start()
+        last = 0
+        try:
+            while not self._stop.is_set():
+                frame = self.latest(last)
+                if frame is None:
+                    continue
+                with self._cond:
+                    if last:
+                        self.frames_skipped += frame.seq - last - 1
+                    self.frames_sent += 1
+                last = frame.seq
+                yield frame
+        finally:
+            with self._cond:
+                self.clients -= 1
+
+    def stream(self, quality=None, width=None, fps=None):
+        """MJPEG multipart chunks for a Flask Response, encoded for this client's profile and rate."""
+        encoder = self.encoders.get(quality or self.jpeg_quality, width)
+        frames = self.frames()
+        try:
+            for frame in paced(frames, fps):
+                yield encoder.encode(frame.image, frame.seq)
+        finally:
+            frames.close()
+
+    def stats(self):
+        return {
+            "clients": self.clients,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "frames_captured": self.frames_captured,
+            "read_failures": self.read_failures,
+            "process_failures": self.process_failures,
+            "frames_published": self._seq,
+            "frames_sent": self.frames_sent,
+            "frames_skipped": self.frames_skipped,
+            "mean_process_ms": (self.process_seconds / self.frames_captured * 1000.0) if self.frames_captured else 0.0,
+            "max_fps": self.max_fps,
+            "encoders": self.encoders.stats(),
+        }
@@ -1,38 +1,291 @@
-import cv2
+# capture_gesture_images.py
+# Capture gesture samples from a webcam, a video file or a directory of images.
+#
+# Interactive (as before):  python capture_gesture_images.py --class stop
+#                           press 's' to save a frame, 'q' to quit
+# Burst / headless:         python capture_gesture_images.py --class stop --count 200 --fps 10 --headless
+# From a video or folder:   python capture_gesture_images.py --class two --source clip.mp4 --count 100
+# Straight to landmarks:    python capture_gesture_images.py --class one --format landmarks --headless
+#
+# Encoding and disk writes run on a background writer pool behind a bounded
+# queue; when the queue is full the frame is dropped (and counted) so the
+# capture loop never waits on the disk.
+
+import argparse
 import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+CLASSES = ['one', 'two', 'three', 'four', 'thumbs_down', 'stop', 'nothing', 'thumbs_up']
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+# -------------------- Frame sources --------------------
+class DirectorySource:
+    """Reads the images of a folder in name order, like a (finite) camera."""
+
+    def __init__(self, folder):
+        self.paths = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(IMAGE_EXTS))
+        self.pos = 0
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def read(self):
+        while self.pos < len(self.paths):
+            frame = cv2.imread(self.paths[self.pos])
+            self.pos += 1
+            if frame is not None:
+                return True, frame
+        return False, None
+
+    def release(self):
+        pass
+
+
+def open_source(source):
+    """Webcam index ("0"), video file path, or image directory. Returns (capture, is_webcam)."""
+    if source.isdigit():
+        return cv2.VideoCapture(int(source)), True
+    if os.path.isdir(source):
+        return DirectorySource(source), False
+    return cv2.VideoCapture(source), False
+
+
+# -------------------- Writers --------------------
+class ImageWriter:
+    """JPEG-encodes frames into gesture_dataset/<class>/<class>_<n>.jpg."""
+
+    def __init__(self, save_dir, gesture_class, quality=95):
+        self.save_dir = save_dir
+        self.gesture_class = gesture_class
+        self.quality = quality
+        os.makedirs(save_dir, exist_ok=True)
+        self._next = self._first_free_index()
+        self._lock = threading.Lock()
+
+    def _first_free_index(self):
+        # one directory scan at startup, then a counter (existing files are never overwritten)
+        prefix = f"{self.gesture_class}_"
+        used = [int(f[len(prefix):].split('.')[0]) for f in os.listdir(self.save_dir)
+                if f.startswith(prefix) and f[len(prefix):].split('.')[0].isdigit()]
+        return max(used) + 1 if used else 0
+
+    def write(self, frame):
+        with self._lock:
+            idx = self._next
+            self._next += 1
+        ok, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise IOError("JPEG encode failed")
+        path = os.path.join(self.save_dir, f"{self.gesture_class}_{idx}.jpg")
+        with open(path, 'wb') as f:
+            f.write(buf.tobytes())
+        return path
+
+
+class LandmarkWriter:
+    """Runs MediaPipe Hands on each frame and appends the landmarks to the landmark store."""
+
+    def __init__(self, store_dir, gesture_class):
+        import mediapipe as mp
+        from landmark_store import LandmarkStore
+        self.hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1)
+        self.store = LandmarkStore(store_dir)
+        self.gesture_class = gesture_class
+        self._lock = threading.Lock()  # Hands is not thread-safe
+
+    def write(self, frame):
+        with self._lock:
+            result = self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if not result.multi_hand_landmarks:
+            return None
+        lm = result.multi_hand_landmarks[0].landmark
+        row = np.array([[p.x, p.y, p.z] for p in lm], dtype=np.float32)
+        return self.store.append(row[None], self.gesture_class)[0]
+
+
+class AsyncWriter:
+    """Bounded queue + writer threads; submit() never blocks and reports drops."""
+
+    def __init__(self, writer, workers=2, max_queue=64):
+        self.writer = writer
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.accepted = 0
+        self.saved = 0
+        self.skipped = 0   # writer ran but had nothing to save (e.g. no hand found)
+        self.dropped = 0   # queue full, frame discarded
+        self.errors = 0
+        self.latencies = []
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(max(1, workers))]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, frame):
+        try:
+            self.queue.put_nowait((frame, time.perf_counter()))
+            with self._lock:
+                self.accepted += 1
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            frame, queued_at = item
+            try:
+                result = self.writer.write(frame)
+                with self._lock:
+                    if result is None:
+                        self.skipped += 1
+                    else:
+                        self.saved += 1
+                    self.latencies.append(time.perf_counter() - queued_at)
+            except Exception as e:
+                print("[!] Write failed:", e)
+                with self._lock:
+                    self.errors += 1
+            self.queue.task_done()
+
+    def in_flight(self):
+        """Frames accepted but not yet written, skipped or failed."""
+        with self._lock:
+            return self.accepted - self.saved - self.skipped - self.errors
+
+    def close(self):
+        for _ in self._threads:
+            self.queue.put(None)
+        for t in self._threads:
+            t.join()
+
+    def stats(self):
+        lat = np.array(self.latencies) * 1000.0 if self.latencies else np.zeros(1)
+        return {
+            'saved': self.saved,
+            'skipped': self.skipped,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'write_ms_p50': float(np.percentile(lat, 50)),
+            'write_ms_p95': float(np.percentile(lat, 95)),
+            'write_ms_max': float(lat.max()),
+        }
+
+
+# -------------------- Capture loop --------------------
+def capture(args):
+    cap, is_webcam = open_source(args.source)
+    if not cap.isOpened():
+        print(f"Error: could not open source '{args.source}'")
+        return 1
+    flip = is_webcam if args.flip is None else args.flip
+
+    if args.format == 'landmarks':
+        writer = LandmarkWriter(args.store, args.gesture_class)
+        workers = 1
+        target = args.store
+    else:
+        target = os.path.join(args.data, args.gesture_class)
+        writer = ImageWriter(target, args.gesture_class, args.quality)
+        workers = args.workers
+    out = AsyncWriter(writer, workers=workers, max_queue=args.queue_size)
+
+    burst = args.headless or args.fps is not None
+    interval = 1.0 / args.fps if args.fps else 0.0
+    print(f"📷 Capturing '{args.gesture_class}' from {args.source} -> {target}")
+    if not burst:
+        print("Press 's' to save image | 'q' to quit")
+
+    captured = submitted = 0
+    started = next_at = time.perf_counter()
+    while True:
+        if args.count is not None and out.saved + out.in_flight() >= args.count:
+            # --count is frames actually written: wait for those in flight, and
+            # capture more if any of them failed, found no hand or were dropped
+            out.queue.join()
+            if out.saved >= args.count:
+                break
+        ret, frame = cap.read()
+        if not ret:
+            break
+        captured += 1
+        if flip:
+            frame = cv2.flip(frame, 1)  # mirror view for webcams
+
+        save = False
+        if burst:
+            now = time.perf_counter()
+            if now >= next_at:
+                save = True
+                next_at = max(next_at + interval, now) if interval else now
+        if not args.headless:
+            preview = frame.copy()
+            cv2.putText(preview, f"Gesture: {args.gesture_class}  saved: {out.saved}", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            cv2.imshow("Capture Gesture", preview)
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            if key == ord('s'):
+                save = True
+        if save:
+            out.submit(frame)
+            submitted += 1
+        if burst and interval and not is_webcam:
+            # files deliver frames instantly; pace them to the target fps
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    elapsed = time.perf_counter() - started
+    cap.release()
+    if not args.headless:
+        cv2.destroyAllWindows()
+    out.close()
+
+    stats = out.stats()
+    stats.update({'captured': captured, 'submitted': submitted, 'seconds': round(elapsed, 2),
+                  'fps': round(captured / elapsed, 1) if elapsed else 0.0})
+    print(f"[✔] Saved {stats['saved']} samples to '{target}'")
+    print("Stats:", ", ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in stats.items()))
+
+    if args.format == 'images' and args.update_cache:
+        from gesture_dataset_cache import build_cache
+        _, report = build_cache(args.data, args.cache)
+        print(f"Cache refreshed: {report['processed']} new, {report['reused']} reused "
+              f"in {report['build_seconds']:.2f}s")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Capture gesture images or landmark samples")
+    parser.add_argument('--class', dest='gesture_class', required=True,
+                        help=f"gesture label, e.g. {', '.join(CLASSES)}")
+    parser.add_argument('--count', type=int, default=None, help="stop after this many frames are written")
+    parser.add_argument('--source', default='0', help="webcam index, video file, or image directory")
+    parser.add_argument('--fps', type=float, default=None, help="burst mode: auto-save at this rate")
+    parser.add_argument('--headless', action='store_true', help="no preview window (implies burst mode)")
+    parser.add_argument('--format', choices=['images', 'landmarks'], default='images')
+    parser.add_argument('--data', default='gesture_dataset', help="image dataset root")
+    parser.add_argument('--store', default='landmark_store', help="landmark store for --format landmarks")
+    parser.add_argument('--update-cache', action='store_true', help="refresh the training image cache afterwards")
+    parser.add_argument('--cache', default=os.path.join('.cache', 'gesture_dataset'))
+    parser.add_argument('--quality', type=int, default=95, help="JPEG quality")
+    parser.add_argument('--workers', type=int, default=2, help="writer threads")
+    parser.add_argument('--queue-size', type=int, default=64, help="max frames waiting to be written")
+    parser.add_argument('--flip', dest='flip', action='store_true', default=None, help="mirror frames")
+    parser.add_argument('--no-flip', dest='flip', action='store_false')
+    return parser.parse_args(argv)
+
 
-# === EDIT THIS BEFORE RUNNING EACH TIME ===
-gesture_class = 'nothing'  # Change to: one, two, three, four, thumbs_down, stop, nothing
-
-# === Save Directory Setup ===
-save_dir = os.path.join('gesture_dataset', gesture_class)
-os.makedirs(save_dir, exist_ok=True)
-
-cap = cv2.VideoCapture(0)
-print(f"📷 Capturing images for class: '{gesture_class}'")
-print("Press 's' to save image | 'q' to quit")
-
-count = 0
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    frame = cv2.flip(frame, 1)  # Flip horizontally for mirror view
-    cv2.putText(frame, f"Gesture: {gesture_class}", (10, 30),
-                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-
-    cv2.imshow("Capture Gesture", frame)
-
-    key = cv2.waitKey(1)
-    if key == ord('s'):
-        img_path = os.path.join(save_dir, f"{gesture_class}_{count}.jpg")
-        cv2.imwrite(img_path, frame)
-        print(f"[+] Saved {img_path}")
-        count += 1
-    elif key == ord('q'):
-        break
-
-cap.release()
-cv2.destroyAllWindows()
-print(f"[✔] Collected {count} images in '{save_dir}'")
+if __name__ == '__main__':
+    raise SystemExit(capture(parse_args()))
@@ -1,23 +1,38 @@
 import cv2
 import mediapipe as mp
+import numpy as np
+
+import gesture_rules
+from gesture_tracker import GestureTracker
 
 mp_hands = mp.solutions.hands
 hands = mp_hands.Hands(max_num_hands=1)
 mp_draw = mp.solutions.drawing_utils
 
-cap = cv2.VideoCapture(0)  
+cap = cv2.VideoCapture(0)
 if not cap.isOpened():
     print("Error: Could not access the camera")
 else:
     print("Camera is working")
 
-def count_fingers(hand_landmarks):
-    finger_tips = [8, 12, 16, 20]
-    count = 0
-    for tip in finger_tips:
-        if hand_landmarks.landmark[tip].y < hand_landmarks.landmark[tip - 2].y:
-            count += 1
-    return count
+def hands_to_array(multi_hand_landmarks):
+    # all detected hands -> (N, 21, 3) for the vectorized rules
+    return np.array([[(p.x, p.y, p.z) for p in hand.landmark] for hand in multi_hand_landmarks],
+                    dtype=np.float32)
+
+last_hands = None
+
+def detect(frame):
+    # MediaPipe + rules; only called by the tracker when a fresh label is needed
+    global last_hands
+    result = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    last_hands = result.multi_hand_landmarks
+    if not last_hands:
+        return 'nothing'
+    return gesture_rules.classify(hands_to_array(last_hands))[0]
+
+# hand tracking every 3rd frame (or on motion), label smoothed over the last 5 results
+tracker = GestureTracker(detect, every=3, motion_threshold=8.0, window=5, switch_votes=3)
 
 while True:
     success, frame = cap.read()
@@ -25,26 +40,11 @@ while True:
         print("Error: Could not read frame")
         break
 
-    frame = cv2.flip(frame, 1)  
-    img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    result = hands.process(img_rgb)
-
-    if result.multi_hand_landmarks:
-        for hand in result.multi_hand_landmarks:
-            mp_draw.draw_landmarks(frame, hand, mp_hands.HAND_CONNECTIONS)
-            finger_count = count_fingers(hand)
-
-            if finger_count == 0:
-                gesture = "Fist"
-            elif finger_count == 2:
-                gesture = "Peace"
-            elif finger_count == 5:
-                gesture = "Open Palm"
-            else:
-                gesture = f"{finger_count} fingers"
-
-            cv2.putText(frame, f"Gesture: {gesture}", (10, 50),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+    frame = cv2.flip(frame, 1)
+    gesture = tracker.update(frame)
+    for hand in last_hands or []:
+        mp_draw.draw_landmarks(frame, hand, mp_hands.HAND_CONNECTIONS)
+    cv2.putText(frame, f"Gesture: {gesture}", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
 
     cv2.imshow("Gesture Detection", frame)
     if cv2.waitKey(1) & 0xFF == ord('q'):
@@ -52,3 +52,4 @@ while True:
 
 cap.release()
 cv2.destroyAllWindows()
+print("Tracker:", tracker.stats())
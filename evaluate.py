@@ -0,0 +1,249 @@
+# evaluate.py
+# Offline accuracy / speed evaluation of the project's classifiers over the
+# datasets already in the repo. Samples are streamed to a process pool in
+# chunks (each worker loads the model once and only ever holds one chunk), and
+# the report is JSON: confusion matrix, per-class accuracy, throughput and
+# per-sample latency.
+#
+#   python evaluate.py gesture [--model models/gesture_model.npz] [--data gesture_dataset]
+#   python evaluate.py shapes  [--data shape_dataset] [--method rules|index]
+#   python evaluate.py rules   [--data collected_data | landmark_store]
+#   common options: --workers N --chunk-size 64 --limit N --output report.json
+#
+# `gesture` mirrors predict_gesture (100x100, BGR by default, /255); `shapes`
+# runs recognize_many with the rule fallback, or against a ShapeIndex built
+# from every other sample (--method index); `rules` is gesture_rules.classify.
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+DEFAULT_IMG_SIZE = (100, 100)
+NO_SHAPE = 'none'
+# app.class_labels: the output order predict_gesture assumes when the model names none
+DEFAULT_GESTURE_LABELS = ['one', 'two', 'three', 'four', 'thumbs_down', 'stop', 'nothing']
+
+
+# -------------------- Report --------------------
+def confusion(truth, pred, labels=None):
+    """(labels, matrix) with rows = true label, columns = predicted label."""
+    labels = list(labels) if labels is not None else sorted(set(truth) | set(pred))
+    index = {label: i for i, label in enumerate(labels)}
+    matrix = np.zeros((len(labels), len(labels)), dtype=np.int64)
+    np.add.at(matrix, (np.array([index[t] for t in truth], dtype=np.intp),
+                       np.array([index[p] for p in pred], dtype=np.intp)), 1)
+    return labels, matrix
+
+
+def summarize(truth, pred, compute_seconds, wall_seconds, skipped=0):
+    labels, matrix = confusion(truth, pred)
+    n = len(truth)
+    per_class = {}
+    for i, label in enumerate(labels):
+        total = int(matrix[i].sum())
+        if total:
+            per_class[label] = {'samples': total, 'correct': int(matrix[i, i]),
+                                'accuracy': float(matrix[i, i] / total)}
+    return {
+        'samples': n,
+        'skipped': skipped,  # files that could not be read or decoded
+        'accuracy': float(np.trace(matrix) / n) if n else 0.0,
+        'per_class': per_class,
+        'confusion': {'labels': labels, 'matrix': matrix.tolist()},
+        'throughput_per_s': n / wall_seconds if wall_seconds else 0.0,
+        'latency_ms_per_sample': compute_seconds / n * 1000.0 if n else 0.0,
+        'wall_seconds': wall_seconds,
+    }
+
+
+# -------------------- Workers --------------------
+# Module-level state set by the pool initializer, once per worker process.
+_state = {}
+
+
+def _init_gesture(model_path, labels, color, img_size):
+    if model_path.endswith('.npz'):
+        from numpy_runtime import load_model
+        model = load_model(model_path)
+    else:
+        from tensorflow.keras.models import load_model
+        model = load_model(model_path)
+    _state.update(model=model, labels=labels or getattr(model, 'class_labels', None) or DEFAULT_GESTURE_LABELS,
+                  color=color, img_size=tuple(img_size))
+
+
+def _eval_gesture_chunk(chunk):
+    from image_decode import decode_image
+    t0 = time.perf_counter()
+    w, h = _state['img_size']
+    truth, images = [], []
+    for path, label in chunk:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            img = cv2.resize(decode_image(data, target_size=(w, h), max_bytes=len(data)), (w, h))
+        except (OSError, ValueError):
+            continue  # unreadable / undecodable file: counted as skipped, like _eval_shapes_chunk
+        if _state['color'] == 'rgb':
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        truth.append(label)
+        images.append(img)
+    if not images:
+        return truth, [], time.perf_counter() - t0, len(chunk)
+    batch = np.stack(images).astype(np.float32) / 255.0
+    preds = np.argmax(_state['model'].predict(batch, verbose=0), axis=1)
+    labels = _state['labels']
+    out = [labels[i] if labels and i < len(labels) else str(i) for i in preds]
+    return truth, out, time.perf_counter() - t0, len(chunk) - len(truth)
+
+
+def _init_shapes(index_items):
+    index = None
+    if index_items is not None:
+        from shape_recognition import ShapeIndex
+        index = ShapeIndex()
+        for path, label in index_items:
+            img = cv2.imread(path, cv2.IMREAD_COLOR)
+            if img is not None:
+                index.add_image(img, label)
+    _state.update(index=index)
+
+
+def _eval_shapes_chunk(chunk):
+    from shape_recognition import recognize_many
+    t0 = time.perf_counter()
+    truth, images = [], []
+    for path, label in chunk:
+        img = cv2.imread(path, cv2.IMREAD_COLOR)
+        if img is not None:
+            truth.append(label)
+            images.append(img)
+    out = [r.get('shape', NO_SHAPE) for r in recognize_many(images, _state.get('index'))]
+    return truth, out, time.perf_counter() - t0, len(chunk) - len(truth)
+
+
+def _eval_rules_chunk(chunk):
+    import gesture_rules
+    X, y = chunk
+    t0 = time.perf_counter()
+    out = gesture_rules.classify(X).tolist()
+    return list(y), out, time.perf_counter() - t0, 0
+
+
+# -------------------- Datasets --------------------
+def subset_indices(n, limit=None):
+    """limit evenly strided indices into n class-sorted samples, so every class keeps its share."""
+    if not limit or limit >= n:
+        return np.arange(n)
+    return np.arange(limit) * n // limit
+
+
+def _image_items(data_dir, limit=None):
+    from gesture_dataset_cache import list_images
+    if not os.path.isdir(data_dir):
+        return []
+    _, items = list_images(data_dir)
+    return [items[i] for i in subset_indices(len(items), limit)]
+
+
+def _chunks(seq, size):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def run(fn, chunks, workers=None, initializer=None, initargs=()):
+    """Map fn over chunks (in-process when workers == 1) and summarize the results."""
+    truth, pred, compute, skipped = [], [], 0.0, 0
+    t0 = time.perf_counter()
+    if workers == 1:
+        if initializer is not None:
+            initializer(*initargs)
+        results = map(fn, chunks)
+        for t, p, s, k in results:
+            truth += t
+            pred += p
+            compute += s
+            skipped += k
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+            for t, p, s, k in pool.map(fn, chunks):
+                truth += t
+                pred += p
+                compute += s
+                skipped += k
+    return summarize(truth, pred, compute, time.perf_counter() - t0, skipped)
+
+
+def evaluate_gesture(data_dir, model_path, labels=None, color='bgr', img_size=DEFAULT_IMG_SIZE,
+                     workers=None, chunk_size=64, limit=None):
+    items = _image_items(data_dir, limit)
+    report = run(_eval_gesture_chunk, list(_chunks(items, chunk_size)), workers,
+                 _init_gesture, (model_path, labels, color, tuple(img_size)))
+    return dict(report, target='gesture', model=model_path, data=data_dir, color=color)
+
+
+def evaluate_shapes(data_dir, method='rules', workers=None, chunk_size=64, limit=None):
+    items = _image_items(data_dir, limit)
+    index_items = None
+    if method == 'index':
+        # every other sample (per class, in file order) builds the index, the rest is evaluated
+        index_items, items = items[0::2], items[1::2]
+    report = run(_eval_shapes_chunk, list(_chunks(items, chunk_size)), workers, _init_shapes, (index_items,))
+    return dict(report, target='shapes', method=method, data=data_dir,
+                index_samples=len(index_items) if index_items is not None else 0)
+
+
+def evaluate_rules(data_dir, workers=None, chunk_size=4096, limit=None):
+    from gesture_rules import load_dataset
+    X, y = load_dataset(data_dir)
+    keep = subset_indices(len(X), limit)
+    X, y = X[keep], y[keep]
+    chunks = [(X[i:i + chunk_size], y[i:i + chunk_size]) for i in range(0, len(X), chunk_size)]
+    return dict(run(_eval_rules_chunk, chunks, workers), target='rules', data=data_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate gesture / shape classifiers on a dataset")
+    parser.add_argument('target', choices=['gesture', 'shapes', 'rules'])
+    parser.add_argument('--data', help="dataset directory (default depends on target)")
+    parser.add_argument('--model', default=os.path.join('models', 'gesture_model.npz'),
+                        help="gesture: exported .npz or a Keras model file")
+    parser.add_argument('--labels', nargs='*', help="gesture: class labels in model output order")
+    parser.add_argument('--color', choices=['bgr', 'rgb'], default='bgr',
+                        help="gesture: channel order fed to the model (the app feeds BGR)")
+    parser.add_argument('--method', choices=['rules', 'index'], default='rules', help="shapes: matcher")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=None)
+    parser.add_argument('--limit', type=int, default=None, help="evaluate N samples strided across the (class-sorted) dataset")
+    parser.add_argument('--output', help="also write the JSON report here")
+    args = parser.parse_args(argv)
+
+    common = {'workers': args.workers, 'limit': args.limit}
+    if args.chunk_size:
+        common['chunk_size'] = args.chunk_size
+    if args.target == 'gesture':
+        if not os.path.exists(args.model):
+            parser.error(f"model not found: {args.model}")
+        report = evaluate_gesture(args.data or 'gesture_dataset', args.model, args.labels, args.color, **common)
+    elif args.target == 'shapes':
+        report = evaluate_shapes(args.data or 'shape_dataset', args.method, **common)
+    else:
+        report = evaluate_rules(args.data or 'collected_data', **common)
+    report['workers'] = args.workers or os.cpu_count()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,31 +1,172 @@
-import pyttsx3
+# generate_quiz_audio.py
+# Pre-render narration for the emotion quiz questions (pyttsx3, offline).
+#
+# - question text comes from the question bank the /quiz/emotion page serves
+# - every clip is named by a hash of its text + voice settings + format, so
+#   unchanged questions are skipped and a file's content never changes under
+#   its name (the app serves them with a one-year immutable Cache-Control)
+# - missing clips are rendered in parallel worker processes (one pyttsx3
+#   engine each) and compressed with ffmpeg when it is installed
+# - manifest.json maps question text -> file; the app reads it to link audio
+#
+#   python generate_quiz_audio.py [--format mp3|ogg|wav] [--rate 150] [--voice ID]
+#                                 [--workers N] [--prune] [--out static/sounds/emotion_quiz]
+
+import argparse
+import hashlib
+import json
 import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_OUT = os.path.join("static", "sounds", "emotion_quiz")
+MANIFEST = "manifest.json"
+CODECS = {
+    "mp3": ["-c:a", "libmp3lame", "-q:a", "5"],
+    "ogg": ["-c:a", "libvorbis", "-q:a", "3"],
+}
+
+
+def clip_key(text, settings):
+    payload = json.dumps({"text": text, **settings}, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=10).hexdigest()
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"entries": {}}
+
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+# -------------------- Rendering (worker processes) --------------------
+_engine = None
+
+
+def _get_engine(settings):
+    global _engine
+    if _engine is None:
+        import pyttsx3
+        _engine = pyttsx3.init()
+        _engine.setProperty("rate", settings["rate"])
+        _engine.setProperty("volume", settings["volume"])
+        if settings.get("voice"):
+            _engine.setProperty("voice", settings["voice"])
+    return _engine
+
+
+def render_clip(text, path, settings):
+    """Speak text into path (format from its extension); raw WAV when ffmpeg is unavailable."""
+    engine = _get_engine(settings)
+    fmt = settings["format"]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        wav = os.path.join(tmp_dir, "clip.wav")
+        engine.save_to_file(text, wav)
+        engine.runAndWait()
+        if fmt == "wav":
+            shutil.move(wav, path)
+            return
+        encoded = os.path.join(tmp_dir, "clip." + fmt)
+        subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-i", wav, *CODECS[fmt], encoded], check=True)
+        shutil.move(encoded, path)
+
+
+def _render_task(args):
+    render, text, out_dir, name, settings = args
+    t0 = time.perf_counter()
+    final = os.path.join(out_dir, name)
+    partial = os.path.join(out_dir, f".{name}.part")
+    try:
+        render(text, partial, settings)
+    except BaseException:
+        # a failed or interrupted render must not leave half a clip behind
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    os.replace(partial, final)  # a clip is either complete or absent under its final name
+    return name, os.path.getsize(final), time.perf_counter() - t0
+
+
+# -------------------- Build --------------------
+def build(texts, out_dir=DEFAULT_OUT, settings=None, workers=None, render=render_clip, prune=False):
+    """Render the clips that are missing for texts, rewrite the manifest; returns a summary."""
+    settings = dict(settings or {"rate": 150, "volume": 1.0, "voice": None, "format": "wav"})
+    os.makedirs(out_dir, exist_ok=True)
+    entries, todo = {}, []
+    for text in dict.fromkeys(texts):  # unique, in order
+        key = clip_key(text, settings)
+        name = f"{key}.{settings['format']}"
+        entries[text] = {"file": name, "hash": key}
+        if not os.path.exists(os.path.join(out_dir, name)):
+            todo.append((render, text, out_dir, name, settings))
+
+    t0 = time.perf_counter()
+    if workers == 1 or len(todo) <= 1:
+        results = list(map(_render_task, todo))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_render_task, todo))
+    wall = time.perf_counter() - t0
+
+    for entry in entries.values():
+        entry["bytes"] = os.path.getsize(os.path.join(out_dir, entry["file"]))
+    _write_atomic(os.path.join(out_dir, MANIFEST), {"settings": settings, "entries": entries})
+
+    removed = []
+    if prune:
+        keep = {e["file"] for e in entries.values()} | {MANIFEST}
+        for fname in os.listdir(out_dir):
+            # stale clips, and .part files left by a run that was killed mid-render
+            if fname not in keep and (fname.endswith(".part")
+                                      or os.path.splitext(fname)[1].lstrip(".") in ("wav", *CODECS)):
+                os.remove(os.path.join(out_dir, fname))
+                removed.append(fname)
+    return {
+        "clips": len(entries),
+        "rendered": len(results),
+        "skipped": len(entries) - len(results),
+        "removed": len(removed),
+        "render_seconds": sum(r[2] for r in results),
+        "wall_seconds": wall,
+        "bytes": sum(e["bytes"] for e in entries.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render emotion quiz narration")
+    parser.add_argument("--bank", default=None, help="question bank JSON (default: the app's)")
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--format", choices=["mp3", "ogg", "wav"], default="mp3")
+    parser.add_argument("--rate", type=int, default=150, help="words per minute")
+    parser.add_argument("--volume", type=float, default=1.0)
+    parser.add_argument("--voice", default=None, help="pyttsx3 voice id")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--prune", action="store_true", help="delete clips no longer in the manifest and leftover .part files")
+    args = parser.parse_args()
+
+    from question_bank import DEFAULT_PATH, QuestionBank
+    bank = QuestionBank.load(args.bank or DEFAULT_PATH)
+    fmt = args.format
+    if fmt != "wav" and shutil.which("ffmpeg") is None:
+        print(f"ffmpeg not found; writing wav instead of {fmt}")
+        fmt = "wav"
+    settings = {"rate": args.rate, "volume": args.volume, "voice": args.voice, "format": fmt}
+    summary = build([q["text"] for q in bank.emotion], args.out, settings, args.workers, prune=args.prune)
+    print(f"{summary['rendered']} rendered, {summary['skipped']} unchanged, {summary['removed']} removed "
+          f"({summary['bytes'] / 1024:.0f} KiB) in {summary['wall_seconds']:.2f}s -> {args.out}")
+    return 0
+
 
-# Initialize the TTS engine
-engine = pyttsx3.init()
-
-# Optional voice settings
-engine.setProperty('rate', 150)  # Words per minute
-engine.setProperty('volume', 1.0)  # Max volume
-
-# List of quiz questions
-questions = [
-    "Your friend gives you a surprise gift. How do you feel?",
-    "You lost your favorite toy. What emotion fits best?",
-    "You see a scary shadow in your room. What might you feel?",
-    "It is your birthday and everyone sings for you!",
-    "You spilled juice on your homework. How would that make you feel?"
-]
-
-# Output folder inside /static/sounds/
-output_folder = "static/sounds/emotion_quiz"
-os.makedirs(output_folder, exist_ok=True)
-
-# Generate audio files
-for idx, question in enumerate(questions, start=1):
-    filename = os.path.join(output_folder, f"q{idx}.wav")
-    engine.save_to_file(question, filename)
-    print(f"Saved: {filename}")
-
-engine.runAndWait()
-print("✅ All audio files generated successfully.")
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,234 @@
+# gesture_dataset_cache.py
+# Decode + resize gesture_dataset/<class>/*.jpg once, in parallel, into a
+# memory-mapped uint8 tensor that training and evaluation read directly.
+#
+#   <cache_dir>/images.npy   (N, H, W, 3) uint8, RGB (what Keras load_img gives)
+#   <cache_dir>/labels.npy   (N,) int16 index into classes
+#   <cache_dir>/index.json   {"img_size", "classes", "paths", "hashes"}
+#
+# Rows are keyed by a content hash of the source file, so a rebuild only
+# decodes new or changed images and copies the rest from the previous cache.
+# Rows are grouped by class (sorted, like flow_from_directory), so train /
+# validation splits are contiguous row ranges; in-order batches are views of
+# the memory map and shuffled batches are gathered rows (one copy per batch).
+#
+#   python gesture_dataset_cache.py build [--data gesture_dataset] [--workers 4]
+#   python gesture_dataset_cache.py epoch [--batch-size 16]
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from image_decode import decode_image
+
+DEFAULT_DATA_DIR = 'gesture_dataset'
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'gesture_dataset')
+DEFAULT_IMG_SIZE = (100, 100)
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def list_images(data_dir):
+    """[(path, class_name)] sorted by class then file name; classes = sorted subdirectories."""
+    classes = sorted(d for d in os.listdir(data_dir) if os.path.isdir(os.path.join(data_dir, d)))
+    items = []
+    for cls in classes:
+        folder = os.path.join(data_dir, cls)
+        for fname in sorted(os.listdir(folder)):
+            if fname.lower().endswith(IMAGE_EXTS):
+                items.append((os.path.join(folder, fname), cls))
+    return classes, items
+
+
+def file_hash(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_resized(path, img_size=DEFAULT_IMG_SIZE):
+    """Decode (reduced-resolution where possible), resize and convert to RGB uint8."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    img = decode_image(data, target_size=img_size, max_bytes=len(data))
+    img = cv2.resize(img, tuple(img_size))
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+def _load_resized_task(args):
+    path, img_size = args
+    return load_resized(path, img_size)
+
+
+# -------------------- Cache --------------------
+class DatasetCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, 'index.json')) as f:
+            self.index = json.load(f)
+        self.classes = self.index['classes']
+        self.paths = self.index['paths']
+        self.img_size = tuple(self.index['img_size'])
+        self.images = np.load(os.path.join(cache_dir, 'images.npy'), mmap_mode='r')
+        self.labels = np.load(os.path.join(cache_dir, 'labels.npy'))
+
+    def __len__(self):
+        return len(self.labels)
+
+    def class_ranges(self):
+        """[(start, stop)] row range per class."""
+        bounds = np.flatnonzero(np.diff(self.labels)) + 1
+        starts = np.r_[0, bounds] if len(self.labels) else np.array([], int)
+        stops = np.r_[bounds, len(self.labels)] if len(self.labels) else np.array([], int)
+        return [(int(a), int(b)) for a, b in zip(starts, stops)]
+
+    def split(self, validation_split=0.2):
+        """
+        (train_ranges, val_ranges) like flow_from_directory(validation_split=...):
+        the first fraction of each class is validation, the rest training.
+        """
+        train, val = [], []
+        for start, stop in self.class_ranges():
+            n_val = int(validation_split * (stop - start))
+            if n_val:
+                val.append((start, start + n_val))
+            if start + n_val < stop:
+                train.append((start + n_val, stop))
+        return train, val
+
+    def batches(self, ranges=None, batch_size=32, shuffle=False, seed=None):
+        """
+        Yield (images, labels) batches from ranges. In order, batches are views into
+        the memory-mapped tensor; shuffled, the rows of all ranges are permuted and
+        each batch is gathered with one fancy-indexed read.
+        """
+        ranges = ranges if ranges is not None else [(0, len(self))]
+        if not shuffle:
+            for start, stop in ranges:
+                for s in range(start, stop, batch_size):
+                    e = min(s + batch_size, stop)
+                    yield self.images[s:e], self.labels[s:e]
+            return
+        rows = np.concatenate([np.arange(start, stop) for start, stop in ranges] or [np.array([], int)])
+        rows = np.random.default_rng(seed).permutation(rows)
+        for s in range(0, len(rows), batch_size):
+            idx = np.sort(rows[s:s + batch_size])  # ascending reads from the memory map
+            yield self.images[idx], self.labels[idx]
+
+    def steps(self, ranges=None, batch_size=32):
+        ranges = ranges if ranges is not None else [(0, len(self))]
+        return sum(-(-(stop - start) // batch_size) for start, stop in ranges)
+
+    def keras_generator(self, ranges=None, batch_size=32, shuffle=True, seed=None):
+        """Endless (x float32 in [0, 1], one-hot y) batches for model.fit(steps_per_epoch=steps(...))."""
+        eye = np.eye(len(self.classes), dtype=np.float32)
+        epoch = 0
+        while True:
+            for x, y in self.batches(ranges, batch_size, shuffle, None if seed is None else seed + epoch):
+                yield x.astype(np.float32) / 255.0, eye[y]
+            epoch += 1
+
+
+def build_cache(data_dir=DEFAULT_DATA_DIR, cache_dir=DEFAULT_CACHE_DIR, img_size=DEFAULT_IMG_SIZE, workers=None):
+    """Create or refresh the cache; returns (DatasetCache, report dict)."""
+    img_size = tuple(int(v) for v in img_size)
+    t_start = time.perf_counter()
+    classes, items = list_images(data_dir)
+    hashes = [file_hash(p) for p, _ in items]
+    t_hashed = time.perf_counter()
+
+    previous, old_rows = None, {}
+    if os.path.exists(os.path.join(cache_dir, 'index.json')):
+        try:
+            previous = DatasetCache(cache_dir)
+            if previous.img_size == img_size:
+                old_rows = {h: i for i, h in enumerate(previous.index['hashes'])}
+        except (OSError, ValueError, KeyError):
+            previous = None
+
+    os.makedirs(cache_dir, exist_ok=True)
+    w, h = img_size
+    tmp_images = os.path.join(cache_dir, 'images.tmp.npy')
+    out = np.lib.format.open_memmap(tmp_images, mode='w+', dtype=np.uint8, shape=(len(items), h, w, 3))
+    todo = []
+    for row, digest in enumerate(hashes):
+        if digest in old_rows:
+            out[row] = previous.images[old_rows[digest]]
+        else:
+            todo.append(row)
+
+    if todo:
+        tasks = [(items[row][0], img_size) for row in todo]
+        if workers == 1 or len(todo) < 8:
+            results = map(_load_resized_task, tasks)
+            for row, img in zip(todo, results):
+                out[row] = img
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for row, img in zip(todo, pool.map(_load_resized_task, tasks, chunksize=16)):
+                    out[row] = img
+    out.flush()
+    del out
+    t_decoded = time.perf_counter()
+
+    labels = np.asarray([classes.index(cls) for _, cls in items], dtype=np.int16)
+    previous = None  # drop the old memmap before replacing the file
+    np.save(os.path.join(cache_dir, 'labels.tmp.npy'), labels)
+    os.replace(tmp_images, os.path.join(cache_dir, 'images.npy'))
+    os.replace(os.path.join(cache_dir, 'labels.tmp.npy'), os.path.join(cache_dir, 'labels.npy'))
+    index = {'img_size': list(img_size), 'classes': classes,
+             'paths': [os.path.relpath(p, data_dir) for p, _ in items], 'hashes': hashes}
+    with open(os.path.join(cache_dir, 'index.json.tmp'), 'w') as f:
+        json.dump(index, f)
+    os.replace(os.path.join(cache_dir, 'index.json.tmp'), os.path.join(cache_dir, 'index.json'))
+
+    report = {
+        'images': len(items),
+        'classes': classes,
+        'processed': len(todo),
+        'reused': len(items) - len(todo),
+        'hash_seconds': t_hashed - t_start,
+        'decode_seconds': t_decoded - t_hashed,
+        'build_seconds': time.perf_counter() - t_start,
+    }
+    return DatasetCache(cache_dir), report
+
+
+def time_epoch(cache, ranges=None, batch_size=16, shuffle=True):
+    """Seconds for one pass of float-converted batches (the part model.fit would consume)."""
+    t0 = time.perf_counter()
+    n = 0
+    for x, y in cache.batches(ranges, batch_size, shuffle=shuffle, seed=0):
+        _ = x.astype(np.float32) / 255.0
+        n += len(y)
+    return {'samples': n, 'epoch_seconds': time.perf_counter() - t0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precomputed gesture_dataset cache")
+    parser.add_argument('cmd', choices=['build', 'epoch'])
+    parser.add_argument('--data', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--cache', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--size', type=int, nargs=2, default=DEFAULT_IMG_SIZE, metavar=('W', 'H'))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=16)
+    args = parser.parse_args()
+
+    if args.cmd == 'build':
+        cache, report = build_cache(args.data, args.cache, args.size, args.workers)
+    else:
+        cache, report = DatasetCache(args.cache), {}
+    report.update(time_epoch(cache, batch_size=args.batch_size))
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,138 @@
+# gesture_rules.py
+# Rule-based finger counting and gesture labels for MediaPipe hand landmarks,
+# vectorized over a whole (N, 21, 3) batch (one hand per row).
+#
+# Used by detect_gesture.py, the server's landmark endpoints (as the fallback
+# for frames the trained classifier rejects) and for offline replay:
+#
+#   python gesture_rules.py [--data collected_data | --data landmark_store]
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from landmark_classifier import NUM_LANDMARKS, UNKNOWN_LABEL
+
+WRIST = 0
+THUMB_MCP, THUMB_IP, THUMB_TIP = 2, 3, 4
+PINKY_MCP = 17
+MIDDLE_MCP = 9
+FINGER_TIPS = np.array([8, 12, 16, 20])   # index, middle, ring, pinky
+FINGER_PIPS = FINGER_TIPS - 2
+FINGER_NAMES = ('thumb', 'index', 'middle', 'ring', 'pinky')
+
+# a finger is extended when its tip is clearly further from the wrist than its
+# PIP joint; the thumb when its tip is further from the pinky knuckle than its IP joint
+FINGER_EXTEND_RATIO = 1.15
+THUMB_EXTEND_RATIO = 1.05
+# thumb-only poses count as thumbs up/down when the thumb is within ~45 degrees of vertical
+THUMB_VERTICAL = np.cos(np.pi / 4)
+
+COUNT_LABELS = np.array([UNKNOWN_LABEL, 'one', 'two', 'three', 'four', 'stop'])
+
+
+def _as_batch(landmarks):
+    X = np.asarray(landmarks, dtype=np.float32)
+    if X.ndim == 2:
+        X = X[None]
+    return X.reshape(-1, NUM_LANDMARKS, 3)
+
+
+def _dist(P, a, b):
+    return np.linalg.norm(P[:, a] - P[:, b], axis=-1)
+
+
+def valid_rows(landmarks):
+    """Rows with finite coordinates and a non-degenerate hand (wrist != middle knuckle)."""
+    X = _as_batch(landmarks)
+    finite = np.isfinite(X).all(axis=(1, 2))
+    P = np.nan_to_num(X[..., :2])
+    return finite & (_dist(P, WRIST, MIDDLE_MCP) > 1e-6)
+
+
+def finger_states(landmarks):
+    """(N, 5) bool: thumb, index, middle, ring, pinky extended. Invalid rows are all False."""
+    X = _as_batch(landmarks)
+    P = np.nan_to_num(X[..., :2])  # image plane; MediaPipe z is too noisy for this
+    wrist = P[:, WRIST:WRIST + 1]
+    tip = np.linalg.norm(P[:, FINGER_TIPS] - wrist, axis=-1)
+    pip = np.linalg.norm(P[:, FINGER_PIPS] - wrist, axis=-1)
+    states = np.empty((len(X), 5), dtype=bool)
+    states[:, 1:] = tip > pip * FINGER_EXTEND_RATIO
+    states[:, 0] = _dist(P, THUMB_TIP, PINKY_MCP) > _dist(P, THUMB_IP, PINKY_MCP) * THUMB_EXTEND_RATIO
+    states[~valid_rows(X)] = False
+    return states
+
+
+def count_fingers(landmarks):
+    """(N,) number of extended fingers, thumb included."""
+    return finger_states(landmarks).sum(axis=1)
+
+
+def thumb_direction(landmarks):
+    """(N,) +1 thumb pointing up, -1 down, 0 sideways (image y grows downwards)."""
+    P = np.nan_to_num(_as_batch(landmarks)[..., :2])
+    v = P[:, THUMB_TIP] - P[:, THUMB_MCP]
+    cos_up = -v[:, 1] / (np.linalg.norm(v, axis=-1) + 1e-9)
+    return np.where(cos_up >= THUMB_VERTICAL, 1, np.where(cos_up <= -THUMB_VERTICAL, -1, 0))
+
+
+def analyze(landmarks):
+    """One pass over N hands -> (states (N, 5) bool, counts (N,) int, labels (N,) str)."""
+    X = _as_batch(landmarks)
+    states = finger_states(X)
+    counts = states.sum(axis=1)
+    labels = COUNT_LABELS[counts].astype(object)
+    thumb_only = states[:, 0] & ~states[:, 1:].any(axis=1)
+    direction = thumb_direction(X)
+    labels[thumb_only & (direction > 0)] = 'thumbs_up'
+    labels[thumb_only & (direction < 0)] = 'thumbs_down'
+    return states, counts, labels.astype(str)
+
+
+def classify(landmarks):
+    """(N,) gesture labels from the rules alone."""
+    return analyze(landmarks)[2]
+
+
+# -------------------- Offline replay --------------------
+def load_dataset(path):
+    """(X, y) from a collected_data JSON tree or a landmark store directory."""
+    from landmark_store import load_samples
+    return load_samples(path)
+
+
+def replay(X, y):
+    """Classify a whole dataset; per-label agreement with the stored labels plus timing."""
+    t0 = time.perf_counter()
+    _, counts, predicted = analyze(X)
+    seconds = time.perf_counter() - t0
+    per_label = {}
+    for label in sorted(set(y.tolist())):
+        mask = y == label
+        per_label[label] = {
+            'samples': int(mask.sum()),
+            'agreement': float((predicted[mask] == label).mean()),
+            'predicted': {k: int(v) for k, v in zip(*np.unique(predicted[mask], return_counts=True))},
+        }
+    return {
+        'samples': int(len(X)),
+        'agreement': float((predicted == y).mean()) if len(X) else 0.0,
+        'per_label': per_label,
+        'classify_ms': seconds * 1000.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the gesture rules over a landmark dataset")
+    parser.add_argument('--data', default='collected_data', help="collected_data JSON tree or landmark store")
+    args = parser.parse_args()
+    X, y = load_dataset(args.data)
+    print(json.dumps(replay(X, y), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+# gesture_tracker.py
+# Per-stream temporal wrapper around a per-frame gesture predictor.
+#
+# - inference runs only every `every` frames, or earlier when the frame differs
+#   enough from the one last inferred on (cheap grayscale thumbnail difference);
+#   frames in between reuse the last result
+# - fresh predictions go into a sliding window; the shown label only switches
+#   when a new label wins at least `switch_votes` of the window (hysteresis),
+#   so single-frame flickers never reach the screen
+#
+# One tracker per stream: it keeps that stream's reference frame and history.
+
+import threading
+import time
+from collections import Counter, deque
+
+import cv2
+import numpy as np
+
+DEFAULT_LABEL = 'nothing'
+
+
+class GestureTracker:
+    def __init__(self, predict, every=4, motion_threshold=8.0, window=5, switch_votes=3,
+                 motion_size=(32, 24), initial_label=DEFAULT_LABEL):
+        """
+        predict:          callable(frame) -> label
+        every:            run inference at least once per this many frames (1 = every frame)
+        motion_threshold: mean absolute grey-level difference (0-255) on the thumbnail
+                          that forces an early inference; None disables motion gating
+        window:           number of recent fresh predictions that vote
+        switch_votes:     votes a different label needs before the output switches
+        """
+        self.predict = predict
+        self.every = max(1, int(every))
+        self.motion_threshold = motion_threshold
+        self.switch_votes = max(1, min(int(switch_votes), int(window)))
+        self.motion_size = tuple(motion_size)
+        self.label = initial_label
+        self._votes = deque(maxlen=max(1, int(window)))
+        self._reference = None
+        self._since = 0
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.inferences = 0
+        self.motion_triggers = 0
+        self.switches = 0
+        self.inference_seconds = 0.0
+
+    def _thumbnail(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, self.motion_size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def _should_infer(self, thumb):
+        if self._reference is None or self._since >= self.every:
+            return True
+        if self.motion_threshold is not None:
+            if float(np.abs(thumb - self._reference).mean()) > self.motion_threshold:
+                self.motion_triggers += 1
+                return True
+        return False
+
+    def update(self, frame):
+        """Feed one frame; returns the smoothed label for it."""
+        with self._lock:
+            self.frames += 1
+            self._since += 1
+            thumb = self._thumbnail(frame)
+            if self._should_infer(thumb):
+                t0 = time.perf_counter()
+                raw = self.predict(frame)
+                self.inference_seconds += time.perf_counter() - t0
+                self.inferences += 1
+                self._reference = thumb
+                self._since = 0
+                self._vote(raw)
+            return self.label
+
+    def _vote(self, raw):
+        self._votes.append(raw)
+        if raw == self.label:
+            return
+        top, count = Counter(self._votes).most_common(1)[0]
+        if top != self.label and count >= self.switch_votes:
+            self.label = top
+            self.switches += 1
+
+    def reset(self):
+        with self._lock:
+            self._votes.clear()
+            self._reference = None
+            self._since = 0
+            self.label = DEFAULT_LABEL
+
+    def stats(self):
+        return {
+            "label": self.label,
+            "frames": self.frames,
+            "inferences": self.inferences,
+            "skip_ratio": 1.0 - self.inferences / self.frames if self.frames else 0.0,
+            "motion_triggers": self.motion_triggers,
+            "label_switches": self.switches,
+            "mean_inference_ms": self.inference_seconds / self.inferences * 1000.0 if self.inferences else 0.0,
+            "every": self.every,
+            "window": self._votes.maxlen,
+            "switch_votes": self.switch_votes,
+        }
@@ -0,0 +1,47 @@
+# gunicorn.conf.py
+# Picked up automatically by `gunicorn app:app` (Procfile / Dockerfile).
+# Set PRELOAD_BACKENDS=all (or e.g. "gesture_model,mediapipe_hands") to load and
+# warm the heavy backends when each worker boots rather than on its first request.
+#
+# WORKER_MODE picks how long-lived /video_feed MJPEG streams are served:
+#   gthread (default) WORKER_THREADS threads per worker; an open stream holds one
+#                     thread, the other threads keep serving the API
+#   gevent            cooperative greenlets (pip install gevent); an open stream
+#                     costs one greenlet, up to WORKER_CONNECTIONS per worker
+#   sync              one request per worker process; a single viewer blocks the
+#                     worker (and is killed after `timeout`), only for API-only setups
+# WEB_CONCURRENCY sets the number of worker processes.
+
+import importlib.util
+import os
+
+preload_app = False
+
+WORKER_MODE = os.environ.get("WORKER_MODE", "gthread").lower()
+if WORKER_MODE == "gevent" and importlib.util.find_spec("gevent") is None:
+    print("WORKER_MODE=gevent but gevent is not installed; using gthread")
+    WORKER_MODE = "gthread"
+
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+if WORKER_MODE == "gevent":
+    worker_class = "gevent"
+    worker_connections = int(os.environ.get("WORKER_CONNECTIONS", "1000"))
+elif WORKER_MODE == "sync":
+    worker_class = "sync"
+else:
+    worker_class = "gthread"
+    threads = int(os.environ.get("WORKER_THREADS", "16"))
+
+
+def on_starting(server):
+    # per-worker metrics snapshots from a previous run would be counted again
+    if os.environ.get("METRICS_DIR"):
+        from metrics import clear_dir
+        clear_dir(os.environ["METRICS_DIR"])
+
+
+def post_worker_init(worker):
+    if not os.environ.get("PRELOAD_BACKENDS"):
+        return
+    from app import preload_backends
+    preload_backends()
@@ -0,0 +1,115 @@
+# image_decode.py
+# Shared decode pipeline for uploaded images (base64 data URLs and raw file bytes).
+#
+# - payload size is checked before any base64 or image decoding happens
+# - images always come back as 3-channel BGR uint8 (IMREAD_COLOR drops alpha
+#   directly, so there is no separate BGRA->BGR pass)
+# - when the caller only needs a small image (e.g. 100x100 for predict_gesture),
+#   JPEGs are decoded at 1/2, 1/4 or 1/8 scale with IMREAD_REDUCED_COLOR_*,
+#   which skips most of the IDCT work
+
+import base64
+import binascii
+import os
+import struct
+
+import cv2
+import numpy as np
+
+MAX_IMAGE_BYTES = int(os.environ.get("MAX_IMAGE_BYTES", str(5 * 1024 * 1024)))
+
+# keep orientation as stored, matching the previous IMREAD_UNCHANGED / PIL behaviour
+_BASE_FLAGS = cv2.IMREAD_IGNORE_ORIENTATION
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+class PayloadTooLarge(ValueError):
+    """Raised before decoding when an upload exceeds the configured byte limit."""
+
+
+def split_data_url(img_b64):
+    """Return the base64 part of a data URL (or the string itself)."""
+    if ',' in img_b64[:128]:
+        return img_b64.split(',', 1)[1]
+    return img_b64
+
+
+def b64_payload(img_b64, max_bytes=None):
+    """Base64-decode a data URL after checking the decoded size against max_bytes."""
+    max_bytes = MAX_IMAGE_BYTES if max_bytes is None else max_bytes
+    encoded = split_data_url(img_b64)
+    if len(encoded) * 3 // 4 > max_bytes:
+        raise PayloadTooLarge(f"image larger than {max_bytes} bytes")
+    try:
+        return base64.b64decode(encoded)
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"invalid base64 image: {e}")
+
+
+def jpeg_size(data):
+    """(width, height) from a JPEG SOF marker without decoding, or None if not a JPEG."""
+    if len(data) < 4 or data[:2] != b'\xff\xd8':
+        return None
+    pos = 2
+    n = len(data)
+    while pos + 9 < n:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        seg_len = struct.unpack('>H', data[pos + 2:pos + 4])[0]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            h, w = struct.unpack('>HH', data[pos + 5:pos + 9])
+            return w, h
+        pos += 2 + seg_len
+    return None
+
+
+def decode_flags(data, target_size=None):
+    """Pick the cheapest imdecode flag that still yields at least target_size (w, h)."""
+    if target_size:
+        size = jpeg_size(data)
+        if size:
+            w, h = size
+            tw, th = target_size
+            for factor, flag in _REDUCED_FLAGS:
+                if w // factor >= tw and h // factor >= th:
+                    return flag | _BASE_FLAGS
+    return cv2.IMREAD_COLOR | _BASE_FLAGS
+
+
+def decode_image(data, target_size=None, max_bytes=None):
+    """
+    Decode encoded image bytes into a BGR uint8 array.
+    target_size: (w, h) the caller will resize to; allows reduced-resolution JPEG decode.
+    """
+    max_bytes = MAX_IMAGE_BYTES if max_bytes is None else max_bytes
+    if len(data) > max_bytes:
+        raise PayloadTooLarge(f"image larger than {max_bytes} bytes")
+    arr = np.frombuffer(data, np.uint8)
+    img = cv2.imdecode(arr, decode_flags(data, target_size))
+    if img is None:
+        raise ValueError("Could not decode image")
+    return img
+
+
+def decode_b64_image(img_b64, target_size=None, max_bytes=None):
+    return decode_image(b64_payload(img_b64, max_bytes), target_size, max_bytes)
+
+
+def read_upload(file_storage, max_bytes=None):
+    """Read an uploaded werkzeug FileStorage, refusing to buffer more than max_bytes."""
+    max_bytes = MAX_IMAGE_BYTES if max_bytes is None else max_bytes
+    data = file_storage.stream.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise PayloadTooLarge(f"image larger than {max_bytes} bytes")
+    return data
@@ -0,0 +1,137 @@
+# inference_batcher.py
+# In-process micro-batching for model inference.
+# Concurrent callers submit single inputs; a background thread gathers them for
+# up to max_wait_ms or max_batch items, runs one batched forward pass and hands
+# each caller its own result back through a Future.
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    def __init__(self, predict_fn, max_batch=16, max_wait_ms=5.0, name="batcher"):
+        """
+        predict_fn: callable taking an array of shape (B, ...) and returning a
+        sequence of B results (one per input, in order).
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.predict_fn = predict_fn
+        self.max_batch = int(max_batch)
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.last_batch_size = 0
+        self.max_batch_seen = 0
+        self.queue_delay_total = 0.0
+        self.queue_delay_max = 0.0
+        self.batch_size_counts = {}
+
+    # -------------------- Public API --------------------
+    def submit(self, item):
+        """Queue one input; returns a concurrent.futures.Future with its result."""
+        if self._closed:
+            raise RuntimeError(f"{self.name} is closed")
+        self._ensure_worker()
+        fut = Future()
+        self._queue.put((item, fut, time.perf_counter()))
+        return fut
+
+    def predict(self, item, timeout=None):
+        return self.submit(item).result(timeout=timeout)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": self.batches,
+                "items": self.items,
+                "errors": self.errors,
+                "pending": self._queue.qsize(),
+                "last_batch_size": self.last_batch_size,
+                "max_batch_size": self.max_batch_seen,
+                "mean_batch_size": (self.items / self.batches) if self.batches else 0.0,
+                "batch_size_counts": {str(k): v for k, v in sorted(self.batch_size_counts.items())},
+                "mean_queue_delay_ms": (self.queue_delay_total / self.items * 1000.0) if self.items else 0.0,
+                "max_queue_delay_ms": self.queue_delay_max * 1000.0,
+            }
+
+    def close(self, timeout=1.0):
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    # -------------------- Worker --------------------
+    def _ensure_worker(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    t = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    t.start()
+                    self._thread = t
+
+    def _gather(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                self._queue.put(None)  # let the loop see the close marker after this batch
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._gather()
+            if batch is None:
+                return
+            started = time.perf_counter()
+            inputs = [entry[0] for entry in batch]
+            futures = [entry[1] for entry in batch]
+            try:
+                results = self.predict_fn(np.stack(inputs))
+                if len(results) != len(batch):
+                    raise RuntimeError(f"predict_fn returned {len(results)} results for {len(batch)} inputs")
+            except Exception as e:
+                with self._stats_lock:
+                    self.errors += 1
+                for fut in futures:
+                    fut.set_exception(e)
+                continue
+            with self._stats_lock:
+                n = len(batch)
+                self.batches += 1
+                self.items += n
+                self.last_batch_size = n
+                self.max_batch_seen = max(self.max_batch_seen, n)
+                self.batch_size_counts[n] = self.batch_size_counts.get(n, 0) + 1
+                for entry in batch:
+                    delay = started - entry[2]
+                    self.queue_delay_total += delay
+                    self.queue_delay_max = max(self.queue_delay_max, delay)
+            for fut, result in zip(futures, results):
+                fut.set_result(result)
@@ -0,0 +1,251 @@
+# landmark_classifier.py
+# Server-side gesture classifier over MediaPipe hand landmarks.
+# Pure NumPy (no TensorFlow): wrist-relative, scale-normalized features and a
+# nearest-centroid model with a per-class reject radius, stored as an .npz.
+# A class radius is its RMS within-class spread (times RADIUS_SCALE), capped at the distance to the
+# nearest other centroid; invalid frames (non-finite, wrist on the knuckle) and
+# frames outside every radius are UNKNOWN_LABEL.
+#
+# Train / refresh the model file from collected_data/ (or a landmark_store/ directory):
+#   python landmark_classifier.py --data collected_data --out models/landmark_classifier.npz
+# Per-class counts and mean squared norms are stored with the centroids, so new
+# samples can be folded in with partial_fit (see retraining.py) without
+# revisiting the old ones.
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+FEATURE_DIM = (NUM_LANDMARKS - 1) * 3  # wrist is the origin, so it is dropped
+UNKNOWN_LABEL = 'nothing'
+# reject radius = RADIUS_SCALE * the RMS distance of a class's samples to its centroid
+RADIUS_SCALE = 1.4
+
+WRIST = 0
+MIDDLE_MCP = 9
+
+
+# -------------------- Payload parsing --------------------
+def _frame_from_points(points):
+    if len(points) != NUM_LANDMARKS:
+        raise ValueError(f"expected {NUM_LANDMARKS} landmarks, got {len(points)}")
+    if not all(isinstance(p, dict) for p in points):
+        raise ValueError("every landmark must be an {x, y, z} object")
+    return [[p.get('x', 0.0), p.get('y', 0.0), p.get('z', 0.0)] for p in points]
+
+
+def parse_landmarks(obj):
+    """
+    Coerce a landmark payload into an (N, 21, 3) float32 array.
+    Accepts one frame or a list of frames, where a frame is a flat list of 63
+    floats, 21 [x, y, z] triples, or 21 {"x", "y", "z"} dicts (MediaPipe JS).
+    """
+    if not isinstance(obj, (list, tuple)) or not obj:
+        raise ValueError("landmarks must be a non-empty list")
+    first = obj[0]
+    if isinstance(first, dict):
+        frames = [_frame_from_points(obj)]
+    elif isinstance(first, (list, tuple)):
+        single_triples = len(obj) == NUM_LANDMARKS and len(first) == 3 and not isinstance(first[0], (list, tuple, dict))
+        if single_triples:
+            frames = [obj]
+        elif first and isinstance(first[0], dict):
+            frames = [_frame_from_points(f) for f in obj]
+        else:
+            frames = obj
+    else:
+        frames = [obj]
+    try:
+        arr = np.asarray(frames, dtype=np.float32)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"could not parse landmarks: {e}")
+    if arr.size == 0 or arr.size % (NUM_LANDMARKS * 3) != 0:
+        raise ValueError(f"each frame must have {NUM_LANDMARKS} x 3 values")
+    return arr.reshape(-1, NUM_LANDMARKS, 3)
+
+
+# -------------------- Features --------------------
+def landmark_features(arr):
+    """(N, 21, 3) landmarks -> (N, 60) wrist-relative, hand-size-normalized features."""
+    arr = np.asarray(arr, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+    rel = arr[:, 1:, :] - arr[:, WRIST:WRIST + 1, :]
+    scale = np.linalg.norm(rel[:, MIDDLE_MCP - 1, :2], axis=1)
+    scale = np.maximum(scale, 1e-6)
+    return (rel / scale[:, None, None]).reshape(len(arr), FEATURE_DIM)
+
+
+# -------------------- Model --------------------
+def _unseen_scale(counts):
+    # a sample the centroid was not fitted on sits (n + 1) / (n - 1) times farther
+    # from it, in expected squared distance, than the n samples it was fitted on
+    n = np.asarray(counts, dtype=np.float64)
+    return np.sqrt((n + 1.0) / np.maximum(n - 1.0, 1.0))
+
+
+def _spread_radii(centroids, sq_means, counts):
+    """
+    RADIUS_SCALE * RMS within-class spread (E||x||^2 - ||c||^2, corrected for samples
+    outside the training set). A class never reaches past the nearest other
+    centroid; a floor keeps one-sample classes usable.
+    """
+    c = np.asarray(centroids, dtype=np.float64)
+    spread = np.maximum(np.asarray(sq_means, dtype=np.float64) - np.einsum('ij,ij->i', c, c), 0.0)
+    radii = np.sqrt(spread) * _unseen_scale(counts) * RADIUS_SCALE
+    if len(c) > 1:
+        gap = np.linalg.norm(c[:, None, :] - c[None, :, :], axis=2)
+        np.fill_diagonal(gap, np.inf)
+        radii = np.minimum(radii, gap.min(axis=1))
+    return np.maximum(radii, 1e-3)
+
+
+class LandmarkClassifier:
+    """Nearest-centroid classifier; frames farther than a class radius map to UNKNOWN_LABEL."""
+
+    def __init__(self, labels, centroids, radii, counts, version=0, trained_through=0, sq_means=None):
+        self.labels = np.asarray(labels)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.radii = np.asarray(radii, dtype=np.float32)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.version = int(version)                  # bumped by every retrain that is kept
+        self.trained_through = int(trained_through)  # landmark store ids below this were seen
+        self._centroid_sq = np.einsum('ij,ij->i', self.centroids, self.centroids)
+        if sq_means is None:  # older model files: recover the spread from the radius
+            spread = self.radii.astype(np.float64) / (RADIUS_SCALE * _unseen_scale(self.counts))
+            sq_means = spread ** 2 + self._centroid_sq
+        self.sq_means = np.asarray(sq_means, dtype=np.float64)  # per-class mean of ||x||^2
+
+    @staticmethod
+    def _training_rows(landmarks, labels):
+        # (features, labels) of the usable rows; a single NaN frame would poison a centroid
+        from gesture_rules import valid_rows  # gesture_rules imports this module
+        landmarks = np.asarray(landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+        y = np.asarray(labels)
+        if len(landmarks) != len(y):
+            raise ValueError("landmarks and labels differ in length")
+        keep = valid_rows(landmarks)
+        return landmark_features(landmarks[keep]).astype(np.float64), y[keep]
+
+    @classmethod
+    def fit(cls, landmarks, labels):
+        """Fit from scratch; invalid rows (see gesture_rules.valid_rows) are skipped."""
+        X, y = cls._training_rows(landmarks, labels)
+        if len(X) == 0:
+            raise ValueError("need at least one valid labelled sample")
+        classes = np.unique(y)
+        centroids = np.stack([X[y == c].mean(axis=0) for c in classes])
+        sq_means = np.array([np.einsum('ij,ij->i', X[y == c], X[y == c]).mean() for c in classes])
+        counts = [int(np.sum(y == c)) for c in classes]
+        return cls(classes, centroids, _spread_radii(centroids, sq_means, counts), counts, sq_means=sq_means)
+
+    def partial_fit(self, landmarks, labels):
+        """
+        Warm-start update from new samples only; returns a new classifier.
+        Centroids and the per-class mean of ||x||^2 are exact running means
+        (old mean * count + new sum), so the radii come out as if fit() had seen
+        every sample: a class whose new samples are tighter also shrinks.
+        Invalid rows are skipped, as in fit().
+        """
+        X, y = self._training_rows(landmarks, labels)
+        old = {label: i for i, label in enumerate(self.labels.tolist())}
+        classes = np.union1d(self.labels.astype(str), np.unique(y).astype(str))
+        centroids, sq_means, counts = [], [], []
+        for c in classes:
+            new = X[y == c]
+            i = old.get(c)
+            n_old = int(self.counts[i]) if i is not None else 0
+            total = new.sum(axis=0)
+            sq_total = float(np.einsum('ij,ij->', new, new))
+            if i is not None:
+                total += self.centroids[i].astype(np.float64) * n_old
+                sq_total += float(self.sq_means[i]) * n_old
+            n = n_old + len(new)
+            centroids.append(total / n)
+            sq_means.append(sq_total / n)
+            counts.append(n)
+        centroids = np.stack(centroids)
+        return LandmarkClassifier(classes, centroids, _spread_radii(centroids, sq_means, counts), counts,
+                                  version=self.version, trained_through=self.trained_through, sq_means=sq_means)
+
+    def distances(self, features):
+        # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2, one matmul for the whole batch
+        x_sq = np.einsum('ij,ij->i', features, features)[:, None]
+        d2 = x_sq - 2.0 * features @ self.centroids.T + self._centroid_sq[None, :]
+        return np.sqrt(np.maximum(d2, 0.0))
+
+    def predict(self, landmarks):
+        """Classify a batch of frames. Returns (labels, distances) arrays of length N."""
+        labels, best, _ = self.predict_with_margin(landmarks)
+        return labels, best
+
+    def predict_with_margin(self, landmarks):
+        """
+        (labels, distances, margins) for a batch of frames. margin is
+        1 - d / min(radius, distance to the runner-up centroid): 1 on a centroid,
+        0 at the reject boundary and for rejected or invalid frames.
+        """
+        from gesture_rules import valid_rows  # gesture_rules imports this module
+        landmarks = np.asarray(landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+        valid = valid_rows(landmarks)
+        d = self.distances(landmark_features(np.where(valid[:, None, None], landmarks, 0.0)))
+        rows = np.arange(len(d))
+        idx = np.argmin(d, axis=1)
+        best = d[rows, idx]
+        bound = self.radii[idx].astype(np.float64)
+        if d.shape[1] > 1:
+            d[rows, idx] = np.inf
+            bound = np.minimum(bound, d.min(axis=1))
+        accepted = valid & (best <= bound)
+        out = self.labels[idx].astype(object)
+        out[~accepted] = UNKNOWN_LABEL
+        best = np.where(valid, best, np.inf)
+        margin = np.where(accepted, 1.0 - best / np.maximum(bound, 1e-12), 0.0)
+        return out, best, margin
+
+    def save(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, labels=self.labels.astype(str), centroids=self.centroids,
+                 radii=self.radii, counts=self.counts, sq_means=self.sq_means,
+                 version=np.int64(self.version), trained_through=np.int64(self.trained_through))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            extra = {k: int(z[k]) for k in ('version', 'trained_through') if k in z.files}
+            if 'sq_means' in z.files:
+                extra['sq_means'] = z['sq_means']
+            return cls(z['labels'], z['centroids'], z['radii'], z['counts'], **extra)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the landmark gesture classifier")
+    parser.add_argument('--data', default='collected_data', help="collected_data/ JSON tree or a landmark_store/ directory")
+    parser.add_argument('--out', default=os.path.join('models', 'landmark_classifier.npz'))
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    from landmark_store import load_samples
+    X, y = load_samples(args.data)
+    if len(X) == 0:
+        print(f"No usable samples in {args.data}")
+        return 1
+    clf = LandmarkClassifier.fit(X, y)
+    clf.save(args.out)
+    print(f"Trained on {len(X)} samples ({', '.join(clf.labels)}) in {time.perf_counter() - t0:.3f}s -> {args.out}")
+
+    batch = np.repeat(X, max(1, 10000 // len(X)), axis=0)
+    t0 = time.perf_counter()
+    clf.predict(batch)
+    per_frame = (time.perf_counter() - t0) / len(batch)
+    print(f"Batch inference: {per_frame * 1e6:.2f} us/frame ({1.0 / per_frame:,.0f} frames/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
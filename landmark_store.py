@@ -0,0 +1,272 @@
+# landmark_store.py
+# Append-only, chunked columnar store for hand-landmark samples.
+#
+# Layout (all arrays are plain .npy so np.load(mmap_mode='r') works):
+#   <root>/meta.json                  {"count", "chunk_rows", "labels", ...}
+#   <root>/chunk_00000/landmarks.npy  (chunk_rows, 63) float32
+#   <root>/chunk_00000/labels.npy     (chunk_rows,)    int16 index into meta["labels"]
+#   <root>/chunk_00000/timestamps.npy (chunk_rows,)    float64 unix seconds
+#
+# Chunks are preallocated; rows past meta["count"] are unused. Appends take an
+# exclusive file lock, write the rows, flush, then atomically replace meta.json,
+# so readers never see a partially written sample and ids are allocated in O(1).
+#
+#   python landmark_store.py convert collected_data landmark_store
+#   python landmark_store.py info landmark_store
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from landmark_classifier import NUM_LANDMARKS, parse_landmarks
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+ROW_DIM = NUM_LANDMARKS * 3
+DEFAULT_CHUNK_ROWS = 4096
+COLUMNS = {
+    "landmarks": (np.float32, (ROW_DIM,)),
+    "labels": (np.int16, ()),
+    "timestamps": (np.float64, ()),
+}
+
+
+def is_store(path):
+    return os.path.exists(os.path.join(path, "meta.json"))
+
+
+class LandmarkStore:
+    def __init__(self, root, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        if not is_store(root):
+            with self._locked():
+                if not is_store(root):
+                    self._write_meta({"version": 1, "count": 0, "chunk_rows": int(chunk_rows), "labels": []})
+        self.chunk_rows = self.meta()["chunk_rows"]
+
+    # -------------------- Metadata --------------------
+    def meta(self):
+        with open(os.path.join(self.root, "meta.json")) as f:
+            return json.load(f)
+
+    def _write_meta(self, meta):
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".meta-", suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.root, "meta.json"))
+
+    def __len__(self):
+        return self.meta()["count"]
+
+    @property
+    def labels(self):
+        return list(self.meta()["labels"])
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.root, ".lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # -------------------- Chunks --------------------
+    def _chunk_path(self, idx, column):
+        return os.path.join(self.root, f"chunk_{idx:05d}", f"{column}.npy")
+
+    def _open_chunk(self, idx, mode):
+        arrays = {}
+        for column, (dtype, shape) in COLUMNS.items():
+            path = self._chunk_path(idx, column)
+            if mode == "r+" and not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                arrays[column] = np.lib.format.open_memmap(
+                    path, mode="w+", dtype=dtype, shape=(self.chunk_rows,) + shape)
+            elif mode == "r+":
+                arrays[column] = np.lib.format.open_memmap(path, mode="r+")
+            else:
+                arrays[column] = np.load(path, mmap_mode="r")
+        return arrays
+
+    # -------------------- Writes --------------------
+    def append(self, landmarks, labels, timestamps=None):
+        """
+        Append N samples atomically. landmarks: anything parse_landmarks accepts
+        or an (N, 63) / (N, 21, 3) array; labels: one label or N labels.
+        Returns the list of allocated sample ids.
+        """
+        X = np.asarray(landmarks, dtype=np.float32) if isinstance(landmarks, np.ndarray) else parse_landmarks(landmarks)
+        X = X.reshape(-1, ROW_DIM)
+        n = len(X)
+        if isinstance(labels, str):
+            labels = [labels] * n
+        if len(labels) != n:
+            raise ValueError(f"got {len(labels)} labels for {n} samples")
+        if timestamps is None:
+            timestamps = np.full(n, time.time())
+        timestamps = np.asarray(timestamps, dtype=np.float64).reshape(n)
+
+        with self._locked():
+            return self._append_locked(X, labels, timestamps)
+
+    def _append_locked(self, X, labels, timestamps):
+        meta = self.meta()
+        vocab = meta["labels"]
+        ids = []
+        for label in labels:
+            if label not in vocab:
+                vocab.append(label)
+            ids.append(vocab.index(label))
+        label_ids = np.asarray(ids, dtype=np.int16)
+
+        n = len(X)
+        start = meta["count"]
+        written = 0
+        while written < n:
+            pos = start + written
+            chunk, offset = divmod(pos, self.chunk_rows)
+            take = min(n - written, self.chunk_rows - offset)
+            arrays = self._open_chunk(chunk, "r+")
+            arrays["landmarks"][offset:offset + take] = X[written:written + take]
+            arrays["labels"][offset:offset + take] = label_ids[written:written + take]
+            arrays["timestamps"][offset:offset + take] = timestamps[written:written + take]
+            for arr in arrays.values():
+                arr.flush()
+            del arrays
+            written += take
+        meta["count"] = start + n
+        self._write_meta(meta)  # commit point
+        return list(range(start, start + n))
+
+    # -------------------- Reads --------------------
+    def iter_chunks(self, start=0, stop=None, meta=None):
+        """Yield (first_id, landmarks, label_ids, timestamps) memory-mapped views, chunk by chunk."""
+        meta = meta or self.meta()
+        stop = meta["count"] if stop is None else min(stop, meta["count"])
+        pos = start
+        while pos < stop:
+            chunk, offset = divmod(pos, self.chunk_rows)
+            take = min(stop - pos, self.chunk_rows - offset)
+            arrays = self._open_chunk(chunk, "r")
+            yield (pos,
+                   arrays["landmarks"][offset:offset + take],
+                   arrays["labels"][offset:offset + take],
+                   arrays["timestamps"][offset:offset + take])
+            pos += take
+
+    def read(self, start=0, stop=None):
+        """Return (landmarks (N, 21, 3), labels (N,) str, timestamps (N,)) for ids [start, stop)."""
+        meta = self.meta()
+        vocab = np.asarray(meta["labels"] or [""])
+        parts = list(self.iter_chunks(start, stop, meta))
+        if not parts:
+            return (np.zeros((0, NUM_LANDMARKS, 3), np.float32), np.array([], dtype=str),
+                    np.zeros(0, np.float64))
+        X = np.concatenate([p[1] for p in parts]).reshape(-1, NUM_LANDMARKS, 3)
+        y = vocab[np.concatenate([p[2] for p in parts])]
+        ts = np.concatenate([p[3] for p in parts])
+        return X, y, ts
+
+
+# -------------------- Legacy conversion --------------------
+def read_json_tree(data_dir):
+    """Read every valid collected_data/<label>/*.json sample as (N, 63) rows, labels, mtimes."""
+    frames, labels, stamps = [], [], []
+    if not os.path.isdir(data_dir):
+        return np.zeros((0, ROW_DIM), np.float32), labels, stamps
+    for label in sorted(os.listdir(data_dir)):
+        label_dir = os.path.join(data_dir, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for fname in sorted(os.listdir(label_dir)):
+            if not fname.endswith(".json"):
+                continue
+            path = os.path.join(label_dir, fname)
+            try:
+                with open(path) as f:
+                    sample = json.load(f)
+                arr = parse_landmarks(sample["landmarks"])
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            frames.append(arr.reshape(-1, ROW_DIM))
+            labels.extend([sample.get("label") or label] * len(arr))
+            stamps.extend([os.path.getmtime(path)] * len(arr))
+    if not frames:
+        return np.zeros((0, ROW_DIM), np.float32), labels, stamps
+    return np.concatenate(frames), labels, stamps
+
+
+def load_samples(path):
+    """(landmarks (N, 21, 3), labels (N,) str) from a landmark store or a collected_data JSON tree."""
+    if is_store(path):
+        X, y, _ = LandmarkStore(path).read()
+        return X, y
+    rows, labels, _ = read_json_tree(path)
+    return rows.reshape(-1, NUM_LANDMARKS, 3), np.asarray(labels, dtype=str)
+
+
+def convert_json_tree(data_dir, store, once=False):
+    """
+    Append the JSON tree under data_dir to the store and record it in meta.json.
+    With once=True this is a no-op if any import was already recorded (safe to
+    call from every worker at startup). Returns the number of samples added.
+    """
+    if once and store.meta().get("imported_legacy"):
+        return 0  # the common case at startup: don't read the tree just to discard it
+    X, labels, stamps = read_json_tree(data_dir)
+    with store._locked():
+        if once and store.meta().get("imported_legacy"):  # another worker got there first
+            return 0
+        if labels:
+            store._append_locked(X, labels, np.asarray(stamps, dtype=np.float64))
+        meta = store.meta()
+        meta["imported_legacy"] = os.path.abspath(data_dir)
+        store._write_meta(meta)
+    return len(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar landmark store tools")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    conv = sub.add_parser("convert", help="import a collected_data/ JSON tree")
+    conv.add_argument("data_dir")
+    conv.add_argument("store_dir")
+    info = sub.add_parser("info", help="print sample counts per label")
+    info.add_argument("store_dir")
+    args = parser.parse_args()
+
+    if args.cmd == "convert":
+        t0 = time.perf_counter()
+        store = LandmarkStore(args.store_dir)
+        n = convert_json_tree(args.data_dir, store)
+        print(f"Converted {n} samples into {args.store_dir} in {time.perf_counter() - t0:.3f}s")
+    else:
+        store = LandmarkStore(args.store_dir)
+        _, y, _ = store.read()
+        names, counts = np.unique(y, return_counts=True)
+        print(f"{len(y)} samples in {args.store_dir}")
+        for name, count in zip(names, counts):
+            print(f"  {name}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+# landmark_stream.py
+# Incremental parsers for bulk landmark uploads.
+#
+# Two wire formats are accepted, both read from a file-like stream in fixed-size
+# chunks so a long upload is never buffered whole:
+#   application/x-ndjson      one frame per line: a landmark list (63 floats,
+#                             21 triples or 21 {x,y,z}) or {"landmarks": [...]}
+#   application/octet-stream  packed little-endian float32, 63 values per frame
+# Frames are yielded in (N, 21, 3) float32 batches so they can be classified
+# with one vectorized call per batch.
+
+import json
+
+import numpy as np
+
+from landmark_classifier import NUM_LANDMARKS, parse_landmarks
+
+FRAME_FLOATS = NUM_LANDMARKS * 3
+FRAME_BYTES = FRAME_FLOATS * 4
+READ_CHUNK = 64 * 1024
+MAX_LINE_BYTES = 64 * 1024  # a frame of 21 {x,y,z} objects is ~1.5 KB
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson", "text/plain")
+BINARY_TYPES = ("application/octet-stream",)
+
+
+def _read_chunks(stream, chunk_size=READ_CHUNK):
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_ndjson_batches(stream, batch_size=256, errors=None, max_line=MAX_LINE_BYTES):
+    """
+    Yield (first_index, (N, 21, 3) frames, valid_mask) from newline-delimited JSON.
+    Unparseable lines keep their index (as an all-zero row with valid_mask False)
+    so results line up with input lines, and are reported in `errors` as
+    {"frame": index, "error": message}. A line longer than max_line bytes raises
+    ValueError rather than growing the buffer without bound.
+    """
+    pending, valid, index, first = [], [], 0, 0
+    buf = b""
+    for chunk in _read_chunks(stream):
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        if len(buf) > max_line:
+            raise ValueError(f"NDJSON line longer than {max_line} bytes")
+        for line in lines:
+            if not _parse_line(line, pending, valid, index, errors):
+                continue
+            index += 1
+            if len(valid) >= batch_size:
+                yield first, _stack(pending), np.asarray(valid)
+                pending, valid, first = [], [], index
+    _parse_line(buf, pending, valid, index, errors)
+    if valid:
+        yield first, _stack(pending), np.asarray(valid)
+
+
+def _parse_line(line, pending, valid, index, errors):
+    # returns False for blank lines, True once a (possibly invalid) frame was recorded
+    line = line.strip()
+    if not line:
+        return False
+    try:
+        obj = json.loads(line)
+        if isinstance(obj, dict):
+            obj = obj.get("landmarks")
+        frame = parse_landmarks(obj)
+        if len(frame) != 1:
+            raise ValueError("one frame per line")
+        pending.append(frame[0])
+        valid.append(True)
+    except (ValueError, TypeError) as e:
+        pending.append(np.zeros((NUM_LANDMARKS, 3), np.float32))
+        valid.append(False)
+        if errors is not None:
+            errors.append({"frame": index, "error": str(e)})
+    return True
+
+
+def _stack(frames):
+    return np.stack(frames).astype(np.float32, copy=False)
+
+
+def iter_binary_batches(stream, batch_size=256):
+    """Yield (first_index, (N, 21, 3) frames, valid_mask) from packed float32 frames."""
+    buf = bytearray()
+    index = 0
+    want = batch_size * FRAME_BYTES
+    for chunk in _read_chunks(stream):
+        buf += chunk
+        while len(buf) >= want:
+            frames = np.frombuffer(bytes(buf[:want]), dtype="<f4").reshape(-1, NUM_LANDMARKS, 3)
+            del buf[:want]
+            yield index, frames, np.ones(len(frames), dtype=bool)
+            index += len(frames)
+    usable = len(buf) - len(buf) % FRAME_BYTES
+    if len(buf) != usable:
+        raise ValueError(f"binary body is not a multiple of {FRAME_BYTES} bytes (63 float32 per frame)")
+    if usable:
+        frames = np.frombuffer(bytes(buf[:usable]), dtype="<f4").reshape(-1, NUM_LANDMARKS, 3)
+        yield index, frames, np.ones(len(frames), dtype=bool)
+
+
+def iter_batches(stream, content_type, batch_size=256, errors=None):
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in BINARY_TYPES:
+        return iter_binary_batches(stream, batch_size)
+    if content_type in NDJSON_TYPES or not content_type:
+        return iter_ndjson_batches(stream, batch_size, errors)
+    raise ValueError(f"unsupported content type: {content_type}")
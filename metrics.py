@@ -0,0 +1,285 @@
+# metrics.py
+# Minimal Prometheus-style metrics: counters and fixed-bucket histograms kept
+# in process memory (a dict update under a lock per observation), per-route
+# request instrumentation for a Flask app, stage timers, and a text exposition
+# for GET /metrics.
+#
+# Multiple gunicorn workers: with METRICS_DIR set, every worker writes a
+# snapshot to METRICS_DIR/worker_<pid>.json every METRICS_FLUSH_SECONDS (and at
+# exit); /metrics merges its own live values with the other workers' files, so
+# whichever worker answers the scrape reports totals for all of them.
+
+import atexit
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+METRICS_DIR = os.environ.get("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "5"))
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, value=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(k), v] for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][i] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(k), {"counts": list(c), "sum": s}] for k, (c, s) in self._values.items()]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def snapshot(self):
+        """JSON-serializable state of every metric (what workers write to METRICS_DIR)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        out = {}
+        for m in metrics:
+            entry = {"type": m.kind, "help": m.help, "labelnames": list(m.labelnames), "samples": m.snapshot()}
+            if m.kind == "histogram":
+                entry["buckets"] = list(m.buckets)
+            out[m.name] = entry
+        return out
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter("http_requests_total", "HTTP requests", ("route", "method", "status"))
+LATENCY = REGISTRY.histogram("http_request_duration_seconds", "Time until the response is returned by the view "
+                             "(first byte for streaming routes)", ("route",))
+REQUEST_BYTES = REGISTRY.histogram("http_request_size_bytes", "Request body size", ("route",), SIZE_BUCKETS)
+RESPONSE_BYTES = REGISTRY.histogram("http_response_size_bytes", "Response body size (non-streaming)",
+                                    ("route",), SIZE_BUCKETS)
+STAGES = REGISTRY.histogram("stage_duration_seconds", "Time spent in internal processing stages", ("stage",))
+CACHE_LOOKUPS = REGISTRY.counter("result_cache_lookups_total", "Result cache lookups by outcome (hit, shared_hit, miss)",
+                                 ("cache", "result"))
+
+
+def stage(name):
+    """Context manager timing one processing stage: with metrics.stage("decode"): ..."""
+    return STAGES.time(stage=name)
+
+
+# -------------------- Multi-process aggregation --------------------
+def merge(snapshots):
+    """Sum counters and histogram buckets across snapshots (one per worker)."""
+    merged = {}
+    for snap in snapshots:
+        for name, entry in snap.items():
+            target = merged.setdefault(name, {k: v for k, v in entry.items() if k != "samples"})
+            samples = target.setdefault("_samples", {})
+            for labels, value in entry["samples"]:
+                key = tuple(labels)
+                if entry["type"] == "counter":
+                    samples[key] = samples.get(key, 0.0) + value
+                else:
+                    cur = samples.get(key)
+                    if cur is None:
+                        samples[key] = {"counts": list(value["counts"]), "sum": value["sum"]}
+                    else:
+                        cur["counts"] = [a + b for a, b in zip(cur["counts"], value["counts"])]
+                        cur["sum"] += value["sum"]
+    for entry in merged.values():
+        entry["samples"] = [[list(k), v] for k, v in entry.pop("_samples", {}).items()]
+    return merged
+
+
+def _worker_path(directory, pid=None):
+    return os.path.join(directory, f"worker_{pid or os.getpid()}.json")
+
+
+def write_snapshot(directory=None, registry=REGISTRY):
+    directory = directory or METRICS_DIR
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(registry.snapshot(), f)
+    os.replace(tmp, _worker_path(directory))
+
+
+def collect(directory=None, registry=REGISTRY):
+    """This process's live metrics merged with the other workers' latest snapshots."""
+    directory = directory or METRICS_DIR
+    snapshots = [registry.snapshot()]
+    if directory and os.path.isdir(directory):
+        own = _worker_path(directory)
+        for path in glob.glob(os.path.join(directory, "worker_*.json")):
+            if path == own:
+                continue
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # being replaced right now; picked up on the next scrape
+    return merge(snapshots)
+
+
+def clear_dir(directory=None):
+    """Remove old worker snapshots (call once when the server starts)."""
+    directory = directory or METRICS_DIR
+    for path in glob.glob(os.path.join(directory, "worker_*.json")) if directory else []:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+# -------------------- Text exposition --------------------
+def _fmt_labels(names, values, extra=None):
+    pairs = [(n, v) for n, v in zip(names, values)] + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{n}="{v}"' for (n, _), v in zip(pairs, escaped)) + "}"
+
+
+def _fmt_value(v):
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+def render(merged):
+    lines = []
+    for name in sorted(merged):
+        entry = merged[name]
+        names = entry["labelnames"]
+        lines.append(f"# HELP {name} {entry['help']}")
+        lines.append(f"# TYPE {name} {entry['type']}")
+        for labels, value in sorted(entry["samples"]):
+            if entry["type"] == "counter":
+                lines.append(f"{name}{_fmt_labels(names, labels)} {_fmt_value(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(list(entry["buckets"]) + ["+Inf"], value["counts"]):
+                cumulative += count
+                le = bound if bound == "+Inf" else _fmt_value(bound)
+                lines.append(f"{name}_bucket{_fmt_labels(names, labels, ('le', le))} {cumulative}")
+            lines.append(f"{name}_sum{_fmt_labels(names, labels)} {_fmt_value(value['sum'])}")
+            lines.append(f"{name}_count{_fmt_labels(names, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+# -------------------- Flask integration --------------------
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def _flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_SECONDS)
+        try:
+            write_snapshot()
+        except OSError as e:
+            print("Metrics snapshot failed:", e)
+
+
+def _start_flusher():
+    # started lazily from the first request, i.e. inside the (forked) worker
+    global _flusher
+    if _flusher is None and METRICS_DIR:
+        with _flusher_lock:
+            if _flusher is None:
+                _flusher = threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True)
+                _flusher.start()
+                atexit.register(write_snapshot)
+
+
+def init_app(app, endpoint="/metrics"):
+    """Per-route request count, latency and payload size for every view, plus GET /metrics."""
+    from flask import Response, g, request
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_t0 = time.perf_counter()
+        _start_flusher()
+
+    @app.after_request
+    def _metrics_record(response):
+        t0 = g.pop("_metrics_t0", None)
+        if t0 is None:
+            return response
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        LATENCY.observe(time.perf_counter() - t0, route=route)
+        REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        if request.content_length:
+            REQUEST_BYTES.observe(request.content_length, route=route)
+        if not response.is_streamed and response.content_length is not None:
+            RESPONSE_BYTES.observe(response.content_length, route=route)
+        return response
+
+    def metrics_view():
+        return Response(render(collect()), mimetype=None, content_type=CONTENT_TYPE)
+
+    app.add_url_rule(endpoint, "metrics", metrics_view)
+    return app
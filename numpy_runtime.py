@@ -0,0 +1,255 @@
+# numpy_runtime.py
+# TensorFlow-free inference for the gesture image classifier.
+#
+# export_keras() writes a trained Keras Sequential model (the architectures in
+# gesture_model_training.ipynb: Conv2D / MaxPooling2D / Flatten / Dropout /
+# Dense) to a single .npz: a JSON layer spec plus the weight arrays, kernels
+# optionally int8-quantized per output channel. NumpyModel runs the same
+# forward pass with NumPy only, so serving workers need neither TensorFlow nor
+# its import time and memory.
+#
+#   python numpy_runtime.py export gesture_model.h5 models/gesture_model.npz [--int8]
+#   python numpy_runtime.py bench models/gesture_model.npz
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+FORMAT_VERSION = 1
+SUPPORTED_LAYERS = ('InputLayer', 'Conv2D', 'MaxPooling2D', 'AveragePooling2D', 'Flatten', 'Dropout',
+                    'Dense', 'Activation')
+
+
+# -------------------- Activations --------------------
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'sigmoid': lambda x: 1.0 / (1.0 + np.exp(-x)),
+    'tanh': np.tanh,
+    'softmax': _softmax,
+}
+
+
+def _activation(name):
+    if name not in ACTIVATIONS:
+        raise ValueError(f"unsupported activation {name!r}")
+    return ACTIVATIONS[name]
+
+
+# -------------------- Layer ops (NHWC, like Keras channels_last) --------------------
+def _same_padding(size, k, stride):
+    out = -(-size // stride)
+    total = max((out - 1) * stride + k - size, 0)
+    return total // 2, total - total // 2
+
+
+def _pad(x, kernel, strides, padding, value=0.0):
+    if padding != 'same':
+        return x
+    (kh, kw), (sh, sw) = kernel, strides
+    ph = _same_padding(x.shape[1], kh, sh)
+    pw = _same_padding(x.shape[2], kw, sw)
+    return np.pad(x, ((0, 0), ph, pw, (0, 0)), constant_values=value)
+
+
+def conv2d(x, kernel, bias, strides=(1, 1), padding='valid'):
+    """x (N, H, W, C), kernel (kh, kw, C, F) -> (N, Ho, Wo, F) via one im2col matmul."""
+    kh, kw, c, f = kernel.shape
+    x = _pad(x, (kh, kw), strides, padding)
+    win = sliding_window_view(x, (kh, kw), axis=(1, 2))[:, ::strides[0], ::strides[1]]  # (N, Ho, Wo, C, kh, kw)
+    n, ho, wo = win.shape[:3]
+    cols = win.transpose(0, 1, 2, 4, 5, 3).reshape(n * ho * wo, kh * kw * c)
+    out = cols @ kernel.reshape(kh * kw * c, f)
+    if bias is not None:
+        out += bias
+    return out.reshape(n, ho, wo, f)
+
+
+def pool2d(x, pool_size, strides, padding='valid', mode='max'):
+    if mode == 'max':
+        x = _pad(x, pool_size, strides, padding, value=-np.inf)
+        win = sliding_window_view(x, pool_size, axis=(1, 2))[:, ::strides[0], ::strides[1]]
+        return win.max(axis=(-2, -1))
+    if padding == 'same':
+        # Keras averages only over the real (unpadded) inputs
+        ones = _pad(np.ones_like(x[:1, ..., :1]), pool_size, strides, padding)
+        x = _pad(x, pool_size, strides, padding)
+        win = sliding_window_view(x, pool_size, axis=(1, 2))[:, ::strides[0], ::strides[1]]
+        cnt = sliding_window_view(ones, pool_size, axis=(1, 2))[:, ::strides[0], ::strides[1]]
+        return win.sum(axis=(-2, -1)) / cnt.sum(axis=(-2, -1))
+    win = sliding_window_view(x, pool_size, axis=(1, 2))[:, ::strides[0], ::strides[1]]
+    return win.mean(axis=(-2, -1))
+
+
+# -------------------- Quantization --------------------
+def quantize_int8(w):
+    """Symmetric per-output-channel (last axis) int8 -> (q, scale)."""
+    w = np.asarray(w, dtype=np.float32)
+    axes = tuple(range(w.ndim - 1))
+    scale = np.abs(w).max(axis=axes) / 127.0
+    scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+    q = np.clip(np.round(w / scale), -127, 127).astype(np.int8)
+    return q, scale
+
+
+def dequantize(q, scale):
+    return q.astype(np.float32) * scale
+
+
+# -------------------- Model --------------------
+class NumpyModel:
+    def __init__(self, layers, weights, input_shape=None, class_labels=None, quantized=False):
+        self.layers = layers
+        self.weights = weights
+        self.input_shape = tuple(input_shape) if input_shape else None
+        self.class_labels = list(class_labels) if class_labels else None
+        self.quantized = quantized
+
+    def _forward(self, x):
+        for i, layer in enumerate(self.layers):
+            kind, cfg = layer['type'], layer['config']
+            w = self.weights.get(i, {})
+            if kind == 'Conv2D':
+                x = conv2d(x, w['kernel'], w.get('bias'), tuple(cfg['strides']), cfg['padding'])
+                x = _activation(cfg['activation'])(x)
+            elif kind in ('MaxPooling2D', 'AveragePooling2D'):
+                pool = tuple(cfg['pool_size'])
+                strides = tuple(cfg['strides'] or pool)
+                x = pool2d(x, pool, strides, cfg['padding'], 'max' if kind == 'MaxPooling2D' else 'avg')
+            elif kind == 'Flatten':
+                x = x.reshape(len(x), -1)
+            elif kind == 'Dense':
+                x = x @ w['kernel']
+                if 'bias' in w:
+                    x += w['bias']
+                x = _activation(cfg['activation'])(x)
+            elif kind == 'Activation':
+                x = _activation(cfg['activation'])(x)
+            # InputLayer / Dropout: identity at inference time
+        return x
+
+    def predict(self, x, batch_size=32, verbose=0):
+        """Same call shape as keras Model.predict; float32 in, float32 out."""
+        x = np.asarray(x, dtype=np.float32)
+        if len(x) <= batch_size:
+            return self._forward(x).astype(np.float32)
+        return np.concatenate([self._forward(x[i:i + batch_size]) for i in range(0, len(x), batch_size)]).astype(np.float32)
+
+    __call__ = predict
+
+    def nbytes(self):
+        return sum(a.nbytes for w in self.weights.values() for a in w.values())
+
+
+def _layer_config(layer):
+    kind = type(layer).__name__
+    if kind not in SUPPORTED_LAYERS:
+        raise ValueError(f"unsupported layer {kind} ({layer.name})")
+    cfg = layer.get_config()
+    if kind == 'Conv2D':
+        if tuple(cfg.get('dilation_rate', (1, 1))) != (1, 1) or cfg.get('groups', 1) != 1:
+            raise ValueError(f"{layer.name}: dilated/grouped convolutions are not supported")
+        if cfg.get('data_format', 'channels_last') != 'channels_last':
+            raise ValueError(f"{layer.name}: only channels_last is supported")
+    keep = ('activation', 'strides', 'padding', 'pool_size', 'units', 'filters', 'kernel_size')
+    return {'type': kind, 'name': layer.name, 'config': {k: cfg[k] for k in keep if k in cfg}}
+
+
+def export_keras(model, path, quantize=False, class_labels=None):
+    """Write a Keras Sequential model to `path` (.npz). Returns the output size in bytes."""
+    layers, arrays = [], {}
+    for i, layer in enumerate(model.layers):
+        layers.append(_layer_config(layer))
+        params = layer.get_weights()
+        for name, value in zip(('kernel', 'bias'), params):
+            value = np.asarray(value, dtype=np.float32)
+            if quantize and name == 'kernel':
+                arrays[f'{i}/kernel_q'], arrays[f'{i}/kernel_scale'] = quantize_int8(value)
+            else:
+                arrays[f'{i}/{name}'] = value
+    spec = {
+        'format': FORMAT_VERSION,
+        'layers': layers,
+        'input_shape': [int(d) for d in model.input_shape[1:]],
+        'class_labels': list(class_labels) if class_labels else None,
+        'quantized': bool(quantize),
+    }
+    arrays['__spec__'] = np.frombuffer(json.dumps(spec).encode(), dtype=np.uint8)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.npz')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return os.path.getsize(path)
+
+
+def load_model(path):
+    """Load an exported .npz into a NumpyModel (int8 kernels are dequantized once here)."""
+    with np.load(path) as data:
+        spec = json.loads(data['__spec__'].tobytes().decode())
+        if spec.get('format') != FORMAT_VERSION:
+            raise ValueError(f"unsupported model format {spec.get('format')!r}")
+        weights = {}
+        for key in data.files:
+            if key == '__spec__':
+                continue
+            idx, name = key.split('/', 1)
+            weights.setdefault(int(idx), {})[name] = data[key]
+    for w in weights.values():
+        if 'kernel_q' in w:
+            w['kernel'] = dequantize(w.pop('kernel_q'), w.pop('kernel_scale'))
+    return NumpyModel(spec['layers'], weights, spec.get('input_shape'), spec.get('class_labels'),
+                      spec.get('quantized', False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export / run the gesture model without TensorFlow")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    exp = sub.add_parser('export', help="Keras model file -> .npz")
+    exp.add_argument('keras_model')
+    exp.add_argument('output')
+    exp.add_argument('--int8', action='store_true', help="int8-quantize kernels")
+    exp.add_argument('--labels', nargs='*', help="class labels in output order")
+    bench = sub.add_parser('bench', help="load time and batch latency of an exported model")
+    bench.add_argument('model')
+    bench.add_argument('--batch', type=int, default=8)
+    args = parser.parse_args()
+
+    if args.cmd == 'export':
+        from tensorflow.keras.models import load_model as load_keras
+        size = export_keras(load_keras(args.keras_model), args.output, args.int8, args.labels)
+        print(f"Exported {args.keras_model} -> {args.output} ({size / 1024:.0f} KiB{', int8' if args.int8 else ''})")
+        return 0
+
+    t0 = time.perf_counter()
+    model = load_model(args.model)
+    load_s = time.perf_counter() - t0
+    x = np.random.default_rng(0).random((args.batch, *model.input_shape), dtype=np.float32)
+    model.predict(x)
+    t0 = time.perf_counter()
+    for _ in range(10):
+        model.predict(x)
+    print(json.dumps({'load_ms': load_s * 1000.0, 'weights_mb': model.nbytes() / 1e6,
+                      'batch': args.batch, 'predict_ms': (time.perf_counter() - t0) * 100.0}, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,186 @@
+# progress_cache.py
+# Read-through LRU cache of per-user progress with write-behind flushing.
+#
+# Reads are served from memory after the first load. Writes (replace, set
+# fields, increments) are applied to the cached copy immediately and queued as
+# an op list per user; a background thread flushes them every flush_interval
+# seconds (and at exit) in one store.update_many transaction, so many star /
+# score updates collapse into a single write, and increments from other
+# workers are merged rather than overwritten.
+
+import atexit
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+
+def _apply_ops(data, ops):
+    data = dict(data or {})
+    for op in ops:
+        kind = op[0]
+        if kind == "replace":
+            data = copy.deepcopy(op[1])
+        elif kind == "set":
+            data.update(copy.deepcopy(op[1]))
+        elif kind == "inc":
+            data[op[1]] = data.get(op[1], 0) + op[2]
+    return data
+
+
+class ProgressCache:
+    def __init__(self, store, maxsize=1024, flush_interval=2.0, ttl=0):
+        """
+        store:          a progress_store.ProgressStore
+        maxsize:        max users kept in memory (LRU; dirty users are kept until flushed)
+        flush_interval: seconds between background flushes
+        ttl:            seconds before a clean entry is re-read from the store (0 = never)
+        """
+        self.store = store
+        self.maxsize = max(1, int(maxsize))
+        self.flush_interval = float(flush_interval)
+        self.ttl = float(ttl)
+        self._entries = OrderedDict()  # user_id -> (data, loaded_at)
+        self._pending = {}             # user_id -> [op, ...]
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.flushes = 0
+        self.flushed_users = 0
+        self.flush_errors = 0
+        self.last_flush_seconds = 0.0
+
+    # -------------------- Reads --------------------
+    def get(self, user_id, default=None):
+        user_id = str(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            fresh = entry is not None and (
+                not self.ttl or user_id in self._pending or time.monotonic() - entry[1] < self.ttl)
+            if fresh:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return copy.deepcopy(entry[0])
+            self.misses += 1
+        data = self.store.get(user_id)
+        with self._lock:
+            if user_id in self._pending:
+                data = _apply_ops(data, self._pending[user_id])
+            if data is None:
+                return default
+            self._insert(user_id, data)
+            return copy.deepcopy(data)
+
+    # -------------------- Writes (write-behind) --------------------
+    def put(self, user_id, data):
+        self._queue(str(user_id), ("replace", copy.deepcopy(data)))
+
+    def set_fields(self, user_id, **fields):
+        self._queue(str(user_id), ("set", fields))
+
+    def increment(self, user_id, field, delta=1):
+        """Add delta to a numeric field; returns the new cached value."""
+        data = self._queue(str(user_id), ("inc", field, delta))
+        return data.get(field, 0)
+
+    def _queue(self, user_id, op):
+        with self._lock:
+            cached = user_id in self._entries
+        base = None if cached else self.store.get(user_id)
+        with self._lock:
+            ops = self._pending.setdefault(user_id, [])
+            if op[0] == "inc" and ops and ops[-1][0] == "inc" and ops[-1][1] == op[1]:
+                ops[-1] = ("inc", op[1], ops[-1][2] + op[2])  # coalesce repeated increments
+            elif op[0] == "replace":
+                ops[:] = [op]
+            else:
+                ops.append(op)
+            entry = self._entries.get(user_id)
+            data = _apply_ops(entry[0], [op]) if entry is not None else _apply_ops(base, ops)
+            self._insert(user_id, data)
+        self._ensure_flusher()
+        return data
+
+    def _insert(self, user_id, data):
+        self._entries[user_id] = (data, time.monotonic())
+        self._entries.move_to_end(user_id)
+        self._evict()
+
+    def _evict(self):
+        # dirty users stay resident until flushed, so the cache may briefly exceed maxsize
+        if len(self._entries) <= self.maxsize:
+            return
+        for uid in list(self._entries):
+            if len(self._entries) <= self.maxsize:
+                break
+            if uid not in self._pending:
+                del self._entries[uid]
+                self.evictions += 1
+
+    # -------------------- Flushing --------------------
+    def flush(self):
+        """Write all pending ops to the store; returns the number of users written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            t0 = time.perf_counter()
+            try:
+                written = self.store.update_many(
+                    {uid: (lambda cur, ops=ops: _apply_ops(cur, ops)) for uid, ops in pending.items()})
+            except Exception as e:
+                print("Progress flush failed:", e)
+                with self._lock:
+                    self.flush_errors += 1
+                    for uid, ops in pending.items():
+                        self._pending[uid] = ops + self._pending.get(uid, [])
+                return 0
+            with self._lock:
+                for uid, data in written.items():
+                    if uid in self._entries:
+                        newer = self._pending.get(uid)
+                        self._entries[uid] = (_apply_ops(data, newer) if newer else data, time.monotonic())
+                self.flushes += 1
+                self.flushed_users += len(written)
+                self.last_flush_seconds = time.perf_counter() - t0
+                self._evict()
+            return len(written)
+
+    def _ensure_flusher(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="progress-flusher", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "pending_users": len(self._pending),
+                "flushes": self.flushes,
+                "flushed_users": self.flushed_users,
+                "flush_errors": self.flush_errors,
+                "last_flush_ms": self.last_flush_seconds * 1000.0,
+                "flush_interval_s": self.flush_interval,
+            }
@@ -0,0 +1,289 @@
+# progress_store.py
+# Per-user progress storage with atomic, cross-process-safe updates.
+#
+# Backends:
+#   sqlite (default) - one row per user in a WAL-mode database; reads and writes
+#                      touch only that user's row, so cost does not grow with users.
+#   json             - the legacy single progress.json file, now written atomically
+#                      under an exclusive file lock (still O(total users) per write).
+#
+# The old progress.json held two schemas: per-user dicts written by
+# save_user_progress, and a global {"stars", "badge_unlocked"} written by
+# save_progress. The global one is stored under GLOBAL_KEY.
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+GLOBAL_KEY = "__global__"
+GLOBAL_FIELDS = ("stars", "badge_unlocked")
+
+
+class ProgressStore:
+    """Keyed progress storage; values are JSON-serialisable dicts."""
+
+    def get(self, user_id, default=None):
+        raise NotImplementedError
+
+    def get_many(self, user_ids):
+        out = {}
+        for uid in user_ids:
+            data = self.get(uid)
+            if data is not None:
+                out[str(uid)] = data
+        return out
+
+    def put(self, user_id, data):
+        raise NotImplementedError
+
+    def put_many(self, items):
+        for user_id, data in items.items():
+            self.put(user_id, data)
+
+    def update(self, user_id, fn):
+        """Atomically apply fn(current_dict) -> new_dict for one user; returns the new dict."""
+        raise NotImplementedError
+
+    def update_many(self, fns):
+        """Apply {user_id: fn} updates; returns {user_id: new_dict}."""
+        return {str(uid): self.update(uid, fn) for uid, fn in fns.items()}
+
+    def count(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# -------------------- SQLite (default) --------------------
+class SQLiteProgressStore(ProgressStore):
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS progress ("
+                " user_id TEXT PRIMARY KEY,"
+                " data TEXT NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _conn(self):
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the database write lock up front, so concurrent
+        # read-modify-write cycles from other workers serialise instead of racing.
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def get(self, user_id, default=None):
+        row = self._conn().execute("SELECT data FROM progress WHERE user_id = ?", (str(user_id),)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def get_many(self, user_ids):
+        ids = [str(u) for u in user_ids]
+        out = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for uid, data in self._conn().execute(
+                    f"SELECT user_id, data FROM progress WHERE user_id IN ({marks})", chunk):
+                out[uid] = json.loads(data)
+        return out
+
+    def put(self, user_id, data):
+        self.put_many({user_id: data})
+
+    def put_many(self, items):
+        now = time.time()
+        rows = [(str(uid), json.dumps(data), now) for uid, data in items.items()]
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO progress (user_id, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                rows,
+            )
+
+    def update(self, user_id, fn):
+        return self.update_many({user_id: fn})[str(user_id)]
+
+    def update_many(self, fns):
+        # one transaction (and one WAL commit) for the whole batch
+        out = {}
+        now = time.time()
+        with self._transaction() as conn:
+            for user_id, fn in fns.items():
+                uid = str(user_id)
+                row = conn.execute("SELECT data FROM progress WHERE user_id = ?", (uid,)).fetchone()
+                out[uid] = fn(json.loads(row[0]) if row else {})
+                conn.execute(
+                    "INSERT INTO progress (user_id, data, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                    (uid, json.dumps(out[uid]), now),
+                )
+        return out
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM progress").fetchone()[0]
+
+    def get_meta(self, key):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def migrate_from_json(self, json_path):
+        """One-shot import of a legacy progress.json; later calls (from any worker) are no-ops."""
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from'").fetchone():
+                return 0
+            items = _read_legacy_json(json_path)
+            now = time.time()
+            conn.executemany(
+                "INSERT OR IGNORE INTO progress (user_id, data, updated_at) VALUES (?, ?, ?)",
+                [(uid, json.dumps(data), now) for uid, data in items.items()],
+            )
+            conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_from', ?)",
+                         (os.path.abspath(json_path),))
+        if items:
+            print(f"Migrated {len(items)} progress entries from {json_path}")
+        return len(items)
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# -------------------- Legacy JSON file --------------------
+class JSONProgressStore(ProgressStore):
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.path + ".lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self):
+        return _read_legacy_json(self.path)
+
+    def _write(self, all_progress):
+        folder = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=".progress-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(all_progress, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def get(self, user_id, default=None):
+        return self._read().get(str(user_id), default)
+
+    def get_many(self, user_ids):
+        all_progress = self._read()
+        return {str(u): all_progress[str(u)] for u in user_ids if str(u) in all_progress}
+
+    def put(self, user_id, data):
+        self.put_many({user_id: data})
+
+    def put_many(self, items):
+        with self._locked():
+            all_progress = self._read()
+            all_progress.update({str(k): v for k, v in items.items()})
+            self._write(all_progress)
+
+    def update(self, user_id, fn):
+        return self.update_many({user_id: fn})[str(user_id)]
+
+    def update_many(self, fns):
+        out = {}
+        with self._locked():
+            all_progress = self._read()
+            for user_id, fn in fns.items():
+                uid = str(user_id)
+                out[uid] = fn(all_progress.get(uid, {}))
+                all_progress[uid] = out[uid]
+            self._write(all_progress)
+        return out
+
+    def count(self):
+        return len(self._read())
+
+
+def _read_legacy_json(path):
+    """Read progress.json into {user_id: dict}, folding the old global schema into GLOBAL_KEY."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(raw, dict):
+        return {}
+    items, global_data = {}, {}
+    for key, value in raw.items():
+        if isinstance(value, dict):
+            items[str(key)] = value
+        elif key in GLOBAL_FIELDS:
+            global_data[key] = value
+    if global_data:
+        items.setdefault(GLOBAL_KEY, {}).update(global_data)
+    return items
+
+
+def open_progress_store(backend="sqlite", path=None, migrate_from=None):
+    """Factory used by app.py; migrate_from names a legacy progress.json to import once."""
+    backend = (backend or "sqlite").lower()
+    if backend == "sqlite":
+        store = SQLiteProgressStore(path or "progress.db")
+        if migrate_from:
+            store.migrate_from_json(migrate_from)
+        return store
+    if backend == "json":
+        return JSONProgressStore(path or "progress.json")
+    raise ValueError(f"unknown progress backend: {backend}")
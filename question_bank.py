@@ -0,0 +1,126 @@
+# question_bank.py
+# Pre-generated quiz content, built once from question_bank.json.
+#
+# - math: every (a, op, b) of each difficulty tier is enumerated up front into
+#   small integer arrays, each with a fixed set of unique, non-negative answer
+#   options; serving a question is one random index plus string formatting
+# - emotion / face-match / color-match rounds are likewise enumerated once, so
+#   a request only picks an index (and pages can cache one render per round)
+
+import hashlib
+import itertools
+import json
+import os
+import random
+
+import numpy as np
+
+DEFAULT_PATH = os.environ.get("QUESTION_BANK", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                            "question_bank.json"))
+OPS = ('+', '-', '*')
+_APPLY = {'+': lambda a, b: a + b, '-': lambda a, b: a - b, '*': lambda a, b: a * b}
+
+
+class MathPool:
+    """All questions of one tier: operands (N, 2), op index (N,), answers (N,), options (N, k)."""
+
+    def __init__(self, ops, lo, hi, n_options=4, seed=0):
+        rng = np.random.default_rng(seed)
+        rows = []
+        for op in ops:
+            for a in range(lo, hi + 1):
+                for b in range(lo, hi + 1):
+                    if op == '-' and b > a:
+                        continue  # keep answers non-negative
+                    rows.append((a, OPS.index(op), b))
+        rows = np.asarray(rows, dtype=np.int16).reshape(-1, 3)
+        self.operands = rows[:, [0, 2]]
+        self.ops = rows[:, 1].astype(np.int8)
+        self.answers = np.asarray([_APPLY[OPS[o]](int(a), int(b)) for a, o, b in rows], dtype=np.int32)
+        top = int(self.answers.max()) if len(self.answers) else 0
+        self.options = np.stack([self._options(int(ans), n_options, top, rng) for ans in self.answers]) \
+            if len(self.answers) else np.zeros((0, n_options), np.int32)
+
+    @staticmethod
+    def _options(answer, k, top, rng):
+        # near misses first (what the old generator offered), then random fill; always unique
+        near = [answer + d for d in (1, -1, 2, -2, 3, -3) if answer + d >= 0]
+        rng.shuffle(near)
+        picked = [answer] + near[:max(0, k - 2)]
+        while len(picked) < k:
+            candidate = int(rng.integers(0, max(top, k) + 1))
+            if candidate not in picked:
+                picked.append(candidate)
+        picked = np.asarray(picked[:k], dtype=np.int32)
+        rng.shuffle(picked)
+        return picked
+
+    def __len__(self):
+        return len(self.answers)
+
+    def question(self, i):
+        a, b = (int(v) for v in self.operands[i])
+        return {
+            "question": f"What is {a} {OPS[self.ops[i]]} {b}?",
+            "options": self.options[i].tolist(),
+            "correct_answer": int(self.answers[i]),
+        }
+
+
+class QuestionBank:
+    def __init__(self, data, seed=0):
+        self.emotion = list(data.get("emotion", []))
+        self.faces = list(data.get("faces", []))
+        self.colors = list(data.get("colors", []))
+        math_cfg = data.get("math", {})
+        self.default_difficulty = math_cfg.get("default", "medium")
+        self.math = {name: MathPool(t.get("ops", OPS), int(t.get("min", 1)), int(t.get("max", 10)),
+                                    int(math_cfg.get("options", 4)), seed + i)
+                     for i, (name, t) in enumerate(sorted(math_cfg.get("tiers", {}).items()))}
+        # finite round spaces, enumerated once
+        n = len(self.faces)
+        self.face_orders = list(itertools.permutations(range(n))) if n <= 6 else [tuple(range(n))]
+        k = min(int(data.get("color_options", 3)), len(self.colors))
+        self.color_rounds = [(t, opts) for opts in itertools.permutations(range(len(self.colors)), k)
+                             for t in opts]
+        self.version = hashlib.blake2b(json.dumps(data, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH, seed=0):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), seed)
+
+    # -------------------- O(1) sampling --------------------
+    def math_question(self, difficulty=None, rng=random):
+        difficulty = difficulty if difficulty in self.math else self.default_difficulty
+        pool = self.math[difficulty]
+        return dict(pool.question(rng.randrange(len(pool))), difficulty=difficulty)
+
+    def emotion_index(self, rng=random):
+        return rng.randrange(len(self.emotion))
+
+    def face_round_index(self, rng=random):
+        return rng.randrange(len(self.face_orders) ** 2)
+
+    def face_round(self, index):
+        """(images, words) for round index: image order and word order are independent permutations."""
+        n = len(self.face_orders)
+        images = [self.faces[i] for i in self.face_orders[index // n]]
+        words = [self.faces[i]["name"] for i in self.face_orders[index % n]]
+        return images, words
+
+    def color_round_index(self, rng=random):
+        return rng.randrange(len(self.color_rounds))
+
+    def color_round(self, index):
+        target, options = self.color_rounds[index]
+        return self.colors[target], [self.colors[i] for i in options]
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "math": {name: len(pool) for name, pool in self.math.items()},
+            "emotion": len(self.emotion),
+            "face_rounds": len(self.face_orders) ** 2,
+            "color_rounds": len(self.color_rounds),
+        }
@@ -0,0 +1,186 @@
+# result_cache.py
+# Content-addressed cache of endpoint results (e.g. /api/recognize,
+# /gesture_control), keyed by a blake2b hash of the raw request payload taken
+# before any base64 / image decoding, plus whatever version the result depends
+# on (shape index, gesture model), so a resubmitted sketch or an unchanged
+# camera frame is answered without decoding or inference.
+#
+# - in-process LRU of at most maxsize entries, each valid for ttl seconds
+#   (0 = no expiry)
+# - optional shared directory (e.g. on /dev/shm) that gunicorn workers all read
+#   and write: one small JSON file per key, written atomically; expired files and
+#   the oldest ones beyond maxsize are pruned every maxsize writes
+# - hit / shared-hit / miss counts in stats() and the result_cache_lookups_total
+#   metric
+
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+
+class ResultCache:
+    def __init__(self, maxsize=1024, ttl=300.0, shared_dir=None, name="results"):
+        """
+        maxsize:    max entries in memory (and in shared_dir); 0 disables the cache
+        ttl:        seconds an entry stays valid (0 = until evicted)
+        shared_dir: directory shared by all workers, or None for a per-process cache
+        """
+        self.maxsize = max(0, int(maxsize))
+        self.ttl = float(ttl)
+        self.shared_dir = shared_dir or None
+        self.name = name
+        self._entries = OrderedDict()  # key -> (value, expires_at or None)
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    @staticmethod
+    def key(payload, *parts):
+        """Hex digest of the raw payload (bytes or str) plus the version parts it depends on."""
+        h = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            h.update(str(part).encode('utf-8'))
+            h.update(b'\0')
+        h.update(payload if isinstance(payload, (bytes, bytearray, memoryview)) else str(payload).encode('utf-8'))
+        return h.hexdigest()
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    # -------------------- Lookups --------------------
+    def get(self, key):
+        """Cached value for key, or None."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] is None or entry[1] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    metrics.CACHE_LOOKUPS.inc(cache=self.name, result="hit")
+                    return copy.deepcopy(entry[0])
+                del self._entries[key]
+                self.expired += 1
+        value = self._read_shared(key)
+        with self._lock:
+            if value is not None:
+                self._insert(key, value)
+                self.shared_hits += 1
+                metrics.CACHE_LOOKUPS.inc(cache=self.name, result="shared_hit")
+                return copy.deepcopy(value)
+            self.misses += 1
+        metrics.CACHE_LOOKUPS.inc(cache=self.name, result="miss")
+        return None
+
+    def put(self, key, value):
+        """Store a JSON-serializable, non-None value."""
+        if not self.enabled or value is None:
+            return
+        with self._lock:
+            self._insert(key, copy.deepcopy(value))
+        self._write_shared(key, value)
+
+    def _insert(self, key, value):
+        self._entries[key] = (value, time.monotonic() + self.ttl if self.ttl else None)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # -------------------- Shared directory --------------------
+    def _path(self, key):
+        return os.path.join(self.shared_dir, f"{key}.json")
+
+    def _read_shared(self, key):
+        if not self.shared_dir:
+            return None
+        path = self._path(key)
+        try:
+            if self.ttl and time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None  # missing, or pruned / replaced by another worker meanwhile
+
+    def _write_shared(self, key, value):
+        if not self.shared_dir:
+            return
+        tmp = None
+        try:
+            os.makedirs(self.shared_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.shared_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f)
+            os.replace(tmp, self._path(key))
+        except (OSError, TypeError, ValueError) as e:
+            print("Result cache write failed:", e)
+            if tmp is not None:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass  # already renamed into place, or never created
+            return
+        with self._lock:
+            self._puts_since_prune += 1
+            due = self._puts_since_prune >= self.maxsize
+            if due:
+                self._puts_since_prune = 0
+        if due:
+            self.prune()
+
+    def prune(self):
+        """Delete expired shared entries, then the oldest beyond maxsize."""
+        if not self.shared_dir or not os.path.isdir(self.shared_dir):
+            return 0
+        now = time.time()
+        files = []
+        with os.scandir(self.shared_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    try:
+                        files.append((entry.stat().st_mtime, entry.path))
+                    except OSError:
+                        continue
+        files.sort(reverse=True)
+        stale = [p for i, (mtime, p) in enumerate(files)
+                 if i >= self.maxsize or (self.ttl and now - mtime > self.ttl)]
+        for path in stale:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        return len(stale)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "shared": bool(self.shared_dir),
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+            }
@@ -0,0 +1,273 @@
+# retraining.py
+# Background retraining of the landmark classifier from samples appended to the
+# landmark store (/api/data/save), and hot-swapping the result into every worker.
+#
+# - warm start: only store ids >= model.trained_through are read, and folded
+#   into the running per-class means with LandmarkClassifier.partial_fit
+# - held-out split: every holdout_every-th store id is never trained on; the
+#   candidate is kept only if its accuracy on those samples is not worse than
+#   the current model's by more than `tolerance` (the first retrain, which
+#   refits from scratch, is always kept)
+# - the kept model gets version + 1 and is written with an atomic rename while
+#   holding an exclusive lock file, so one worker retrains at a time and a model
+#   is never replaced by an older one
+# - ModelSlot serves the current model; every check_interval seconds it stats
+#   the file and, if a newer version was written (by any worker), loads it and
+#   swaps the reference. Requests never wait on the reload.
+#
+#   python retraining.py --store landmark_store --model models/landmark_classifier.npz
+
+import argparse
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from landmark_classifier import NUM_LANDMARKS, LandmarkClassifier
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+DEFAULT_HOLDOUT_EVERY = 5
+
+
+def _accuracy(model, X, y):
+    if model is None or len(X) == 0:
+        return None
+    predicted, _ = model.predict(X)
+    return float((predicted == y).mean())
+
+
+class ModelSlot:
+    """Holds the served model; picks up newer versions written to path by any process."""
+
+    def __init__(self, path, model=None, check_interval=5.0, loader=LandmarkClassifier.load):
+        self.path = path
+        self.model = model
+        self.check_interval = float(check_interval)
+        self.loader = loader
+        self._reload_lock = threading.Lock()
+        self._next_check = time.monotonic() + self.check_interval
+        self._mtime = self._stat()
+        self.swaps = 0
+        self.last_swap_ms = 0.0
+        self.last_swap_lag_s = 0.0
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self):
+        if self.check_interval > 0 and time.monotonic() >= self._next_check:
+            self.reload()
+        return self.model
+
+    def reload(self):
+        # the first caller to notice does the reload; everyone else keeps the current model
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = time.monotonic() + self.check_interval
+            mtime = self._stat()
+            if mtime is None or mtime == self._mtime:
+                return False
+            t0 = time.perf_counter()
+            try:
+                model = self.loader(self.path)
+            except (OSError, ValueError, KeyError) as e:
+                print("Model reload failed:", e)
+                return False
+            self._mtime = mtime
+            swapped = self.swap(model, time.perf_counter() - t0)
+            if swapped:
+                self.last_swap_lag_s = max(0.0, time.time() - mtime / 1e9)
+            return swapped
+        finally:
+            self._reload_lock.release()
+
+    def swap(self, model, load_seconds=0.0):
+        """Serve model from now on if it is newer than the current one."""
+        current = self.model
+        if current is not None and model.version <= current.version:
+            return False
+        t0 = time.perf_counter()
+        self.model = model  # a single reference assignment; in-flight requests keep the old object
+        self.last_swap_ms = (load_seconds + time.perf_counter() - t0) * 1000.0
+        self.swaps += 1
+        return True
+
+    def stats(self):
+        model = self.model
+        return {
+            "version": model.version if model is not None else None,
+            "trained_through": model.trained_through if model is not None else None,
+            "labels": model.labels.tolist() if model is not None else [],
+            "swaps": self.swaps,
+            "last_swap_ms": self.last_swap_ms,
+            "last_swap_lag_s": self.last_swap_lag_s,
+        }
+
+
+class Retrainer:
+    def __init__(self, store, model_path, holdout_every=DEFAULT_HOLDOUT_EVERY, tolerance=0.02, min_new=1):
+        """
+        store:         a landmark_store.LandmarkStore
+        model_path:    .npz the served model is read from and written to
+        holdout_every: every n-th store id is validation-only
+        tolerance:     allowed held-out accuracy drop for the candidate
+        min_new:       minimum new training samples before a retrain runs
+        """
+        self.store = store
+        self.model_path = model_path
+        self.holdout_every = max(2, int(holdout_every))
+        self.tolerance = float(tolerance)
+        self.min_new = max(1, int(min_new))
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.runs = 0
+        self.last_report = None
+        self.last_update = None
+
+    # -------------------- One retrain --------------------
+    def _file_lock(self):
+        folder = os.path.dirname(self.model_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        return open(self.model_path + ".lock", "a")
+
+    def run_once(self, current=None):
+        """
+        Retrain from samples added since current (or the model on disk).
+        Returns a report; report["model"] is the new classifier when one was kept.
+        """
+        if not self._lock.acquire(blocking=False):
+            return {"status": "busy"}
+        try:
+            with self._file_lock() as lock_file:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        return {"status": "busy"}  # another worker is retraining
+                report = self._retrain(current)
+        finally:
+            self._lock.release()
+        self.runs += 1
+        self.last_report = {k: v for k, v in report.items() if k != "model"}
+        if report["status"] == "updated":
+            self.last_update = self.last_report
+        return report
+
+    def _retrain(self, current):
+        t0 = time.perf_counter()
+        base = current
+        if os.path.exists(self.model_path):
+            on_disk = LandmarkClassifier.load(self.model_path)
+            if base is None or on_disk.version >= base.version:
+                base = on_disk  # another worker may have moved on already
+        # only models written here (version >= 1) know which samples they have seen;
+        # anything else (e.g. fitted at startup) is retrained from scratch on the train split
+        warm = base is not None and base.version > 0
+        start = base.trained_through if warm else 0
+        count = len(self.store)
+        ids = np.arange(start, count)
+        train_ids = ids[ids % self.holdout_every != 0]
+        report = {"status": "no_new_samples", "version": base.version if base is not None else 0,
+                  "new_samples": int(len(train_ids)), "trained_through": start}
+        if len(train_ids) < self.min_new:
+            return report
+
+        X, y, _ = self.store.read(start, count)
+        train = (ids % self.holdout_every) != 0
+        candidate = (base.partial_fit(X[train], y[train]) if warm
+                     else LandmarkClassifier.fit(X[train], y[train]))
+        train_seconds = time.perf_counter() - t0
+
+        # both models are judged on the same held-out rows
+        X_val, y_val = self.holdout(count)
+        before, after = _accuracy(base, X_val, y_val), _accuracy(candidate, X_val, y_val)
+        report.update(validation={"samples": int(len(X_val)), "before": before, "after": after},
+                      train_ms=train_seconds * 1000.0)
+        # a cold-start baseline may have been fitted on the held-out rows too, so only warm updates are gated
+        if warm and before is not None and after is not None and after < before - self.tolerance:
+            report.update(status="rejected", retrain_ms=(time.perf_counter() - t0) * 1000.0)
+            return report
+
+        candidate.version = (base.version if base is not None else 0) + 1
+        candidate.trained_through = count
+        candidate.save(self.model_path)  # tmp file + os.replace: readers see the old or the new model
+        report.update(status="updated", version=candidate.version, trained_through=count, model=candidate,
+                      retrain_ms=(time.perf_counter() - t0) * 1000.0)
+        return report
+
+    def holdout(self, stop):
+        """(landmarks, labels) of the validation-only ids below stop, read chunk by chunk."""
+        meta = self.store.meta()
+        vocab = np.asarray(meta["labels"] or [""])
+        X, y = [], []
+        for first, landmarks, label_ids, _ in self.store.iter_chunks(0, stop, meta):
+            keep = np.arange(first, first + len(landmarks)) % self.holdout_every == 0
+            X.append(np.asarray(landmarks[keep]))
+            y.append(np.asarray(label_ids[keep]))
+        if not X:
+            return np.zeros((0, NUM_LANDMARKS, 3), np.float32), np.array([], dtype=str)
+        return np.concatenate(X).reshape(-1, NUM_LANDMARKS, 3), vocab[np.concatenate(y)]
+
+    # -------------------- Background thread --------------------
+    def start(self, interval, slot=None):
+        """Retrain every interval seconds; kept models are swapped into slot right away."""
+        if self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._loop, args=(float(interval), slot),
+                                        name="landmark-retrain", daemon=True)
+        self._thread.start()
+        return self
+
+    def _loop(self, interval, slot):
+        while not self._stop.wait(interval):
+            try:
+                report = self.run_once(slot.model if slot is not None else None)
+            except (OSError, ValueError) as e:
+                print("Landmark retrain failed:", e)
+                continue
+            if report.get("model") is not None and slot is not None:
+                slot.swap(report["model"])
+                report_line = {k: v for k, v in report.items() if k != "model"}
+                print("Landmark classifier retrained:", json.dumps(report_line))
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {"runs": self.runs, "holdout_every": self.holdout_every, "last": self.last_report,
+                "last_update": self.last_update}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fold new landmark store samples into the classifier")
+    parser.add_argument('--store', default='landmark_store')
+    parser.add_argument('--model', default=os.path.join('models', 'landmark_classifier.npz'))
+    parser.add_argument('--holdout-every', type=int, default=DEFAULT_HOLDOUT_EVERY)
+    parser.add_argument('--tolerance', type=float, default=0.02)
+    args = parser.parse_args()
+
+    from landmark_store import LandmarkStore, is_store
+    if not is_store(args.store):
+        print(f"No landmark store at {args.store}")
+        return 1
+    retrainer = Retrainer(LandmarkStore(args.store), args.model, args.holdout_every, args.tolerance)
+    report = retrainer.run_once()
+    report.pop("model", None)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
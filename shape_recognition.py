@@ -0,0 +1,248 @@
+# shape_recognition.py
+# Sketch shape recognition: contour extraction, a rotation/scale-invariant
+# contour descriptor, and an in-memory nearest-neighbour index over the samples
+# saved under shape_dataset/<label>/ by /api/save_sample.
+#
+# New sketches are matched against the index in one vectorized distance
+# computation (for a whole batch at once); when the index is empty or nothing
+# is close enough, the original approxPolyDP / circularity rules decide.
+
+import hashlib
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+import metrics
+
+MIN_AREA = 1000
+DESCRIPTOR_DIM = 7
+DEFAULT_MAX_DISTANCE = float(os.environ.get("SHAPE_MATCH_MAX_DISTANCE", "0.25"))
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.bmp')
+UNLABELLED = ('unknown', '')
+
+
+# -------------------- Contours & descriptors --------------------
+def main_contour(img):
+    """Largest external contour of the drawing, or None if nothing big enough is drawn."""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    blur = cv2.GaussianBlur(gray, (7, 7), 0)
+    _, th = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    contours, _ = cv2.findContours(th, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+    c = max(contours, key=cv2.contourArea)
+    if cv2.contourArea(c) < MIN_AREA:
+        return None
+    return c
+
+
+def contour_descriptor(c):
+    """
+    7 values in roughly [0, 1]: log-scaled Hu moments 1-2, circularity,
+    solidity, extent in the min-area rectangle, its aspect ratio, and the
+    approxPolyDP vertex count / 10.
+    """
+    area = cv2.contourArea(c)
+    peri = cv2.arcLength(c, True)
+    hu = cv2.HuMoments(cv2.moments(c)).ravel()[:2]
+    log_hu = np.minimum(-np.log10(np.maximum(np.abs(hu), 1e-10)), 10.0) / 10.0
+    circularity = (4 * np.pi * area) / (peri * peri + 1e-9)
+    hull_area = cv2.contourArea(cv2.convexHull(c))
+    solidity = area / (hull_area + 1e-9)
+    (_, (rw, rh), _) = cv2.minAreaRect(c)
+    extent = area / (rw * rh + 1e-9)
+    aspect = min(rw, rh) / (max(rw, rh) + 1e-9)
+    vertices = len(cv2.approxPolyDP(c, 0.03 * peri, True))
+    return np.array([log_hu[0], log_hu[1], circularity, solidity, extent, aspect, min(vertices, 10) / 10.0],
+                    dtype=np.float32)
+
+
+# -------------------- Rule-based fallback (original /api/recognize logic) --------------------
+def rule_shape(c):
+    area = cv2.contourArea(c)
+    peri = cv2.arcLength(c, True)
+    approx = cv2.approxPolyDP(c, 0.03 * peri, True)
+    circularity = (4 * np.pi * area) / (peri * peri + 1e-9)
+    if len(approx) == 3:
+        return 'triangle'
+    if len(approx) == 4:
+        _, _, w, h = cv2.boundingRect(c)
+        return 'square' if 0.9 <= w / float(h) <= 1.1 else 'rectangle'
+    if circularity > 0.6:
+        return 'circle'
+    if 4 < len(approx) < 10:
+        return 'polygon'
+    return 'unknown'
+
+
+def shape_params(shape, c, W, H):
+    """Normalized drawing parameters for the recognized shape (same keys as before)."""
+    x, y, w, h = cv2.boundingRect(c)
+    box = {'x': x / W, 'y': y / H, 'w': w / W, 'h': h / H}
+    if shape == 'triangle':
+        peri = cv2.arcLength(c, True)
+        approx = cv2.approxPolyDP(c, 0.03 * peri, True).reshape(-1, 2)
+        if len(approx) != 3:
+            _, tri = cv2.minEnclosingTriangle(c.astype(np.float32))
+            approx = tri.reshape(-1, 2)
+        return {'points': [{'x': float(p[0]) / W, 'y': float(p[1]) / H} for p in approx]}
+    if shape == 'circle':
+        (cx, cy), radius = cv2.minEnclosingCircle(c)
+        return {'cx': cx / W, 'cy': cy / H, 'r': radius / max(W, H)}
+    if shape == 'unknown':
+        return {}
+    return box
+
+
+# -------------------- Nearest-neighbour index --------------------
+class ShapeIndex:
+    """Append-only descriptor index; add() is O(1) amortized, queries are one matrix op."""
+
+    def __init__(self, max_distance=DEFAULT_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self._features = np.zeros((64, DESCRIPTOR_DIM), dtype=np.float32)
+        self._labels = []
+        self._lock = threading.Lock()
+        self.version = 0  # per-process add() counter
+        self._digest = 0  # order-independent sum of per-sample hashes, see digest
+        self._files = set()  # sample files already indexed, see sync_dir
+        self._folder_mtimes = {}
+        self.build_seconds = 0.0
+
+    def __len__(self):
+        return len(self._labels)
+
+    @property
+    def labels(self):
+        return sorted(set(self._labels))
+
+    def add(self, descriptor, label):
+        with self._lock:
+            n = len(self._labels)
+            if n == len(self._features):
+                grown = np.zeros((2 * n, DESCRIPTOR_DIM), dtype=np.float32)
+                grown[:n] = self._features
+                self._features = grown
+            self._features[n] = descriptor
+            self._labels.append(label)
+            self.version += 1
+            h = hashlib.blake2b(self._features[n].tobytes() + str(label).encode('utf-8'), digest_size=16)
+            self._digest = (self._digest + int.from_bytes(h.digest(), 'little')) % (1 << 128)
+
+    @property
+    def digest(self):
+        """
+        Content digest of the indexed samples (labels + descriptors) and the match
+        radius. Unlike version it is the same in every process that indexed the
+        same samples, whatever order they were added in, so it can key shared caches.
+        """
+        with self._lock:
+            return f"{self._digest:032x}-{len(self._labels)}-{self.max_distance!r}"
+
+    def add_image(self, img, label, path=None):
+        """
+        Index a saved sample; returns False if no usable contour was found (or path
+        was already indexed). Passing the sample's path keeps sync_dir from adding
+        it a second time.
+        """
+        if label in UNLABELLED:
+            return False
+        if path is not None and not self._claim(path):
+            return False
+        c = main_contour(img)
+        if c is None:
+            return False
+        self.add(contour_descriptor(c), label)
+        return True
+
+    def nearest(self, descriptors):
+        """(M, D) descriptors -> (labels or None per row, distances)."""
+        descriptors = np.asarray(descriptors, dtype=np.float32).reshape(-1, DESCRIPTOR_DIM)
+        with self._lock:
+            n = len(self._labels)
+            feats = self._features[:n]
+            labels = list(self._labels)
+        if n == 0 or len(descriptors) == 0:
+            return [None] * len(descriptors), np.full(len(descriptors), np.inf)
+        d = np.linalg.norm(descriptors[:, None, :] - feats[None, :, :], axis=2)
+        idx = np.argmin(d, axis=1)
+        best = d[np.arange(len(d)), idx]
+        return [labels[i] if dist <= self.max_distance else None for i, dist in zip(idx, best)], best
+
+    def _claim(self, path):
+        path = os.path.normpath(path)
+        with self._lock:
+            if path in self._files:
+                return False
+            self._files.add(path)
+            return True
+
+    def sync_dir(self, root):
+        """
+        Index sample files under root/<label>/ that are not in the index yet, e.g.
+        saved by another worker. Only label folders whose mtime changed since the
+        last call are listed again. Returns the number of samples added.
+        """
+        added = 0
+        if not os.path.isdir(root):
+            return added
+        for label in sorted(os.listdir(root)):
+            folder = os.path.join(root, label)
+            if not os.path.isdir(folder) or label in UNLABELLED:
+                continue
+            try:
+                mtime = os.stat(folder).st_mtime_ns
+            except OSError:
+                continue
+            if self._folder_mtimes.get(folder) == mtime:
+                continue
+            self._folder_mtimes[folder] = mtime
+            for fname in sorted(os.listdir(folder)):
+                path = os.path.join(folder, fname)
+                if not fname.lower().endswith(IMAGE_EXTS) or not self._claim(path):
+                    continue
+                img = cv2.imread(path, cv2.IMREAD_COLOR)
+                if img is not None and self.add_image(img, label):
+                    added += 1
+        return added
+
+    @classmethod
+    def build_from_dir(cls, root, max_distance=DEFAULT_MAX_DISTANCE):
+        index = cls(max_distance)
+        t0 = time.perf_counter()
+        index.sync_dir(root)
+        index.build_seconds = time.perf_counter() - t0
+        return index
+
+    def stats(self):
+        return {"samples": len(self), "labels": self.labels, "version": self.version, "digest": self.digest,
+                "max_distance": self.max_distance, "build_ms": self.build_seconds * 1000.0}
+
+
+# -------------------- Recognition --------------------
+def recognize_many(images, index=None):
+    """Recognize a list of BGR images; returns one {'shape', 'params', 'method'} dict ({} if blank) each."""
+    with metrics.stage("contours"):
+        contours = [main_contour(img) for img in images]
+    present = [i for i, c in enumerate(contours) if c is not None]
+    matches, dists = [None] * len(present), [None] * len(present)
+    if index is not None and len(index) and present:
+        with metrics.stage("shape_match"):
+            matches, dists = index.nearest(np.stack([contour_descriptor(contours[i]) for i in present]))
+    results = [{} for _ in images]
+    for j, i in enumerate(present):
+        c = contours[i]
+        H, W = images[i].shape[:2]
+        if matches[j] is not None:
+            shape, extra = matches[j], {'method': 'template', 'distance': float(dists[j])}
+        else:
+            shape, extra = rule_shape(c), {'method': 'rules'}
+        results[i] = {'shape': shape, 'params': shape_params(shape, c, W, H), **extra}
+    return results
+
+
+def recognize(img, index=None):
+    return recognize_many([img], index)[0]
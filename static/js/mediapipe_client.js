@@ -2,34 +2,67 @@
 const videoElement = document.getElementById('input_video');
 const gestureStatus = document.getElementById('gesture_status');
 
-// simple heuristic from landmarks -> label (you can expand)
+// Instant local label between server replies. Same finger rules and label set
+// as gesture_rules.py (the server's fallback), so both sides agree.
+const COUNT_LABELS = ['nothing', 'one', 'two', 'three', 'four', 'stop'];
+
+function dist(a, b) {
+  return Math.hypot(a.x - b.x, a.y - b.y);
+}
+
 function classifyFromLandmarks(landmarks) {
   // landmarks: array of 21 {x,y,z}
-  // Very basic: if index finger tip is up relative to pip -> "point"
-  if (!landmarks || landmarks.length < 21) return 'unknown';
-  const tipIndex = landmarks[8];
-  const pipIndex = landmarks[6];
-
-  if (tipIndex && pipIndex) {
-    if (tipIndex.y < pipIndex.y - 0.03) {
-      return 'point';
-    }
+  if (!landmarks || landmarks.length < 21) return 'nothing';
+  const wrist = landmarks[0];
+  let fingers = 0;
+  for (const tip of [8, 12, 16, 20]) {
+    if (dist(landmarks[tip], wrist) > dist(landmarks[tip - 2], wrist) * 1.15) fingers++;
   }
-  // fallback
-  return 'open_hand';
+  const thumb = dist(landmarks[4], landmarks[17]) > dist(landmarks[3], landmarks[17]) * 1.05;
+  if (thumb && fingers === 0) {
+    const dx = landmarks[4].x - landmarks[2].x;
+    const dy = landmarks[4].y - landmarks[2].y;
+    const cosUp = -dy / (Math.hypot(dx, dy) + 1e-9);
+    if (cosUp >= Math.SQRT1_2) return 'thumbs_up';
+    if (cosUp <= -Math.SQRT1_2) return 'thumbs_down';
+  }
+  return COUNT_LABELS[fingers + (thumb ? 1 : 0)];
 }
 
-async function postLabel(label, landmarks) {
+// Frames are buffered and sent in one NDJSON request every FLUSH_MS instead of
+// one POST per onResults callback; the server answers with a label per frame.
+const FLUSH_MS = 500;
+let pendingFrames = [];
+let flushing = false;
+
+function queueFrame(landmarks) {
+  pendingFrames.push(landmarks);
+}
+
+async function flushFrames() {
+  if (flushing || pendingFrames.length === 0) return;
+  flushing = true;
+  const batch = pendingFrames;
+  pendingFrames = [];
   try {
-    await fetch('/api/gesture/predict', {
+    const res = await fetch('/api/gesture/stream', {
       method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ label: label, landmarks: landmarks })
+      headers: { 'Content-Type': 'application/x-ndjson' },
+      body: batch.map(lm => JSON.stringify(lm)).join('\n')
     });
+    // prefer the server-side classifier's label for the latest frame
+    const data = await res.json();
+    const labels = (data.labels || []).filter(l => l);
+    if (labels.length) {
+      gestureStatus.innerText = `Gesture: ${labels[labels.length - 1]}`;
+    }
   } catch (err) {
-    console.error('Failed to post gesture to server', err);
+    console.error('Failed to post gesture frames to server', err);
+  } finally {
+    flushing = false;
   }
 }
+setInterval(flushFrames, FLUSH_MS);
 
 // Setup MediaPipe Hands
 const hands = new Hands({locateFile: (file) => {
@@ -51,8 +84,8 @@ hands.onResults((results) => {
   const landmarks = lm.map(p => ({ x: p.x, y: p.y, z: p.z }));
   const label = classifyFromLandmarks(landmarks);
   gestureStatus.innerText = `Gesture: ${label}`;
-  // send label (and landmarks) to server for logging / progress
-  postLabel(label, landmarks);
+  // batch landmarks for the server-side classifier
+  queueFrame(landmarks);
 });
 
 // Start camera using MediaPipe camera utils
@@ -0,0 +1,151 @@
+# stream_encoder.py
+# JPEG encoding for the MJPEG /video_feed streams.
+#
+# - one StreamEncoder per (quality, width) profile, shared by every client that
+#   asks for it, so a frame is encoded at most once per profile
+# - a frame identical to the previous one (same sequence number, same array or
+#   equal pixels) reuses the previous encoded bytes
+# - downscaling writes into a reused buffer instead of allocating per frame
+# - clients are paced to their fps (capped at STREAM_MAX_FPS)
+#
+# /video_feed?quality=50&width=320&fps=10 picks a client's profile and rate.
+
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+import metrics
+
+DEFAULT_QUALITY = int(os.environ.get("STREAM_JPEG_QUALITY", "70"))
+MAX_FPS = float(os.environ.get("STREAM_MAX_FPS", "15"))
+QUALITY_RANGE = (10, 95)
+WIDTH_RANGE = (80, 1920)
+
+_PART_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+
+
+def mjpeg_part(jpeg_bytes):
+    return b''.join((_PART_HEADER, jpeg_bytes, b'\r\n'))
+
+
+def _clamp(value, lo, hi, cast):
+    if value in (None, ''):
+        return None
+    try:
+        return min(max(cast(value), lo), hi)
+    except (TypeError, ValueError):
+        return None
+
+
+def stream_params(quality=None, width=None, fps=None):
+    """Query-string values -> (quality, width or None, fps); bad or missing values get defaults."""
+    quality = _clamp(quality, *QUALITY_RANGE, int) or DEFAULT_QUALITY
+    width = _clamp(width, *WIDTH_RANGE, int)
+    fps = _clamp(fps, 0.1, MAX_FPS, float) or MAX_FPS
+    return quality, width, fps
+
+
+class StreamEncoder:
+    def __init__(self, quality=DEFAULT_QUALITY, width=None):
+        self.quality = int(quality)
+        self.width = width
+        self._params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        self._lock = threading.Lock()
+        self._resized = None
+        self._last_seq = None
+        self._last_image = None
+        self._last_part = None
+        self.frames_encoded = 0
+        self.frames_reused = 0
+        self.bytes_encoded = 0
+        self.encode_seconds = 0.0
+
+    def _unchanged(self, image, seq):
+        prev = self._last_image
+        if prev is None:
+            return False
+        if seq is not None and seq == self._last_seq:
+            return True
+        return image is prev or (image.shape == prev.shape and np.array_equal(image, prev))
+
+    def _scaled(self, image):
+        h, w = image.shape[:2]
+        if not self.width or self.width >= w:
+            return image
+        size = (self.width, max(1, round(h * self.width / w)))
+        if self._resized is None or self._resized.shape[:2] != (size[1], size[0]):
+            self._resized = np.empty((size[1], size[0]) + image.shape[2:], dtype=image.dtype)
+        return cv2.resize(image, size, dst=self._resized, interpolation=cv2.INTER_AREA)
+
+    def encode(self, image, seq=None):
+        """MJPEG part (boundary + headers + JPEG) for image; reused if the frame did not change."""
+        with self._lock:
+            if self._unchanged(image, seq):
+                self.frames_reused += 1
+            else:
+                t0 = time.perf_counter()
+                with metrics.stage("jpeg_encode"):
+                    ok, buf = cv2.imencode('.jpg', self._scaled(image), self._params)
+                if not ok:
+                    raise ValueError("JPEG encode failed")
+                self.encode_seconds += time.perf_counter() - t0
+                self._last_part = mjpeg_part(buf.data)
+                self._last_image = image
+                self.frames_encoded += 1
+                self.bytes_encoded += len(buf)
+            self._last_seq = seq
+            return self._last_part
+
+    def stats(self):
+        return {
+            "quality": self.quality,
+            "width": self.width,
+            "frames_encoded": self.frames_encoded,
+            "frames_reused": self.frames_reused,
+            "mean_jpeg_bytes": self.bytes_encoded / self.frames_encoded if self.frames_encoded else 0.0,
+            "mean_encode_ms": self.encode_seconds / self.frames_encoded * 1000.0 if self.frames_encoded else 0.0,
+        }
+
+
+class EncoderPool:
+    """Shared StreamEncoder per (quality, width) profile."""
+
+    def __init__(self):
+        self._encoders = {}
+        self._lock = threading.Lock()
+
+    def get(self, quality=DEFAULT_QUALITY, width=None):
+        key = (int(quality), width)
+        with self._lock:
+            enc = self._encoders.get(key)
+            if enc is None:
+                enc = self._encoders[key] = StreamEncoder(quality, width)
+            return enc
+
+    def stats(self):
+        with self._lock:
+            return [enc.stats() for enc in self._encoders.values()]
+
+
+def paced(items, fps):
+    """Yield from items no faster than fps (the producer's newest item is taken after each wait)."""
+    interval = 1.0 / fps if fps else 0.0
+    next_at = time.perf_counter()
+    for item in items:
+        yield item
+        if interval:
+            next_at = max(next_at + interval, time.perf_counter() - interval)
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+
+def static_stream(image, encoder, fps):
+    """Endless MJPEG stream of one unchanging image: encoded once, then paced re-sends."""
+    def repeat():
+        while True:
+            yield encoder.encode(image)
+    return paced(repeat(), fps)
@@ -0,0 +1,17 @@
+# tests/conftest.py
+# Point the app's runtime state (progress / user databases, legacy progress
+# file, landmark store and model) at a throwaway directory before any test
+# imports app, so test runs never create or modify files in the working tree.
+import os
+import shutil
+import tempfile
+
+_STATE_DIR = tempfile.mkdtemp(prefix="app-tests-")
+for name, path in (("PROGRESS_DB", "progress.db"), ("PROGRESS_FILE", "progress.json"), ("USER_DB", "users.db"),
+                   ("LANDMARK_STORE_DIR", "landmark_store"),
+                   ("LANDMARK_MODEL_PATH", os.path.join("models", "landmark_classifier.npz"))):
+    os.environ[name] = os.path.join(_STATE_DIR, path)
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_STATE_DIR, ignore_errors=True)
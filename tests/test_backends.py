@@ -0,0 +1,37 @@
+# tests/test_backends.py
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from backends import LazyBackend
+from app import app
+
+
+def test_backend_is_built_once_on_first_use():
+    calls = []
+    backend = LazyBackend("json_codec", "json", init=lambda mod: calls.append(mod) or mod.dumps)
+    assert not backend.loaded
+    assert backend.get()({"a": 1}) == '{"a": 1}'
+    backend.get()
+    assert len(calls) == 1
+    report = backend.report()
+    assert report["ok"] and report["import_seconds"] is not None
+
+
+def test_missing_backend_degrades_to_none():
+    backend = LazyBackend("nope", "definitely_not_a_real_module_xyz")
+    assert backend.available() is False
+    assert backend.get() is None
+    assert backend.report()["error"]
+
+
+def test_health_does_not_load_heavy_backends():
+    app.testing = True
+    with app.test_client() as client:
+        assert client.get("/health").status_code == 200
+        startup = client.get("/api/stats").get_json()["startup"]
+    assert startup["backends"]["gesture_model"]["loaded"] is False
+    assert startup["backends"]["mediapipe_hands"]["loaded"] is False
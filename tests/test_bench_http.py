@@ -0,0 +1,41 @@
+# tests/test_bench_http.py
+import os
+import sys
+
+import numpy as np
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+for path in (REPO_ROOT, os.path.join(REPO_ROOT, "benchmarks")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from bench_http import build_scenarios, compare, run_scenario, synthetic_sketch
+from shape_recognition import recognize
+from app import app
+
+
+def _result(rps, p50, p95, errors=0):
+    return {"rps": rps, "p50_ms": p50, "p95_ms": p95, "p99_ms": p95, "errors": errors}
+
+
+def test_compare_flags_only_real_regressions():
+    base = {"results": {"a": _result(100, 10, 20), "b": _result(50, 5, 8)}}
+    cur = {"results": {"a": _result(95, 11, 22), "b": _result(30, 5, 12, errors=2)}}
+    problems = compare(cur, base, threshold=0.2)
+    assert all(p.startswith("b:") for p in problems)
+    assert len(problems) == 3  # p95, rps and errors of "b"
+
+
+def test_synthetic_sketches_are_recognizable():
+    rng = np.random.default_rng(0)
+    for shape in ("circle", "triangle", "square"):
+        assert recognize(synthetic_sketch(shape, rng))["shape"] == shape
+
+
+def test_scenarios_run_without_errors():
+    app.testing = True
+    scenarios = build_scenarios()
+    for name in ("recognize", "gesture_predict", "progress_read"):
+        result = run_scenario(app, scenarios[name], requests=6, concurrency=2, warmup=1)
+        assert result["requests"] == 6 and result["errors"] == 0
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
@@ -0,0 +1,70 @@
+# tests/test_camera_stream.py
+import os
+import sys
+import threading
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from camera_stream import FrameBroadcaster, SyntheticSource
+
+
+def _consume(broadcaster, n, out, delay=0.0):
+    frames = broadcaster.frames()
+    for frame in frames:
+        out.append(frame.seq)
+        if len(out) >= n:
+            break
+        time.sleep(delay)
+    frames.close()
+
+
+def test_work_is_done_once_per_frame_for_all_viewers():
+    processed = []
+    broadcaster = FrameBroadcaster(SyntheticSource(size=(160, 120), fps=200),
+                                   process=lambda f: processed.append(1) or f)
+    seen = [[] for _ in range(3)]
+    threads = [threading.Thread(target=_consume, args=(broadcaster, 20, seen[i])) for i in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    broadcaster.stop()
+
+    stats = broadcaster.stats()
+    assert all(len(s) == 20 for s in seen)
+    assert len(processed) == stats["frames_captured"]
+    # three viewers but roughly one capture per published frame, not three
+    assert stats["frames_captured"] < 2 * max(s[-1] for s in seen)
+    assert stats["clients"] == 0
+
+
+def test_slow_client_skips_stale_frames():
+    broadcaster = FrameBroadcaster(SyntheticSource(size=(160, 120), fps=200))
+    seen = []
+    _consume(broadcaster, 5, seen, delay=0.05)
+    broadcaster.stop()
+    assert seen == sorted(seen)
+    assert seen[-1] - seen[0] > len(seen)  # frames in between were dropped, not queued
+    assert broadcaster.stats()["frames_skipped"] > 0
+
+
+def test_processing_errors_do_not_stop_the_producer():
+    calls = []
+
+    def flaky(frame):
+        calls.append(1)
+        if len(calls) % 2:
+            raise RuntimeError("model hiccup")
+        return frame
+
+    broadcaster = FrameBroadcaster(SyntheticSource(size=(160, 120), fps=200), process=flaky)
+    seen = []
+    _consume(broadcaster, 10, seen)
+    broadcaster.stop()
+    stats = broadcaster.stats()
+    assert len(seen) == 10
+    assert stats["process_failures"] >= 5
+    assert stats["frames_captured"] - stats["process_failures"] >= 4  # good frames still went out
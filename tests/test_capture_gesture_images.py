@@ -0,0 +1,75 @@
+# tests/test_capture_gesture_images.py
+import os
+import sys
+import threading
+
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from capture_gesture_images import AsyncWriter, capture, parse_args
+
+
+def _frames_dir(root, n):
+    src = root / "src"
+    src.mkdir()
+    for i in range(n):
+        img = np.full((48, 64, 3), i * 10, dtype=np.uint8)
+        cv2.imwrite(str(src / f"f{i:03d}.png"), img)
+    return src
+
+
+def test_headless_capture_from_directory(tmp_path):
+    src = _frames_dir(tmp_path, 6)
+    data = tmp_path / "dataset"
+    (data / "stop").mkdir(parents=True)
+    cv2.imwrite(str(data / "stop" / "stop_4.jpg"), np.zeros((8, 8, 3), np.uint8))
+
+    args = parse_args(["--class", "stop", "--source", str(src), "--headless", "--count", "5",
+                       "--data", str(data)])
+    assert capture(args) == 0
+    names = sorted(os.listdir(data / "stop"))
+    # existing samples are kept and numbering continues after them
+    assert names == sorted(["stop_4.jpg"] + [f"stop_{i}.jpg" for i in range(5, 10)])
+
+
+def test_full_queue_drops_instead_of_blocking():
+    gate = threading.Event()
+
+    class SlowWriter:
+        def write(self, frame):
+            gate.wait()
+            return "ok"
+
+    out = AsyncWriter(SlowWriter(), workers=1, max_queue=2)
+    accepted = [out.submit(np.zeros(1)) for _ in range(10)]
+    gate.set()
+    out.close()
+    stats = out.stats()
+    assert stats["dropped"] == accepted.count(False) > 0
+    assert stats["saved"] == accepted.count(True)
+
+
+def test_count_is_frames_actually_written(tmp_path, monkeypatch):
+    import capture_gesture_images
+
+    class FlakyWriter(capture_gesture_images.ImageWriter):
+        calls = 0
+
+        def write(self, frame):
+            FlakyWriter.calls += 1
+            if FlakyWriter.calls % 2:
+                raise IOError("disk hiccup")
+            return super().write(frame)
+
+    monkeypatch.setattr(capture_gesture_images, "ImageWriter", FlakyWriter)
+    src = _frames_dir(tmp_path, 12)
+    data = tmp_path / "dataset"
+    args = parse_args(["--class", "stop", "--source", str(src), "--headless", "--count", "4",
+                       "--data", str(data)])
+    assert capture(args) == 0
+    assert len(os.listdir(data / "stop")) == 4
+    assert FlakyWriter.calls == 8
@@ -0,0 +1,141 @@
+# tests/test_evaluate.py
+import json
+import os
+import sys
+
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import evaluate
+from numpy_runtime import export_keras
+
+
+def test_confusion_and_summary():
+    truth = ['a', 'a', 'b', 'b', 'b']
+    pred = ['a', 'b', 'b', 'b', 'c']
+    labels, matrix = evaluate.confusion(truth, pred)
+    assert labels == ['a', 'b', 'c']
+    assert matrix.tolist() == [[1, 1, 0], [0, 2, 1], [0, 0, 0]]
+    report = evaluate.summarize(truth, pred, compute_seconds=0.01, wall_seconds=0.02)
+    assert report['accuracy'] == 0.6
+    assert report['per_class']['b'] == {'samples': 3, 'correct': 2, 'accuracy': 2 / 3}
+    assert 'c' not in report['per_class']
+    assert report['throughput_per_s'] == 250.0
+    assert report['latency_ms_per_sample'] == 2.0
+
+
+class Flatten:
+    name = 'flat'
+
+    def get_config(self):
+        return {}
+
+    def get_weights(self):
+        return []
+
+
+class Dense:
+    name = 'out'
+
+    def __init__(self, kernel):
+        self.kernel = kernel
+
+    def get_config(self):
+        return {'activation': 'softmax', 'units': self.kernel.shape[1]}
+
+    def get_weights(self):
+        return [self.kernel, np.zeros(self.kernel.shape[1], np.float32)]
+
+
+class _Model:
+    def __init__(self, layers, input_shape):
+        self.layers, self.input_shape = layers, (None, *input_shape)
+
+
+def _color_dataset(root, per_class=5):
+    for name, bgr in (('blue', (255, 0, 0)), ('red', (0, 0, 255))):
+        os.makedirs(root / name)
+        for i in range(per_class):
+            cv2.imwrite(str(root / name / f'{i}.jpg'), np.full((40, 60, 3), bgr, np.uint8))
+
+
+def test_gesture_model_over_a_process_pool(tmp_path):
+    # 4x4 input; class 0 scores the blue channel, class 1 the red one (BGR order, as the app feeds it)
+    channel = np.arange(4 * 4 * 3) % 3
+    kernel = np.stack([channel == 0, channel == 2], axis=1).astype(np.float32)
+    model_path = str(tmp_path / 'model.npz')
+    export_keras(_Model([Flatten(), Dense(kernel)], (4, 4, 3)), model_path, class_labels=['blue', 'red'])
+    _color_dataset(tmp_path / 'data')
+
+    (tmp_path / 'data' / 'red' / 'corrupt.jpg').write_bytes(b'not a jpeg')
+    report = evaluate.evaluate_gesture(str(tmp_path / 'data'), model_path, img_size=(4, 4),
+                                       workers=2, chunk_size=3)
+    assert report['samples'] == 10 and report['skipped'] == 1
+    assert report['accuracy'] == 1.0
+    assert report['confusion'] == {'labels': ['blue', 'red'], 'matrix': [[5, 0], [0, 5]]}
+    assert report['latency_ms_per_sample'] > 0
+
+    swapped = evaluate.evaluate_gesture(str(tmp_path / 'data'), model_path, color='rgb', img_size=(4, 4),
+                                        workers=1, chunk_size=4)
+    assert swapped['accuracy'] == 0.0
+
+    # --limit strides across the class-sorted files instead of taking the first class only
+    limited = evaluate.evaluate_gesture(str(tmp_path / 'data'), model_path, img_size=(4, 4), workers=1, limit=4)
+    assert limited['confusion'] == {'labels': ['blue', 'red'], 'matrix': [[2, 0], [0, 2]]}
+
+    # a model without class_labels falls back to the order the app assumes
+    unnamed = str(tmp_path / 'unnamed.npz')
+    export_keras(_Model([Flatten(), Dense(kernel)], (4, 4, 3)), unnamed)
+    report = evaluate.evaluate_gesture(str(tmp_path / 'data'), unnamed, img_size=(4, 4), workers=1)
+    assert report['confusion']['labels'] == ['blue', 'one', 'red', 'two']
+
+
+def test_default_labels_match_the_app():
+    import app
+    assert evaluate.DEFAULT_GESTURE_LABELS == app.class_labels
+    assert evaluate.subset_indices(10, 4).tolist() == [0, 2, 5, 7]
+    assert evaluate.subset_indices(3, 5).tolist() == [0, 1, 2]
+
+
+def test_shapes_rules_and_index(tmp_path):
+    rng = np.random.default_rng(0)
+    for shape in ('circle', 'square'):
+        os.makedirs(tmp_path / shape)
+        for i in range(6):
+            img = np.full((200, 200, 3), 255, np.uint8)
+            c, r = (100 + int(rng.integers(-10, 11)), 100 + int(rng.integers(-10, 11))), int(rng.integers(40, 70))
+            if shape == 'circle':
+                cv2.circle(img, c, r, (0, 0, 0), 4)
+            else:
+                cv2.rectangle(img, (c[0] - r, c[1] - r), (c[0] + r, c[1] + r), (0, 0, 0), 4)
+            cv2.imwrite(str(tmp_path / shape / f'{i}.png'), img)
+    cv2.imwrite(str(tmp_path / 'circle' / 'blank.png'), np.full((200, 200, 3), 255, np.uint8))
+
+    (tmp_path / 'square' / 'corrupt.png').write_bytes(b'not a png')
+    rules = evaluate.evaluate_shapes(str(tmp_path), workers=1, chunk_size=5)
+    assert rules['samples'] == 13 and rules['skipped'] == 1
+    assert rules['per_class']['circle']['correct'] == 6
+    assert rules['per_class']['square']['accuracy'] == 1.0
+    assert evaluate.NO_SHAPE in rules['confusion']['labels']
+
+    pooled = evaluate.evaluate_shapes(str(tmp_path), workers=2, chunk_size=5)
+    assert pooled['confusion'] == rules['confusion']
+
+    indexed = evaluate.evaluate_shapes(str(tmp_path), method='index', workers=1)
+    assert indexed['index_samples'] == 7
+    assert indexed['samples'] == 6
+
+
+def test_rules_cli_on_collected_data(tmp_path, capsys):
+    out = tmp_path / 'report.json'
+    assert evaluate.main(['rules', '--data', os.path.join(REPO_ROOT, 'collected_data'),
+                          '--workers', '2', '--chunk-size', '16', '--output', str(out)]) == 0
+    report = json.loads(out.read_text())
+    assert report == json.loads(capsys.readouterr().out)
+    assert report['target'] == 'rules' and report['workers'] == 2
+    assert report['samples'] == sum(v['samples'] for v in report['per_class'].values())
+    assert report['samples'] == sum(map(sum, report['confusion']['matrix']))
@@ -0,0 +1,80 @@
+# tests/test_generate_quiz_audio.py
+import json
+import os
+import re
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import app as app_module
+from generate_quiz_audio import build, clip_key
+from question_bank import QuestionBank
+
+SETTINGS = {"rate": 150, "volume": 1.0, "voice": None, "format": "wav"}
+
+
+def fake_render(text, path, settings):
+    # stands in for pyttsx3 (+ ffmpeg); records which process rendered the clip
+    with open(path, "w") as f:
+        f.write(f"{os.getpid()}:{settings['rate']}:{text}")
+
+
+def test_unchanged_clips_are_skipped(tmp_path):
+    texts = ["How do you feel?", "What might you feel?", "How do you feel?"]
+    first = build(texts, str(tmp_path), SETTINGS, workers=2, render=fake_render)
+    assert (first["clips"], first["rendered"], first["skipped"]) == (2, 2, 0)
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert manifest["settings"] == SETTINGS
+    entry = manifest["entries"]["How do you feel?"]
+    assert entry["file"] == clip_key("How do you feel?", SETTINGS) + ".wav"
+    assert (tmp_path / entry["file"]).read_text().endswith(":150:How do you feel?")
+
+    again = build(texts, str(tmp_path), SETTINGS, render=fake_render)
+    assert (again["rendered"], again["skipped"]) == (0, 2)
+
+    # new voice settings and a changed question get new names; --prune drops the stale clips
+    slower = dict(SETTINGS, rate=120)
+    changed = build(["How do you feel?", "Who is at the door?"], str(tmp_path), slower, workers=1,
+                    render=fake_render, prune=True)
+    assert (changed["rendered"], changed["removed"]) == (2, 2)
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        ["manifest.json"] + [clip_key(t, slower) + ".wav" for t in ("How do you feel?", "Who is at the door?")])
+
+
+def test_failed_renders_leave_no_partial_files(tmp_path):
+    def broken_render(text, path, settings):
+        with open(path, "w") as f:
+            f.write("half a clip")
+        raise RuntimeError("voice engine crashed")
+
+    with pytest.raises(RuntimeError):
+        build(["How do you feel?"], str(tmp_path), SETTINGS, workers=1, render=broken_render)
+    assert os.listdir(tmp_path) == []
+
+    # a .part left by a killed run is swept by --prune
+    (tmp_path / ".stale.wav.part").write_text("x")
+    summary = build(["How do you feel?"], str(tmp_path), SETTINGS, render=fake_render, prune=True)
+    assert summary["removed"] == 1
+    assert sorted(os.listdir(tmp_path)) == sorted(["manifest.json", clip_key("How do you feel?", SETTINGS) + ".wav"])
+
+
+def test_emotion_page_links_cacheable_audio(tmp_path, monkeypatch):
+    bank = QuestionBank.load()
+    build([q["text"] for q in bank.emotion], str(tmp_path), SETTINGS, workers=1, render=fake_render)
+    monkeypatch.setattr(app_module, "QUIZ_AUDIO_DIR", str(tmp_path))
+    app_module.app.testing = True
+    with app_module.app.test_client() as client:
+        page = client.get("/quiz/emotion").get_data(as_text=True)
+        src = re.search(r'id="question-audio" src="([^"]+)"', page).group(1)
+        res = client.get(src)
+        assert res.status_code == 200
+        assert res.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+        assert client.get("/audio/quiz/missing.wav").status_code == 404
+
+    monkeypatch.setattr(app_module, "QUIZ_AUDIO_DIR", str(tmp_path / "none"))
+    with app_module.app.test_client() as client:
+        assert 'id="question-audio"' not in client.get("/quiz/emotion").get_data(as_text=True)
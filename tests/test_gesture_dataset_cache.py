@@ -0,0 +1,67 @@
+# tests/test_gesture_dataset_cache.py
+import os
+import sys
+
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from gesture_dataset_cache import build_cache
+
+
+def _make_dataset(root, per_class=5):
+    for c, cls in enumerate(["one", "two"]):
+        os.makedirs(root / cls)
+        for i in range(per_class):
+            img = np.full((48, 64, 3), 40 * i, np.uint8)
+            img[..., c] = 255
+            cv2.imwrite(str(root / cls / f"{cls}_{i}.jpg"), img)
+
+
+def test_build_reuses_unchanged_images(tmp_path):
+    data, cache_dir = tmp_path / "data", str(tmp_path / "cache")
+    _make_dataset(data)
+    cache, report = build_cache(str(data), cache_dir, img_size=(32, 32), workers=1)
+    assert report["processed"] == 10 and report["reused"] == 0
+    assert cache.images.shape == (10, 32, 32, 3)
+    assert cache.classes == ["one", "two"]
+    assert list(cache.labels) == [0] * 5 + [1] * 5
+    # stored as RGB: class "one" was written with a saturated blue (BGR) channel
+    assert cache.images[0, ..., 2].mean() > 200
+
+    cv2.imwrite(str(data / "two" / "two_0.jpg"), np.zeros((48, 64, 3), np.uint8))
+    cv2.imwrite(str(data / "two" / "two_9.jpg"), np.zeros((48, 64, 3), np.uint8))
+    cache, report = build_cache(str(data), cache_dir, img_size=(32, 32), workers=1)
+    assert report["processed"] == 2 and report["reused"] == 9
+    assert len(cache) == 11
+
+
+def test_split_and_batches(tmp_path):
+    data = tmp_path / "data"
+    _make_dataset(data)
+    cache, _ = build_cache(str(data), str(tmp_path / "cache"), img_size=(16, 16), workers=1)
+    train, val = cache.split(validation_split=0.2)
+    assert val == [(0, 1), (5, 6)]
+    assert train == [(1, 5), (6, 10)]
+    assert cache.steps(train, batch_size=3) == 4
+
+    in_order = list(cache.batches(train, batch_size=3))
+    assert all(np.shares_memory(x, cache.images) for x, _ in in_order)
+    assert [y.tolist() for _, y in in_order] == [[0, 0, 0], [0], [1, 1, 1], [1]]
+
+    # shuffling permutes rows, not blocks: batches mix classes and every row comes once
+    seen, mixed = [], 0
+    for epoch in range(5):
+        for x, y in cache.batches(train, batch_size=4, shuffle=True, seed=epoch):
+            assert x.shape == (len(y), 16, 16, 3)
+            mixed += len(set(y.tolist())) > 1
+            seen.extend(y.tolist())
+    assert sorted(seen) == [0] * 20 + [1] * 20
+    assert mixed > 0
+
+    x, y = next(cache.keras_generator(train, batch_size=4))
+    assert x.dtype == np.float32 and x.max() <= 1.0
+    assert y.shape == (4, 2)
@@ -0,0 +1,66 @@
+# tests/test_gesture_rules.py
+import os
+import sys
+
+import numpy as np
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import gesture_rules
+from landmark_store import load_samples
+
+
+def _hand(extended, thumb=None):
+    """Synthetic upright right hand (image coords, y down). extended: 4 bools index..pinky;
+    thumb: None (folded across the palm), 'up', 'down' or 'side'."""
+    pts = np.zeros((21, 3), np.float32)
+    pts[0] = (0.5, 0.9, 0)
+    for f, up in enumerate(extended):
+        x = 0.42 + 0.05 * f
+        mcp = 5 + 4 * f
+        pts[mcp] = (x, 0.70, 0)
+        if up:
+            pts[mcp + 1:mcp + 4] = [(x, 0.60, 0), (x, 0.52, 0), (x, 0.45, 0)]
+        else:  # curled back towards the palm
+            pts[mcp + 1:mcp + 4] = [(x, 0.64, 0), (x, 0.70, 0), (x, 0.74, 0)]
+    pts[1] = (0.40, 0.84, 0)
+    pts[2] = (0.35, 0.78, 0)
+    if thumb is None:
+        pts[3], pts[4] = (0.40, 0.76, 0), (0.48, 0.77, 0)
+    elif thumb == 'up':
+        pts[3], pts[4] = (0.35, 0.70, 0), (0.35, 0.62, 0)
+    elif thumb == 'down':
+        pts[2], pts[3], pts[4] = (0.33, 0.80, 0), (0.33, 0.88, 0), (0.33, 0.96, 0)
+    else:
+        pts[3], pts[4] = (0.29, 0.76, 0), (0.23, 0.75, 0)
+    return pts
+
+
+def test_labels_for_the_project_label_set():
+    hands = np.stack([
+        _hand([1, 0, 0, 0]), _hand([1, 1, 0, 0]), _hand([1, 1, 1, 0]), _hand([1, 1, 1, 1]),
+        _hand([1, 1, 1, 1], 'side'), _hand([0, 0, 0, 0], 'up'), _hand([0, 0, 0, 0], 'down'),
+        _hand([0, 0, 0, 0]),
+    ])
+    states, counts, labels = gesture_rules.analyze(hands)
+    assert labels.tolist() == ['one', 'two', 'three', 'four', 'stop', 'thumbs_up', 'thumbs_down', 'nothing']
+    assert counts.tolist() == [1, 2, 3, 4, 5, 1, 1, 0]
+    assert states.shape == (8, 5)
+    assert states[4].all() and not states[7].any()
+
+
+def test_invalid_rows_are_nothing():
+    bad = np.stack([np.full((21, 3), np.nan, np.float32), np.zeros((21, 3), np.float32)])
+    _, counts, labels = gesture_rules.analyze(bad)
+    assert counts.tolist() == [0, 0]
+    assert labels.tolist() == ['nothing', 'nothing']
+
+
+def test_replay_collected_data():
+    X, y = load_samples(os.path.join(REPO_ROOT, "collected_data"))
+    report = gesture_rules.replay(X, y)
+    assert report["samples"] == len(X)
+    # a few captures in collected_data are noisy, but most are clean thumbs up
+    assert report["per_label"]["thumbs_up"]["agreement"] > 0.75
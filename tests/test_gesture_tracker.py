@@ -0,0 +1,43 @@
+# tests/test_gesture_tracker.py
+import os
+import sys
+
+import numpy as np
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from gesture_tracker import GestureTracker
+
+STILL = np.full((120, 160, 3), 60, dtype=np.uint8)
+
+
+def test_infers_every_k_frames_on_a_still_scene():
+    calls = []
+    tracker = GestureTracker(lambda f: calls.append(1) or 'stop', every=4, window=3, switch_votes=2)
+    labels = [tracker.update(STILL) for _ in range(20)]
+    assert len(calls) == 5  # frames 1, 5, 9, 13, 17
+    assert labels[-1] == 'stop'
+    assert tracker.stats()["skip_ratio"] == 0.75
+
+
+def test_motion_forces_early_inference():
+    calls = []
+    tracker = GestureTracker(lambda f: calls.append(1) or 'one', every=100, motion_threshold=5.0)
+    tracker.update(STILL)
+    tracker.update(STILL)
+    moved = STILL.copy()
+    moved[:, :80] = 220
+    tracker.update(moved)
+    assert len(calls) == 2
+    assert tracker.stats()["motion_triggers"] == 1
+
+
+def test_single_frame_flicker_is_suppressed():
+    raw = iter(['two', 'two', 'two', 'four', 'two', 'two', 'four', 'four', 'four', 'four'])
+    tracker = GestureTracker(lambda f: next(raw), every=1, motion_threshold=None, window=5, switch_votes=3)
+    labels = [tracker.update(STILL) for _ in range(10)]
+    assert labels[:7] == ['nothing', 'nothing', 'two', 'two', 'two', 'two', 'two']
+    assert labels[-1] == 'four'
+    assert tracker.stats()["label_switches"] == 2
@@ -0,0 +1,60 @@
+# tests/test_image_decode.py
+import base64
+import glob
+import io
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from image_decode import PayloadTooLarge, decode_b64_image, decode_image, jpeg_size
+from app import app
+
+JPEG = sorted(glob.glob(os.path.join(REPO_ROOT, "gesture_dataset", "*", "*.jpg")))[0]
+
+
+def _jpeg_bytes():
+    with open(JPEG, "rb") as f:
+        return f.read()
+
+
+def test_reduced_jpeg_decode_keeps_enough_resolution():
+    data = _jpeg_bytes()
+    assert jpeg_size(data) == (640, 480)
+    full = decode_image(data)
+    small = decode_image(data, target_size=(100, 100))
+    assert full.shape == (480, 640, 3)
+    assert small.shape == (120, 160, 3)
+
+
+def test_png_alpha_is_dropped_and_limits_apply():
+    rgba = np.zeros((20, 30, 4), np.uint8)
+    rgba[..., 2] = 255
+    rgba[..., 3] = 128
+    ok, buf = cv2.imencode(".png", rgba)
+    url = "data:image/png;base64," + base64.b64encode(buf.tobytes()).decode()
+    img = decode_b64_image(url)
+    assert img.shape == (20, 30, 3)
+    assert img[0, 0, 2] == 255
+    with pytest.raises(PayloadTooLarge):
+        decode_b64_image(url, max_bytes=10)
+    with pytest.raises(ValueError):
+        decode_b64_image("data:image/png;base64,bm90IGFuIGltYWdl")
+
+
+def test_gesture_control_accepts_jpeg_upload():
+    app.testing = True
+    with app.test_client() as client:
+        res = client.post("/gesture_control", data={"frame": (io.BytesIO(_jpeg_bytes()), "f.jpg")},
+                          content_type="multipart/form-data")
+        assert res.status_code == 200
+        assert "gesture" in res.get_json()
+        res = client.post("/gesture_control", data={"frame": (io.BytesIO(b"junk"), "f.jpg")},
+                          content_type="multipart/form-data")
+        assert res.status_code == 400
@@ -0,0 +1,53 @@
+# tests/test_inference_batcher.py
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from inference_batcher import MicroBatcher
+
+
+def test_concurrent_callers_share_batches_and_get_their_own_results():
+    calls = []
+
+    def predict(batch):
+        calls.append(len(batch))
+        return [float(x.sum()) for x in batch]
+
+    batcher = MicroBatcher(predict, max_batch=8, max_wait_ms=50)
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.predict(np.full((2, 2), i, dtype=np.float32), timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert results == {i: 4.0 * i for i in range(16)}
+    assert max(calls) <= 8
+    assert len(calls) < 16
+    stats = batcher.stats()
+    assert stats["items"] == 16
+    assert stats["batches"] == len(calls)
+    assert stats["max_queue_delay_ms"] >= 0.0
+
+
+def test_errors_propagate_to_every_caller():
+    def predict(batch):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(predict, max_batch=4, max_wait_ms=1)
+    with pytest.raises(RuntimeError):
+        batcher.predict(np.zeros(3), timeout=5)
+    assert batcher.stats()["errors"] == 1
+    batcher.close()
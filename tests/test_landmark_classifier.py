@@ -0,0 +1,127 @@
+# tests/test_landmark_classifier.py
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from landmark_classifier import LandmarkClassifier, parse_landmarks, landmark_features
+from landmark_store import load_samples
+import app as app_module
+from app import app
+
+SAMPLE = os.path.join(REPO_ROOT, "collected_data", "thumbs_up", "sample_10.json")
+
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as client:
+        yield client
+
+
+def _sample_landmarks():
+    with open(SAMPLE) as f:
+        return json.load(f)["landmarks"]
+
+
+def test_parse_landmarks_formats():
+    flat = _sample_landmarks()
+    triples = np.asarray(flat).reshape(21, 3).tolist()
+    points = [{"x": x, "y": y, "z": z} for x, y, z in triples]
+    for payload in (flat, triples, points):
+        assert parse_landmarks(payload).shape == (1, 21, 3)
+    assert parse_landmarks([points, points, points]).shape == (3, 21, 3)
+    with pytest.raises(ValueError):
+        parse_landmarks([0.1, 0.2, 0.3, 0.4])
+    for junk in (5, "a", None):
+        with pytest.raises(ValueError):
+            parse_landmarks(points[:20] + [junk])
+        with pytest.raises(ValueError):
+            parse_landmarks([points, points[:20] + [junk]])
+
+
+def test_features_are_translation_and_scale_invariant():
+    frame = parse_landmarks(_sample_landmarks())
+    moved = frame * 2.5 + np.array([0.3, -0.1, 0.05], dtype=np.float32)
+    np.testing.assert_allclose(landmark_features(frame), landmark_features(moved), atol=1e-4)
+
+
+def test_batch_predict_and_roundtrip(tmp_path):
+    X, y = load_samples(os.path.join(REPO_ROOT, "collected_data"))
+    rng = np.random.default_rng(0)
+    other = X[:, ::-1, :] + rng.normal(0, 0.01, X.shape).astype(np.float32)
+    clf = LandmarkClassifier.fit(np.concatenate([X, other]), np.concatenate([y, ["stop"] * len(X)]))
+    labels, _ = clf.predict(np.concatenate([X, other]))
+    # outliers beyond the reject radius come back as "nothing", never as the other class
+    assert set(labels[:len(X)]) <= {"thumbs_up", "nothing"}
+    assert np.mean(labels[:len(X)] == "thumbs_up") > 0.8
+    assert set(labels[len(X):]) <= {"stop", "nothing"}
+
+    path = str(tmp_path / "model.npz")
+    clf.save(path)
+    loaded = LandmarkClassifier.load(path)
+    assert list(loaded.predict(X)[0]) == list(labels[:len(X)])
+
+
+def _hand(extended):
+    """Upright synthetic hand with the given index..pinky fingers extended, thumb folded."""
+    pts = np.zeros((21, 3), np.float32)
+    pts[0] = (0.5, 0.9, 0)
+    pts[1:5] = [(0.40, 0.84, 0), (0.35, 0.78, 0), (0.40, 0.76, 0), (0.48, 0.77, 0)]
+    for f, up in enumerate(extended):
+        x = 0.42 + 0.05 * f
+        ys = (0.70, 0.60, 0.52, 0.45) if up else (0.70, 0.64, 0.70, 0.74)
+        pts[5 + 4 * f:9 + 4 * f] = [(x, v, 0) for v in ys]
+    return pts
+
+
+def test_invalid_and_foreign_hands_are_rejected(monkeypatch):
+    X, y = load_samples(os.path.join(REPO_ROOT, "collected_data"))
+    clf = LandmarkClassifier.fit(X, y)  # a single class must not claim every hand
+    bad = np.stack([np.zeros((21, 3), np.float32), np.full((21, 3), np.nan, np.float32)])
+    labels, dist, margin = clf.predict_with_margin(bad)
+    assert labels.tolist() == ["nothing", "nothing"]
+    assert np.isinf(dist).all() and not margin.any()
+
+    # the collected thumbs_up samples are broad, so some random hands fall inside the radius,
+    # but none with the margin needed to override the finger rules
+    rng = np.random.default_rng(0)
+    noise = rng.random((500, 21, 3)).astype(np.float32)
+    labels, _, margin = clf.predict_with_margin(noise)
+    assert np.mean(labels == "thumbs_up") < 0.2 and margin.max() < 0.5
+    monkeypatch.setattr(app_module, "get_landmark_classifier", lambda: clf)
+    assert np.mean(np.asarray(app_module.classify_landmarks(noise)) == "thumbs_up") < 0.02
+    _, _, margin = clf.predict_with_margin(np.stack([_hand([1, 0, 0, 0]), _hand([1, 1, 0, 0]), _hand([1, 1, 1, 1])]))
+    assert margin.max() < 0.5
+
+
+def test_rules_label_survives_an_unconfident_classifier(client):
+    frames = [_hand([1, 0, 0, 0]).tolist(), _hand([1, 1, 0, 0]).tolist(), _hand([1, 1, 1, 0]).tolist(),
+              np.zeros((21, 3)).tolist()]
+    res = client.post("/api/gesture/predict", json={"frames": frames})
+    assert res.get_json()["labels"] == ["one", "two", "three", "nothing"]
+
+
+def test_predict_endpoint_classifies_landmarks(client):
+    res = client.post("/api/gesture/predict", json={"label": "point", "landmarks": _sample_landmarks()})
+    body = res.get_json()
+    assert res.status_code == 200
+    assert body["label"] == "thumbs_up"
+    assert body["source"] == "server"
+    assert body["client_label"] == "point"
+    assert body["fingers"] == 1
+
+    res = client.post("/api/gesture/predict", json={"frames": [_sample_landmarks()] * 4})
+    assert res.get_json()["labels"] == ["thumbs_up"] * 4
+
+    res = client.post("/api/gesture/predict", json={"landmarks": [1, 2, 3]})
+    assert res.status_code == 400
+    points = [{"x": 0.1, "y": 0.2, "z": 0.0}] * 20
+    res = client.post("/api/gesture/predict", json={"landmarks": points + ["a"]})
+    assert res.status_code == 400
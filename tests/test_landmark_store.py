@@ -0,0 +1,63 @@
+# tests/test_landmark_store.py
+import os
+import sys
+
+import numpy as np
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import app as app_module
+import landmark_store
+from landmark_store import LandmarkStore, convert_json_tree
+
+
+def test_append_across_chunks_and_read_back(tmp_path):
+    store = LandmarkStore(str(tmp_path / "store"), chunk_rows=4)
+    rows = np.arange(10 * 63, dtype=np.float32).reshape(10, 63)
+    assert store.append(rows[:3], "one") == [0, 1, 2]
+    assert store.append(rows[3:], ["two"] * 7, timestamps=np.arange(7)) == list(range(3, 10))
+    assert len(store) == 10
+
+    X, y, ts = store.read()
+    np.testing.assert_array_equal(X.reshape(10, 63), rows)
+    assert list(y) == ["one"] * 3 + ["two"] * 7
+    assert list(ts[3:]) == list(range(7))
+
+    # chunk views are memory-mapped, not copies
+    _, view, _, _ = next(store.iter_chunks())
+    assert isinstance(view.base, np.memmap) or isinstance(view, np.memmap)
+
+    reopened = LandmarkStore(str(tmp_path / "store"))
+    X2, y2, _ = reopened.read(start=4, stop=6)
+    np.testing.assert_array_equal(X2.reshape(2, 63), rows[4:6])
+    assert list(y2) == ["two", "two"]
+
+
+def test_convert_json_tree_runs_once(tmp_path, monkeypatch):
+    store = LandmarkStore(str(tmp_path / "store"))
+    data_dir = os.path.join(REPO_ROOT, "collected_data")
+    imported = convert_json_tree(data_dir, store, once=True)
+    assert imported > 0
+    # later workers see the recorded import without reading the JSON tree again
+    monkeypatch.setattr(landmark_store, "read_json_tree", lambda path: pytest.fail("tree was re-read"))
+    assert convert_json_tree(data_dir, store, once=True) == 0
+    assert len(store) == imported
+    assert store.labels == ["thumbs_up"]
+
+
+def test_save_endpoint_rejects_invalid_frames(tmp_path, monkeypatch):
+    store = LandmarkStore(str(tmp_path / "store"))
+    monkeypatch.setattr(app_module, "_landmark_store", store)
+    hand = np.linspace(0, 1, 63, dtype=np.float32).reshape(21, 3).tolist()
+    with app_module.app.test_client() as client:
+        res = client.post("/api/data/save", json={"label": "up", "landmarks": [hand, hand]})
+        assert res.status_code == 200 and res.get_json()["count"] == 2
+        for bad in ([[0.0, 0.0, 0.0]] * 21, [[float("nan")] * 3] * 21):
+            res = client.post("/api/data/save", json={"label": "up", "landmarks": [hand, bad]})
+            assert res.status_code == 400 and res.get_json()["frames"] == [1]
+        body = '{"label": "up", "landmarks": [%s]}' % ", ".join(["[Infinity, 0, 0]"] * 21)
+        assert client.post("/api/data/save", data=body, content_type="application/json").status_code == 400
+    assert len(store) == 2
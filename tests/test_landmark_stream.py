@@ -0,0 +1,83 @@
+# tests/test_landmark_stream.py
+import io
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import app as app_module
+from landmark_store import LandmarkStore
+from landmark_stream import iter_batches
+from app import app
+
+with open(os.path.join(REPO_ROOT, "collected_data", "thumbs_up", "sample_10.json")) as f:
+    SAMPLE = json.load(f)["landmarks"]
+
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_ndjson_batches_keep_line_indices():
+    points = [{"x": x, "y": y, "z": z} for x, y, z in np.reshape(SAMPLE, (21, 3)).tolist()]
+    lines = [json.dumps(SAMPLE), json.dumps({"landmarks": points}), "[1, 2]", "", json.dumps(SAMPLE)]
+    errors = []
+    batches = list(iter_batches(io.BytesIO("\n".join(lines).encode()), "application/x-ndjson",
+                                batch_size=2, errors=errors))
+    valid = np.concatenate([b[2] for b in batches])
+    assert list(valid) == [True, True, False, True]
+    assert [b[0] for b in batches] == [0, 2]
+    assert errors[0]["frame"] == 2
+
+
+def test_binary_batches_and_truncated_body():
+    frames = np.tile(np.asarray(SAMPLE, dtype="<f4"), (5, 1))
+    batches = list(iter_batches(io.BytesIO(frames.tobytes()), "application/octet-stream", batch_size=2))
+    assert [len(b[1]) for b in batches] == [2, 2, 1]
+    with pytest.raises(ValueError):
+        list(iter_batches(io.BytesIO(frames.tobytes()[:-3]), "application/octet-stream"))
+
+
+def test_ndjson_line_length_is_capped():
+    body = io.BytesIO(b"[" + b"0.5, " * 40000 + b"0.5]\n")
+    with pytest.raises(ValueError, match="longer than"):
+        list(iter_batches(body, "application/x-ndjson"))
+
+
+def test_stream_endpoint_returns_label_per_frame(client):
+    body = "\n".join([json.dumps(SAMPLE)] * 3 + ["not json"])
+    res = client.post("/api/gesture/stream", data=body, content_type="application/x-ndjson")
+    data = res.get_json()
+    assert res.status_code == 200
+    assert data["labels"] == ["thumbs_up"] * 3 + [None]
+    assert data["errors"][0]["frame"] == 3
+
+    packed = np.tile(np.asarray(SAMPLE, dtype="<f4"), (4, 1)).tobytes()
+    res = client.post("/api/gesture/stream", data=packed, content_type="application/octet-stream")
+    assert res.get_json()["labels"] == ["thumbs_up"] * 4
+
+
+def test_stream_save_is_all_or_nothing(client, tmp_path, monkeypatch):
+    store = LandmarkStore(str(tmp_path / "store"))
+    monkeypatch.setattr(app_module, "_landmark_store", store)
+    frames = np.tile(np.asarray(SAMPLE, dtype="<f4"), (1000, 1))
+    frames[7] = np.nan
+    url = "/api/gesture/stream?save=1&label=up"
+    res = client.post(url, data=frames.tobytes()[:-3], content_type="application/octet-stream")
+    assert res.status_code == 400 and res.get_json()["saved"] == 0
+    assert len(store) == 0  # 768 frames were already parsed, none stored
+
+    res = client.post(url, data=frames.tobytes(), content_type="application/octet-stream")
+    data = res.get_json()
+    assert res.status_code == 200 and data["saved"] == 999 and len(store) == 999
+    assert data["labels"][7] is None and data["errors"] == [{"frame": 7, "error": "non-finite or degenerate hand"}]
+    assert client.post("/api/gesture/stream?save=1", data=b"", content_type="application/octet-stream").status_code == 400
@@ -0,0 +1,59 @@
+# tests/test_metrics.py
+import json
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import metrics
+from app import app
+
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_histogram_render():
+    reg = metrics.Registry()
+    h = reg.histogram("t_seconds", "test", ("stage",), buckets=(0.1, 1.0))
+    c = reg.counter("t_total", "test", ("route",))
+    for v in (0.05, 0.5, 5.0):
+        h.observe(v, stage="decode")
+    c.inc(route="/x")
+    c.inc(2, route="/x")
+    text = metrics.render(metrics.merge([reg.snapshot()]))
+    assert 't_seconds_bucket{stage="decode",le="0.1"} 1' in text
+    assert 't_seconds_bucket{stage="decode",le="1"} 2' in text
+    assert 't_seconds_bucket{stage="decode",le="+Inf"} 3' in text
+    assert 't_seconds_count{stage="decode"} 3' in text
+    assert 't_total{route="/x"} 3' in text
+
+
+def test_other_workers_snapshots_are_merged(tmp_path):
+    reg = metrics.Registry()
+    reg.counter("t_total", "test", ("route",)).inc(route="/a")
+    other = metrics.Registry()
+    other.counter("t_total", "test", ("route",)).inc(4, route="/a")
+    (tmp_path / "worker_999999.json").write_text(json.dumps(other.snapshot()))
+    merged = metrics.collect(str(tmp_path), registry=reg)
+    assert merged["t_total"]["samples"] == [[["/a"], 5.0]]
+
+
+def test_metrics_endpoint_reports_routes_and_stages(client):
+    client.get("/api/meta")
+    client.post("/api/recognize", json={"image": "data:image/png;base64,AAAA"})
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.content_type.startswith("text/plain")
+    text = res.get_data(as_text=True)
+    assert 'http_requests_total{route="/api/meta",method="GET",status="200"}' in text
+    assert 'http_request_duration_seconds_count{route="/api/recognize"}' in text
+    assert 'http_request_size_bytes_count{route="/api/recognize"}' in text
+    assert 'stage_duration_seconds_count{stage="decode"}' in text
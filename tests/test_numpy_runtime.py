@@ -0,0 +1,137 @@
+# tests/test_numpy_runtime.py
+import os
+import sys
+
+import numpy as np
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import numpy_runtime
+from numpy_runtime import conv2d, export_keras, load_model, pool2d
+
+
+def _naive_conv(x, k, b, stride=1):
+    n, h, w, _ = x.shape
+    kh, kw, _, f = k.shape
+    ho, wo = (h - kh) // stride + 1, (w - kw) // stride + 1
+    out = np.zeros((n, ho, wo, f), np.float32)
+    for i in range(ho):
+        for j in range(wo):
+            patch = x[:, i * stride:i * stride + kh, j * stride:j * stride + kw, :]
+            out[:, i, j, :] = np.tensordot(patch, k, axes=([1, 2, 3], [0, 1, 2])) + b
+    return out
+
+
+def test_conv_and_pool_match_reference():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((2, 9, 11, 3)).astype(np.float32)
+    k = rng.standard_normal((3, 3, 3, 4)).astype(np.float32)
+    b = rng.standard_normal(4).astype(np.float32)
+    np.testing.assert_allclose(conv2d(x, k, b), _naive_conv(x, k, b), rtol=1e-4, atol=1e-4)
+    np.testing.assert_allclose(conv2d(x, k, b, (2, 2)), _naive_conv(x, k, b, 2), rtol=1e-4, atol=1e-4)
+    assert conv2d(x, k, b, padding='same').shape == (2, 9, 11, 4)
+
+    pooled = pool2d(x, (2, 2), (2, 2))
+    assert pooled.shape == (2, 4, 5, 3)
+    assert pooled[0, 1, 2, 0] == x[0, 2:4, 4:6, 0].max()
+
+
+# Minimal stand-ins with the Keras layer API (class name, get_config, get_weights)
+class _Layer:
+    def __init__(self, name, config, weights=()):
+        self.name, self._config, self._weights = name, config, list(weights)
+
+    def get_config(self):
+        return dict(self._config)
+
+    def get_weights(self):
+        return self._weights
+
+
+class Conv2D(_Layer):
+    pass
+
+
+class MaxPooling2D(_Layer):
+    pass
+
+
+class Flatten(_Layer):
+    pass
+
+
+class Dropout(_Layer):
+    pass
+
+
+class Dense(_Layer):
+    pass
+
+
+class _Model:
+    def __init__(self, layers, input_shape):
+        self.layers, self.input_shape = layers, (None, *input_shape)
+
+
+def _notebook_like_model(rng):
+    conv_k = rng.standard_normal((3, 3, 3, 4)).astype(np.float32) * 0.2
+    dense_k = rng.standard_normal((4 * 4 * 4, 5)).astype(np.float32) * 0.2
+    layers = [
+        Conv2D('conv', {'activation': 'relu', 'strides': (1, 1), 'padding': 'valid', 'filters': 4},
+               [conv_k, np.zeros(4, np.float32)]),
+        MaxPooling2D('pool', {'pool_size': (2, 2), 'strides': (2, 2), 'padding': 'valid'}),
+        Flatten('flat', {}),
+        Dropout('drop', {'rate': 0.3}),
+        Dense('out', {'activation': 'softmax', 'units': 5}, [dense_k, np.zeros(5, np.float32)]),
+    ]
+    x = rng.random((3, 10, 10, 3), dtype=np.float32)
+    expected = numpy_runtime._softmax(
+        pool2d(np.maximum(_naive_conv(x, conv_k, 0), 0), (2, 2), (2, 2)).reshape(3, -1) @ dense_k)
+    return _Model(layers, (10, 10, 3)), x, expected
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_export_round_trip(tmp_path, quantize):
+    model, x, expected = _notebook_like_model(np.random.default_rng(1))
+    path = tmp_path / "m.npz"
+    export_keras(model, str(path), quantize=quantize, class_labels=list("abcde"))
+    runtime = load_model(str(path))
+    assert runtime.class_labels == list("abcde")
+    out = runtime.predict(x)
+    np.testing.assert_allclose(out, expected, atol=2e-2 if quantize else 1e-5)
+    assert (out.argmax(1) == expected.argmax(1)).all()
+
+
+def test_unsupported_layer_is_rejected(tmp_path):
+    class BatchNormalization(_Layer):
+        pass
+    model = _Model([BatchNormalization('bn', {})], (4,))
+    with pytest.raises(ValueError):
+        export_keras(model, str(tmp_path / "m.npz"))
+
+
+def test_parity_with_keras(tmp_path):
+    tf = pytest.importorskip("tensorflow")
+    from tensorflow.keras import layers, models
+    model = models.Sequential([
+        layers.Input(shape=(100, 100, 3)),
+        layers.Conv2D(32, (3, 3), activation='relu'),
+        layers.MaxPooling2D(2, 2),
+        layers.Conv2D(64, (3, 3), activation='relu'),
+        layers.MaxPooling2D(2, 2),
+        layers.Conv2D(128, (3, 3), activation='relu'),
+        layers.MaxPooling2D(2, 2),
+        layers.Flatten(),
+        layers.Dropout(0.3),
+        layers.Dense(128, activation='relu'),
+        layers.Dense(7, activation='softmax'),
+    ])
+    x = np.random.default_rng(2).random((4, 100, 100, 3), dtype=np.float32)
+    expected = model.predict(x, verbose=0)
+    for quantize, atol in ((False, 1e-4), (True, 5e-2)):
+        path = tmp_path / f"m{int(quantize)}.npz"
+        export_keras(model, str(path), quantize=quantize)
+        np.testing.assert_allclose(load_model(str(path)).predict(x), expected, atol=atol)
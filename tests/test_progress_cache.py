@@ -0,0 +1,69 @@
+# tests/test_progress_cache.py
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from progress_cache import ProgressCache
+from progress_store import SQLiteProgressStore
+
+
+class CountingStore(SQLiteProgressStore):
+    def __init__(self, path):
+        super().__init__(path)
+        self.reads = 0
+        self.write_batches = 0
+
+    def get(self, user_id, default=None):
+        self.reads += 1
+        return super().get(user_id, default)
+
+    def update_many(self, fns):
+        self.write_batches += 1
+        return super().update_many(fns)
+
+
+def test_reads_are_served_from_memory(tmp_path):
+    store = CountingStore(str(tmp_path / "progress.db"))
+    store.put("child_1", {"stars": 2})
+    cache = ProgressCache(store, flush_interval=60)
+    for _ in range(50):
+        assert cache.get("child_1") == {"stars": 2}
+    assert store.reads == 1
+    stats = cache.stats()
+    assert stats["hits"] == 49 and stats["misses"] == 1
+
+
+def test_increments_are_coalesced_and_merged_on_flush(tmp_path):
+    path = str(tmp_path / "progress.db")
+    store = CountingStore(path)
+    cache = ProgressCache(store, flush_interval=60)
+    for _ in range(10):
+        cache.increment("child_1", "stars")
+    cache.set_fields("child_1", last_activity="Emotion Quiz")
+    assert cache.get("child_1") == {"stars": 10, "last_activity": "Emotion Quiz"}
+    assert store.write_batches == 0
+
+    # another worker writes in the meantime; its stars must not be lost
+    SQLiteProgressStore(path).update("child_1", lambda d: {**d, "stars": d.get("stars", 0) + 5})
+    assert cache.flush() == 1
+    assert store.write_batches == 1
+    assert store.get("child_1") == {"stars": 15, "last_activity": "Emotion Quiz"}
+    assert cache.get("child_1")["stars"] == 15
+    cache.close()
+
+
+def test_lru_keeps_dirty_entries_until_flushed(tmp_path):
+    store = CountingStore(str(tmp_path / "progress.db"))
+    cache = ProgressCache(store, maxsize=2, flush_interval=60)
+    cache.put("a", {"stars": 1})
+    cache.get("b")
+    cache.get("c")
+    cache.get("d")
+    assert cache.get("a") == {"stars": 1}
+    cache.flush()
+    assert store.get("a") == {"stars": 1}
+    assert cache.stats()["size"] <= 2
+    cache.close()
@@ -0,0 +1,56 @@
+# tests/test_progress_store.py
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from progress_store import GLOBAL_KEY, JSONProgressStore, SQLiteProgressStore, open_progress_store
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "json"])
+def test_concurrent_updates_are_not_lost(tmp_path, backend):
+    path = str(tmp_path / ("progress.db" if backend == "sqlite" else "progress.json"))
+    open_progress_store(backend, path)
+
+    def bump(data):
+        data["stars"] = data.get("stars", 0) + 1
+        return data
+
+    def worker():
+        # a separate store object per thread stands in for a separate gunicorn worker
+        store = SQLiteProgressStore(path) if backend == "sqlite" else JSONProgressStore(path)
+        for _ in range(25):
+            store.update("child_1", bump)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert open_progress_store(backend, path).get("child_1") == {"stars": 100}
+
+
+def test_sqlite_migrates_legacy_json_once(tmp_path):
+    legacy = tmp_path / "progress.json"
+    legacy.write_text(json.dumps({
+        "child_1": {"stars": 3, "quiz_score": 2},
+        "stars": 4,
+        "badge_unlocked": False,
+    }))
+    db = str(tmp_path / "progress.db")
+    store = open_progress_store("sqlite", db, migrate_from=str(legacy))
+    assert store.get("child_1") == {"stars": 3, "quiz_score": 2}
+    assert store.get(GLOBAL_KEY) == {"stars": 4, "badge_unlocked": False}
+
+    store.put("child_1", {"stars": 5})
+    again = open_progress_store("sqlite", db, migrate_from=str(legacy))
+    assert again.get("child_1") == {"stars": 5}
+    assert again.get_many(["child_1", "missing"]) == {"child_1": {"stars": 5}}
+    assert again.count() == 2
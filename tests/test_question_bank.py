@@ -0,0 +1,64 @@
+# tests/test_question_bank.py
+import os
+import random
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from question_bank import QuestionBank
+from app import app
+
+
+@pytest.fixture
+def client():
+    app.testing = True
+    with app.test_client() as client:
+        yield client
+
+
+def test_math_pools_have_unique_valid_options():
+    bank = QuestionBank.load()
+    assert set(bank.math) == {"easy", "medium", "hard"}
+    for pool in bank.math.values():
+        assert len(pool) > 0
+        for i in range(len(pool)):
+            q = pool.question(i)
+            assert len(set(q["options"])) == len(q["options"]) == 4
+            assert q["correct_answer"] in q["options"]
+            assert min(q["options"]) >= 0
+            a, op, b = q["question"][len("What is "):-1].split()
+            assert eval(f"{a}{op}{b}") == q["correct_answer"]
+
+
+def test_rounds_are_valid():
+    bank = QuestionBank.load()
+    rng = random.Random(0)
+    for _ in range(50):
+        target, options = bank.color_round(bank.color_round_index(rng))
+        assert target in options and len(options) == 3
+        images, words = bank.face_round(bank.face_round_index(rng))
+        assert sorted(words) == sorted(img["name"] for img in images)
+
+
+def test_math_endpoint_difficulty(client):
+    body = client.get("/api/new_math_question?difficulty=easy").get_json()
+    assert body["difficulty"] == "easy"
+    assert "*" not in body["question"]
+    assert client.get("/api/new_math_question?difficulty=bogus").get_json()["difficulty"] == "medium"
+
+
+def test_static_pages_revalidate_with_etag(client):
+    first = client.get("/games/math_quiz")
+    assert first.status_code == 200
+    assert first.headers["ETag"] and "max-age" in first.headers["Cache-Control"]
+    again = client.get("/games/math_quiz", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304 and again.data == b""
+
+
+def test_quiz_pages_render(client):
+    for path in ("/quiz/emotion", "/games/face-match", "/games/color-match"):
+        assert client.get(path).status_code == 200
@@ -0,0 +1,96 @@
+# tests/test_result_cache.py
+import base64
+import io
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import app as app_module
+from result_cache import ResultCache
+from shape_recognition import ShapeIndex
+
+
+def test_lru_and_ttl():
+    cache = ResultCache(maxsize=2, ttl=0.05)
+    a, b, c = (ResultCache.key(p, 'v1') for p in (b'a', b'b', b'c'))
+    assert ResultCache.key(b'a', 'v1') == a != ResultCache.key(b'a', 'v2')
+    assert ResultCache.key('a', 'v1') == a
+    cache.put(a, {'shape': 'circle'})
+    cache.put(b, 'two')
+    assert cache.get(a) == {'shape': 'circle'}
+    cache.put(c, 'three')  # evicts b, the least recently used
+    assert cache.get(b) is None and cache.get(c) == 'three'
+    cache.get(a)['shape'] = 'mutated'
+    assert cache.get(a) == {'shape': 'circle'}
+    time.sleep(0.06)
+    assert cache.get(a) is None
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['expired']) == (4, 2, 1, 1)
+    assert stats['hit_rate'] == 4 / 6
+
+    disabled = ResultCache(maxsize=0)
+    disabled.put(a, 'x')
+    assert disabled.get(a) is None
+
+
+def test_shared_directory_between_workers(tmp_path):
+    first, second = (ResultCache(maxsize=3, ttl=60, shared_dir=str(tmp_path)) for _ in range(2))
+    key = ResultCache.key(b'frame', 'model')
+    first.put(key, 'stop')
+    assert second.get(key) == 'stop'
+    assert second.get(key) == 'stop'
+    assert (second.stats()['shared_hits'], second.stats()['hits']) == (1, 1)
+
+    for i in range(5):
+        first.put(ResultCache.key(str(i)), i)
+        time.sleep(0.01)
+    first.prune()
+    assert len([f for f in os.listdir(tmp_path) if f.endswith('.json')]) == 3
+
+    # a value that cannot be serialized is kept in memory only, with no temp file left behind
+    first.put(ResultCache.key(b'odd'), {'shape': object()})
+    assert not [f for f in os.listdir(tmp_path) if f.endswith('.tmp')]
+
+
+def _sketch_url():
+    img = np.full((200, 200, 3), 255, np.uint8)
+    cv2.circle(img, (100, 100), 60, (0, 0, 0), 4)
+    return 'data:image/png;base64,' + base64.b64encode(cv2.imencode('.png', img)[1].tobytes()).decode()
+
+
+def test_duplicate_payloads_skip_decoding(monkeypatch):
+    cache = ResultCache(maxsize=16, ttl=60)
+    index = ShapeIndex()
+    monkeypatch.setattr(app_module, "result_cache", cache)
+    monkeypatch.setattr(app_module, "_shape_index", index)
+    decodes = []
+    real_decode = app_module.b64_to_cv2
+    monkeypatch.setattr(app_module, "b64_to_cv2", lambda *a, **k: decodes.append(1) or real_decode(*a, **k))
+    sketch = _sketch_url()
+    with app_module.app.test_client() as client:
+        first = client.post('/api/recognize', json={'image': sketch}).get_json()
+        second = client.post('/api/recognize', json={'image': sketch}).get_json()
+        assert first == second and first['shape'] == 'circle'
+        assert len(decodes) == 1
+        # a new sample changes the index digest, so the result is recomputed
+        index.add_image(real_decode(sketch), 'ring')
+        third = client.post('/api/recognize', json={'image': sketch}).get_json()
+        assert len(decodes) == 2 and third['shape'] == 'ring'
+
+        frame = cv2.imencode('.jpg', np.zeros((120, 160, 3), np.uint8))[1].tobytes()
+        predictions = []
+        monkeypatch.setattr(app_module, "predict_gesture", lambda img: predictions.append(1) or 'stop')
+        for _ in range(3):
+            res = client.post('/gesture_control', data={'frame': (io.BytesIO(frame), 'f.jpg')},
+                              content_type='multipart/form-data')
+            assert res.get_json() == {'gesture': 'stop'}
+        assert len(predictions) == 1
+        stats = client.get('/api/stats').get_json()['result_cache']
+    assert (stats['hits'], stats['misses']) == (3, 3)
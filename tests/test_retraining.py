@@ -0,0 +1,136 @@
+# tests/test_retraining.py
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from landmark_classifier import LandmarkClassifier, landmark_features
+from landmark_store import LandmarkStore
+from retraining import ModelSlot, Retrainer
+
+SAMPLE = os.path.join(REPO_ROOT, "collected_data", "thumbs_up", "sample_10.json")
+
+
+def _samples(n, label, rng):
+    with open(SAMPLE) as f:
+        base = np.asarray(json.load(f)["landmarks"], np.float32).reshape(21, 3)
+    if label == "mirrored":
+        base = base * np.array([-1, 1, 1], np.float32) + np.array([1, 0, 0], np.float32)
+    return base + rng.normal(0, 0.004, (n, 21, 3)).astype(np.float32)
+
+
+def test_partial_fit_matches_full_fit(tmp_path):
+    rng = np.random.default_rng(0)
+    X = np.concatenate([_samples(30, "up", rng), _samples(20, "mirrored", rng)])
+    y = np.array(["up"] * 30 + ["mirrored"] * 20)
+    order = rng.permutation(len(X))
+    X, y = X[order], y[order]
+    full = LandmarkClassifier.fit(X, y)
+    warm = LandmarkClassifier.fit(X[:10], y[:10]).partial_fit(X[10:], y[10:])
+    assert warm.labels.tolist() == full.labels.tolist()
+    np.testing.assert_allclose(warm.centroids, full.centroids, atol=1e-5)
+    np.testing.assert_allclose(warm.radii, full.radii, rtol=1e-4)
+    assert warm.counts.tolist() == full.counts.tolist()
+    predicted = warm.predict(X)[0]
+    # samples in the tail of their class are rejected, never given the other label
+    assert np.mean(predicted == y) > 0.8 and set(predicted[predicted != y]) <= {"nothing"}
+
+    warm.version, warm.trained_through = 3, 50
+    warm.save(str(tmp_path / "m.npz"))
+    loaded = LandmarkClassifier.load(str(tmp_path / "m.npz"))
+    assert (loaded.version, loaded.trained_through) == (3, 50)
+    np.testing.assert_allclose(loaded.sq_means, warm.sq_means)
+
+
+def test_partial_fit_keeps_rejecting_foreign_hands():
+    rng = np.random.default_rng(3)
+    upside_down = _samples(20, "up", rng) * np.array([1, -1, 1], np.float32)
+    model = LandmarkClassifier.fit(_samples(20, "up", rng), ["up"] * 20)
+    for _ in range(3):  # radii follow the merged spread instead of only growing
+        model = model.partial_fit(_samples(20, "up", rng), ["up"] * 20)
+        assert model.predict(upside_down)[0].tolist() == ["nothing"] * 20
+    assert model.counts.tolist() == [80]
+    assert model.predict(rng.random((100, 21, 3)).astype(np.float32))[0].tolist() == ["nothing"] * 100
+
+
+def test_retrain_only_new_samples_and_hot_swap(tmp_path):
+    rng = np.random.default_rng(1)
+    store = LandmarkStore(str(tmp_path / "store"))
+    model_path = str(tmp_path / "models" / "clf.npz")
+    store.append(_samples(20, "up", rng), "up")
+    store.append(_samples(20, "mirrored", rng), "mirrored")
+    startup = LandmarkClassifier.fit(*store.read()[:2])
+    serving = ModelSlot(model_path, startup, check_interval=60)
+    other_worker = ModelSlot(model_path, startup, check_interval=60)
+
+    retrainer = Retrainer(store, model_path, holdout_every=5)
+    first = retrainer.run_once(serving.model)
+    assert first["status"] == "updated" and first["version"] == 1
+    assert first["trained_through"] == 40 and first["new_samples"] == 32
+    assert first["validation"]["samples"] == 8 and first["validation"]["after"] == 1.0
+    assert serving.swap(first["model"]) and serving.model.version == 1
+    assert retrainer.run_once(serving.model)["status"] == "no_new_samples"
+
+    # another worker notices the newer file on its next check
+    assert other_worker.reload() and other_worker.model.version == 1
+    assert other_worker.stats()["swaps"] == 1 and other_worker.stats()["last_swap_ms"] > 0
+    assert not other_worker.reload()
+
+    store.append(_samples(10, "up", rng), "up")
+    second = retrainer.run_once(serving.model)
+    assert second["status"] == "updated" and second["version"] == 2
+    assert second["new_samples"] == 8 and second["trained_through"] == 50
+    assert second["model"].counts.sum() == first["model"].counts.sum() + 8
+    assert second["train_ms"] >= 0 and second["retrain_ms"] >= second["train_ms"]
+    # an older model never replaces a newer one
+    assert not serving.swap(first["model"])
+
+    # samples that contradict the held-out rows are not kept
+    store.append(_samples(60, "up", rng), "mirrored")
+    third = Retrainer(store, model_path, holdout_every=5, tolerance=0.0).run_once(second["model"])
+    assert third["status"] == "rejected"
+    assert third["validation"]["after"] < third["validation"]["before"]
+    assert LandmarkClassifier.load(model_path).version == 2
+
+
+def test_invalid_rows_do_not_poison_retraining(tmp_path):
+    rng = np.random.default_rng(4)
+    store = LandmarkStore(str(tmp_path / "store"))
+    model_path = str(tmp_path / "clf.npz")
+    store.append(_samples(20, "up", rng), "up")
+    store.append(_samples(20, "mirrored", rng), "mirrored")
+    retrainer = Retrainer(store, model_path, holdout_every=5, tolerance=0.0)
+    first = retrainer.run_once()
+    assert first["status"] == "updated"
+
+    bad = np.stack([np.full((21, 3), np.nan, np.float32), np.zeros((21, 3), np.float32)])
+    store.append(bad, "up")
+    store.append(_samples(10, "up", rng), "up")
+    second = retrainer.run_once(first["model"])
+    assert second["status"] == "updated" and second["trained_through"] == 52
+    assert np.isfinite(second["model"].centroids).all() and np.isfinite(second["model"].radii).all()
+    # ids 40-51: the NaN row (id 40) is held out, the all-zero row is one of 9 new training ids
+    assert second["model"].counts.sum() == first["model"].counts.sum() + 8
+
+    cold = LandmarkClassifier.fit(*store.read()[:2])
+    assert np.isfinite(cold.centroids).all()
+    assert (cold.predict(_samples(5, "up", rng))[0] == "up").all()
+    with pytest.raises(ValueError):
+        LandmarkClassifier.fit(bad, ["up", "up"])
+
+
+def test_holdout_reads_only_validation_rows(tmp_path):
+    store = LandmarkStore(str(tmp_path / "store"), chunk_rows=7)
+    rng = np.random.default_rng(2)
+    store.append(_samples(23, "up", rng), ["a"] * 11 + ["b"] * 12)
+    X, y = Retrainer(store, str(tmp_path / "m.npz"), holdout_every=4).holdout(len(store))
+    all_X, all_y, _ = store.read()
+    np.testing.assert_array_equal(X, all_X[::4])
+    assert y.tolist() == all_y[::4].tolist()
+    assert landmark_features(X).shape == (6, 60)
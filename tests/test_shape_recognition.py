@@ -0,0 +1,107 @@
+# tests/test_shape_recognition.py
+import base64
+import os
+import sys
+
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from shape_recognition import ShapeIndex, recognize, recognize_many
+from app import app
+
+
+def _sketch(kind, size=300, r=80):
+    img = np.full((size, size, 3), 255, np.uint8)
+    c = size // 2
+    if kind == "circle":
+        cv2.circle(img, (c, c), r, (0, 0, 0), 5)
+    elif kind == "square":
+        cv2.rectangle(img, (c - r, c - r), (c + r, c + r), (0, 0, 0), 5)
+    elif kind == "triangle":
+        pts = np.array([[c, c - r], [c - r, c + r], [c + r, c + r]], np.int32)
+        cv2.polylines(img, [pts], True, (0, 0, 0), 5)
+    return img
+
+
+def _data_url(img):
+    ok, buf = cv2.imencode(".png", img)
+    return "data:image/png;base64," + base64.b64encode(buf.tobytes()).decode()
+
+
+def test_rules_fallback_without_index():
+    assert recognize(_sketch("circle"))["shape"] == "circle"
+    assert recognize(_sketch("square"))["shape"] == "square"
+    tri = recognize(_sketch("triangle"))
+    assert tri["shape"] == "triangle" and len(tri["params"]["points"]) == 3
+    assert recognize(_sketch("blank")) == {}
+
+
+def test_index_updates_incrementally():
+    index = ShapeIndex()
+    assert recognize(_sketch("triangle"), index)["method"] == "rules"
+    assert index.add_image(_sketch("triangle", r=100), "mountain")
+    version = index.version
+    result = recognize(_sketch("triangle", r=60), index)
+    assert result["shape"] == "mountain" and result["method"] == "template"
+    assert result["params"]["w"] > 0  # custom labels get a bounding box
+    # unrelated shapes still fall through to the rules
+    assert recognize(_sketch("circle"), index)["shape"] == "circle"
+    assert index.version == version
+
+
+def test_digest_depends_on_content_not_history():
+    a, b, c = ShapeIndex(), ShapeIndex(), ShapeIndex()
+    samples = [(_sketch("triangle", r=100), "mountain"), (_sketch("circle"), "ball")]
+    for img, label in samples:
+        a.add_image(img, label)
+    for img, label in reversed(samples):
+        b.add_image(img, label)
+    assert a.digest == b.digest
+    # same per-process version, different samples: the digest tells them apart
+    c.add_image(_sketch("triangle", r=100), "mountain")
+    c.add_image(_sketch("circle"), "ring")
+    assert c.version == a.version and c.digest != a.digest
+    assert ShapeIndex(max_distance=0.1).digest != ShapeIndex(max_distance=0.2).digest
+
+
+def test_workers_pick_up_each_others_samples(tmp_path):
+    root = tmp_path / "shape_dataset"
+    (root / "ball").mkdir(parents=True)
+    cv2.imwrite(str(root / "ball" / "ball_1.png"), _sketch("circle"))
+    a, b = ShapeIndex.build_from_dir(str(root)), ShapeIndex.build_from_dir(str(root))
+    assert len(a) == len(b) == 1
+
+    # worker a saves a sample the way /api/save_sample does
+    img, path = _sketch("triangle", r=100), root / "mountain" / "mountain_1.png"
+    path.parent.mkdir()
+    assert a.add_image(img, "mountain", path=str(path))
+    cv2.imwrite(str(path), img)
+    assert a.sync_dir(str(root)) == 0  # its own sample is not indexed twice
+    assert b.sync_dir(str(root)) == 1
+    assert b.sync_dir(str(root)) == 0
+    assert len(a) == len(b) == 2 and a.digest == b.digest
+    assert recognize(_sketch("triangle", r=60), b)["shape"] == "mountain"
+
+
+def test_batch_matches_single_calls():
+    index = ShapeIndex()
+    index.add_image(_sketch("square", r=100), "box")
+    imgs = [_sketch(k) for k in ("square", "circle", "blank")]
+    assert recognize_many(imgs, index) == [recognize(img, index) for img in imgs]
+
+
+def test_batch_endpoint():
+    app.testing = True
+    with app.test_client() as client:
+        res = client.post("/api/recognize/batch", json={
+            "images": [_data_url(_sketch("circle")), "data:image/png;base64,AAAA", _data_url(_sketch("blank"))]})
+        body = res.get_json()
+        assert res.status_code == 200
+        assert body["results"][0]["shape"] == "circle"
+        assert "error" in body["results"][1]
+        assert body["results"][2] == {}
+        assert client.post("/api/recognize/batch", json={}).status_code == 400
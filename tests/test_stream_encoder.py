@@ -0,0 +1,68 @@
+# tests/test_stream_encoder.py
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from camera_stream import FrameBroadcaster, SyntheticSource
+from stream_encoder import MAX_FPS, EncoderPool, StreamEncoder, paced, stream_params
+
+HEADER = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+
+
+def _decode(part):
+    assert part.startswith(HEADER) and part.endswith(b'\r\n')
+    return cv2.imdecode(np.frombuffer(part[len(HEADER):-2], np.uint8), cv2.IMREAD_COLOR)
+
+
+def test_unchanged_frames_reuse_encoded_bytes():
+    enc = StreamEncoder(quality=60)
+    img = np.random.default_rng(0).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+    first = enc.encode(img, seq=1)
+    assert enc.encode(img, seq=1) is first          # same frame again
+    assert enc.encode(img.copy(), seq=2) is first   # new frame, same pixels
+    img2 = img.copy()
+    img2[0, 0] = 0 if img[0, 0, 0] else 255
+    assert enc.encode(img2, seq=3) is not first
+    assert enc.stats()["frames_encoded"] == 2 and enc.stats()["frames_reused"] == 2
+
+
+def test_width_and_quality_profiles():
+    img = SyntheticSource(size=(640, 480), fps=0).read()[1]
+    full = StreamEncoder(quality=90).encode(img)
+    small = StreamEncoder(quality=40, width=320).encode(img)
+    assert _decode(full).shape == (480, 640, 3)
+    assert _decode(small).shape == (240, 320, 3)
+    assert len(small) < len(full)
+    pool = EncoderPool()
+    assert pool.get(40, 320) is pool.get(40, 320)
+
+
+def test_stream_params_clamp_and_default():
+    assert stream_params("500", "10", "1000") == (95, 80, MAX_FPS)
+    assert stream_params("abc", None, "") == (stream_params()[0], None, MAX_FPS)
+    assert stream_params("30", "320", "5") == (30, 320, 5.0)
+
+
+def test_paced_caps_rate():
+    t0 = time.perf_counter()
+    assert len(list(paced(range(6), fps=50))) == 6
+    assert time.perf_counter() - t0 >= 5 / 50 * 0.9
+
+
+def test_broadcaster_encodes_once_per_profile():
+    broadcaster = FrameBroadcaster(SyntheticSource(size=(160, 120), fps=100))
+    a, b = broadcaster.stream(quality=50), broadcaster.stream(quality=50)
+    for _ in range(5):
+        next(a), next(b)
+    a.close(), b.close()
+    broadcaster.stop()
+    (stats,) = broadcaster.stats()["encoders"]
+    assert stats["frames_encoded"] + stats["frames_reused"] == 10
+    assert stats["frames_encoded"] <= broadcaster.stats()["frames_published"]
@@ -0,0 +1,109 @@
+# tests/test_streaming.py
+import base64
+import http.client
+import importlib.util
+import os
+import runpy
+import socket
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+STREAMS = 4
+WORKER_THREADS = 6  # fewer than streams + API requests would need if a stream pinned the worker
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(proc, port, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            pytest.fail(f"gunicorn exited with {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    pytest.fail("gunicorn did not come up")
+
+
+@pytest.fixture(params=["blank", "synthetic"])
+def server(request):
+    # the production setup: gunicorn with the repo's gunicorn.conf.py (one gthread worker)
+    if importlib.util.find_spec("gunicorn") is None:
+        pytest.skip("gunicorn is not installed")
+    port = _free_port()
+    env = dict(os.environ, WORKER_MODE="gthread", WORKER_THREADS=str(WORKER_THREADS), WEB_CONCURRENCY="1",
+               USE_CAMERA="true" if request.param == "synthetic" else "false", CAMERA_SOURCE="synthetic")
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+                             "-b", f"127.0.0.1:{port}", "app:app"],
+                            cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_healthy(proc, port)
+        yield port
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def _open_stream(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", "/video_feed")
+    res = conn.getresponse()
+    assert res.status == 200
+    assert res.read(8) == b"--frame\r"  # first frame has arrived
+    return conn
+
+
+def _sketch():
+    img = np.full((200, 200, 3), 255, np.uint8)
+    cv2.circle(img, (100, 100), 60, (0, 0, 0), 5)
+    ok, buf = cv2.imencode(".png", img)
+    return "data:image/png;base64," + base64.b64encode(buf.tobytes()).decode()
+
+
+def test_api_stays_responsive_with_open_streams(server):
+    streams = [_open_stream(server) for _ in range(STREAMS)]
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server, timeout=10)
+        for method, path, body in [("GET", "/health", None),
+                                   ("POST", "/api/recognize", '{"image": "%s"}' % _sketch())] * 3:
+            t0 = time.perf_counter()
+            conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            res = conn.getresponse()
+            res.read()
+            assert res.status == 200
+            assert time.perf_counter() - t0 < 2.0
+        conn.close()
+    finally:
+        for s in streams:
+            s.close()
+
+
+@pytest.mark.parametrize("mode, worker_class", [("gthread", "gthread"), ("sync", "sync"), (None, "gthread")])
+def test_worker_mode_selection(monkeypatch, mode, worker_class):
+    if mode is None:
+        monkeypatch.delenv("WORKER_MODE", raising=False)
+    else:
+        monkeypatch.setenv("WORKER_MODE", mode)
+    conf = runpy.run_path(os.path.join(REPO_ROOT, "gunicorn.conf.py"))
+    assert conf["worker_class"] == worker_class
@@ -0,0 +1,131 @@
+# tests/test_user_registry.py
+import os
+import sys
+import threading
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import app as app_module
+from progress_cache import ProgressCache
+from progress_store import SQLiteProgressStore
+from user_registry import UserRegistry
+
+
+def test_ids_are_unique_across_connections(tmp_path):
+    path = str(tmp_path / "users.db")
+    workers = [UserRegistry(path) for _ in range(4)]  # stand-ins for gunicorn workers
+    ids = []
+    lock = threading.Lock()
+
+    def register(registry, n):
+        for i in range(25):
+            user = registry.create(f"child {n}-{i}")
+            with lock:
+                ids.append(user["id"])
+
+    threads = [threading.Thread(target=register, args=(r, n)) for n, r in enumerate(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(ids) == list(range(1, 101))
+    assert UserRegistry(path).count() == 100
+
+
+def test_lookups_and_bulk_import(tmp_path):
+    registry = UserRegistry(str(tmp_path / "users.db"))
+    ada = registry.create("  Ada   Lovelace ", age="7", classroom="2B")
+    assert ada["name"] == "Ada Lovelace" and ada["age"] == 7
+    assert registry.get(ada["id"]) == ada
+    assert registry.get(str(ada["id"])) == ada
+    assert registry.get(999) is None and registry.get("nope") is None
+    assert registry.find_by_name("ada lovelace") == [ada]
+
+    created = registry.create_many([{"name": "Sam"}, {"name": "sam", "classroom": "2B"}])
+    assert [u["id"] for u in created] == [ada["id"] + 1, ada["id"] + 2]
+    assert [u["id"] for u in registry.find_by_name("SAM")] == [u["id"] for u in created]
+    assert [u["name"] for u in registry.find_by_classroom("2B")] == ["Ada Lovelace", "sam"]
+
+    with pytest.raises(ValueError, match="user 1"):
+        registry.create_many([{"name": "Kim"}, {"name": ""}])
+    with pytest.raises(ValueError):
+        registry.create("Kim", age=-1)
+    assert registry.count() == 3  # nothing from the failed import was kept
+
+    conn = registry._conn()
+    for sql, args in (("SELECT * FROM users WHERE id = ?", (1,)), ("SELECT * FROM users WHERE name_key = ?", ("sam",))):
+        plan = " ".join(str(row) for row in conn.execute("EXPLAIN QUERY PLAN " + sql, args))
+        assert "SCAN" not in plan
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, "_user_registry", UserRegistry(str(tmp_path / "users.db")))
+    monkeypatch.setattr(app_module, "_progress_cache", ProgressCache(SQLiteProgressStore(str(tmp_path / "p.db"))))
+    app_module.app.testing = True
+    with app_module.app.test_client() as client:
+        yield client
+
+
+def test_session_user_drives_progress(client):
+    user = client.post('/api/user', json={'name': 'Mia', 'age': 6}).get_json()
+    token = user.pop('token')
+    assert client.get(f"/api/user/{user['id']}").get_json() == user  # lookups never expose the token
+    client.post('/api/progress', json={'stars': 2, 'last_activity': 'Sketch'})
+    page = client.get('/progress').get_data(as_text=True)
+    assert "Mia's Progress" in page and "Last Activity: Sketch" in page
+    assert app_module.load_user_progress(str(user['id']))['stars'] == 2
+
+    # a client can neither write another user's progress nor take stars away
+    assert client.post('/api/progress', json={'user_id': 'child_1', 'stars': 5}).status_code == 403
+    assert client.post('/api/progress', json={'stars': -3}).status_code == 400
+    assert client.post('/api/progress', json={'user_id': user['id'], 'stars': 1}).status_code == 200
+    assert app_module.load_user_progress(str(user['id']))['stars'] == 3
+    assert app_module.load_user_progress('child_1') == {}
+
+    assert client.post('/api/user', json={'age': 6}).status_code == 400
+    assert client.post('/api/session', json={'user_id': 12345}).status_code == 404
+    assert client.get('/api/user/12345').status_code == 404
+
+    # switching users needs the token handed out at registration
+    other = client.post('/api/user', json={'name': 'Noah'}).get_json()
+    assert 'Emotion Master badge' not in client.get('/games/face-match').get_data(as_text=True)
+    client.post('/api/progress', json={'stars': 5})
+    assert 'Emotion Master badge' in client.get('/games/face-match').get_data(as_text=True)
+    assert client.post('/api/session', json={'user_id': user['id']}).status_code == 403
+    assert client.post('/api/session', json={'user_id': user['id'], 'token': other['token']}).status_code == 403
+    assert client.post('/api/progress', json={'stars': 1}).get_json()['user_id'] == str(other['id'])
+    assert client.post('/api/session', json={'user_id': user['id'], 'token': token}).get_json()['name'] == 'Mia'
+    assert app_module.load_user_progress(str(user['id']))['stars'] == 3
+
+
+def test_emotion_answers_do_not_award_stars(client):
+    user = client.post('/api/user', json={'name': 'Ivy'}).get_json()
+    with client.session_transaction() as sess:
+        sess['answer'] = 'happy'
+    client.post('/quiz/emotion/submit', data={'answer': 'happy'})
+    progress = app_module.load_user_progress(str(user['id']))
+    assert progress['quiz_score'] == 1 and 'stars' not in progress
+
+
+def test_classroom_import(client):
+    res = client.post('/api/users/import', json={'classroom': '1A', 'users': [{'name': 'Ana'}, {'name': 'Ben', 'age': 5}]})
+    assert res.get_json()['created'] == 2
+    csv_body = "name,age\nCleo,6\nDev,\n"
+    res = client.post('/api/users/import?classroom=1A', data=csv_body, content_type='text/csv')
+    assert [u['name'] for u in res.get_json()['users']] == ['Cleo', 'Dev']
+    found = client.get('/api/users?classroom=1A').get_json()
+    assert found['count'] == 4 and found['users'][1]['age'] == 5
+    assert client.get('/api/users?name=cleo').get_json()['users'][0]['classroom'] == '1A'
+
+    bad = client.post('/api/users/import', json={'users': [{'name': 'Eve'}, {'name': 'Fay', 'age': 'x'}]})
+    assert bad.status_code == 400 and 'user 1' in bad.get_json()['detail']
+    assert client.get('/api/users?name=eve').get_json()['count'] == 0
+
+    ana = client.post('/api/users/import', json={'users': [{'name': 'Ana'}]}).get_json()['users'][0]
+    switched = client.post('/api/session', json={'user_id': ana['id'], 'token': ana['token']}).get_json()
+    assert switched['name'] == 'Ana' and 'token' not in switched
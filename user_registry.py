@@ -0,0 +1,147 @@
+# user_registry.py
+# Persistent user registry (SQLite) shared by all gunicorn workers.
+#
+# - ids come from an AUTOINCREMENT primary key inside a BEGIN IMMEDIATE
+#   transaction, so concurrent workers never hand out the same id and ids of
+#   deleted users are not reused
+# - lookup by id is a primary-key search, lookup by name goes through an index
+#   on the case-folded name; neither scans the table
+# - create_many inserts a whole classroom in one transaction (all or nothing)
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+MAX_NAME_LENGTH = 100
+MAX_AGE = 150
+_COLUMNS = "id, name, age, classroom, created_at"
+
+
+def _name_key(name):
+    return " ".join(name.split()).casefold()
+
+
+def validate_user(data):
+    """Normalized {"name", "age", "classroom"} from a request dict; ValueError if invalid."""
+    if not isinstance(data, dict):
+        raise ValueError("user must be an object")
+    name = data.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("name is required")
+    name = " ".join(name.split())
+    if len(name) > MAX_NAME_LENGTH:
+        raise ValueError(f"name longer than {MAX_NAME_LENGTH} characters")
+    age = data.get("age")
+    if age not in (None, ""):
+        try:
+            age = int(age)
+        except (TypeError, ValueError):
+            raise ValueError("age must be an integer")
+        if not 0 <= age <= MAX_AGE:
+            raise ValueError(f"age must be between 0 and {MAX_AGE}")
+    else:
+        age = None
+    classroom = " ".join(str(data.get("classroom") or "").split()) or None
+    return {"name": name, "age": age, "classroom": classroom}
+
+
+def _row(row):
+    return {"id": row[0], "name": row[1], "age": row[2], "classroom": row[3], "created_at": row[4]} if row else None
+
+
+class UserRegistry:
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " name TEXT NOT NULL,"
+                " name_key TEXT NOT NULL,"
+                " age INTEGER,"
+                " classroom TEXT,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS users_name_key ON users (name_key)")
+            conn.execute("CREATE INDEX IF NOT EXISTS users_classroom ON users (classroom)")
+
+    def _conn(self):
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    # -------------------- Writes --------------------
+    def create(self, name, age=None, classroom=None):
+        return self._insert([validate_user({"name": name, "age": age, "classroom": classroom})])[0]
+
+    def create_many(self, users):
+        """Validate every entry first, then insert them all in one transaction; returns the new users."""
+        rows = []
+        for i, data in enumerate(users):
+            try:
+                rows.append(validate_user(data))
+            except ValueError as e:
+                raise ValueError(f"user {i}: {e}") from None
+        return self._insert(rows)
+
+    def _insert(self, rows):
+        now = time.time()
+        created = []
+        with self._transaction() as conn:
+            for user in rows:
+                cur = conn.execute(
+                    "INSERT INTO users (name, name_key, age, classroom, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (user["name"], _name_key(user["name"]), user["age"], user["classroom"], now))
+                created.append({"id": cur.lastrowid, **user, "created_at": now})
+        return created
+
+    # -------------------- Reads --------------------
+    def get(self, user_id):
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        return _row(self._conn().execute(f"SELECT {_COLUMNS} FROM users WHERE id = ?", (user_id,)).fetchone())
+
+    def find_by_name(self, name, limit=50):
+        rows = self._conn().execute(f"SELECT {_COLUMNS} FROM users WHERE name_key = ? ORDER BY id LIMIT ?",
+                                    (_name_key(str(name)), int(limit)))
+        return [_row(r) for r in rows]
+
+    def find_by_classroom(self, classroom, limit=1000):
+        rows = self._conn().execute(f"SELECT {_COLUMNS} FROM users WHERE classroom = ? ORDER BY id LIMIT ?",
+                                    (" ".join(str(classroom).split()), int(limit)))
+        return [_row(r) for r in rows]
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None